@@ -1,21 +1,40 @@
 from .abaked_server import aBakedServer
+from .connection import Connection
 from .stream_wrappers import WrappedSSHReader, WrappedSSHWriter
 from .utils import check_that
+from .logging import configure_logging
 
 """
 aBakedServer: TCP-based server with optional SSH tunnel under the hood
 """
 
-import importlib.metadata
+import logging
+
+logging.getLogger("abakedserver").addHandler(logging.NullHandler())
+
+_METADATA_FIELDS = {
+    "__version__": "Version",
+    "__author__": "Author-email",
+    "__license__": "License",
+}
+
+
+def __getattr__(name):
+    # Package metadata is resolved on first access rather than at import time
+    if name in _METADATA_FIELDS:
+        import importlib.metadata
+        metadata = importlib.metadata.metadata("abakedserver")
+        for attr, field in _METADATA_FIELDS.items():
+            globals()[attr] = metadata[field]
+        return globals()[name]
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
-_metadata = importlib.metadata.metadata("abakedserver")
-__version__ = _metadata["Version"]
-__author__ = _metadata["Author-email"]
-__license__ = _metadata["License"]
 
 __all__ = [
     "aBakedServer",
+    "Connection",
     "WrappedSSHReader",
     "WrappedSSHWriter",
     "check_that",
+    "configure_logging",
 ]
@@ -1,17 +1,68 @@
 import os
 import sys
+import logging
+import socket
 import asyncio
-import asyncssh
 import time
-from typing import Dict, Optional, Any
-from asyncssh.connection import SSHClientConnectionOptions
+import itertools
+from functools import partial
+from types import MappingProxyType
+from typing import Dict, List, Optional, Any, Mapping
 
-from .logging import configure_logger
+from .logging import configure_logging, get_rate_limited_logger
+from .connection import Connection
 from .stream_wrappers import WrappedSSHReader, WrappedSSHWriter
 from .metrics import MetricsManager
+from .tracing import PhaseTimingAggregator
+from .broadcast import BroadcastGroups, Ticker, SLOW_POLICIES
+from .timers import TimerWheel
+from .listeners import (
+    MAIN_LISTENER, normalize_listener, open_listener, remove_unix_socket, server_addresses,
+    validate_socket_config, listening_socket_options, accepted_socket_options, apply_socket_options, start_serving
+)
+from .pipeline import RequestPipeline, RequestHandler
+from .cache import ResponseCache
+from .tls import validate_tls_config, create_server_context, reload_cert_chain, server_handshake
+from .profiler import SamplingProfiler
 from .utils import check_that
 
-logger = configure_logger('abakedserver')
+logger = logging.getLogger('abakedserver')
+sampled_logger = get_rate_limited_logger('abakedserver')
+
+
+
+def _load_asyncssh():
+    """
+    Import asyncssh on first use and bind it as a module global.
+
+    asyncssh and its crypto dependencies are only needed in SSH tunnel mode, so
+    plain TCP servers never import them. Existing bindings (e.g. test patches)
+    are left in place.
+    """
+    import asyncssh
+    from asyncssh.connection import SSHClientConnectionOptions
+    g = globals()
+    g.setdefault('asyncssh', asyncssh)
+    g.setdefault('SSHClientConnectionOptions', SSHClientConnectionOptions)
+    return g['asyncssh']
+
+
+def __getattr__(name):
+    if name in ('asyncssh', 'SSHClientConnectionOptions'):
+        _load_asyncssh()
+        return globals()[name]
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def _expected_client_errors() -> tuple:
+    # DisconnectError can only come from an already-imported asyncssh
+    ssh = sys.modules.get('asyncssh')
+    return (asyncio.TimeoutError, ConnectionResetError) + ((ssh.DisconnectError,) if ssh else ())
+
+
+HOOK_EVENTS = ('on_accept', 'on_handler_start', 'on_read', 'on_write', 'on_close')
+# How often start_server() checks whether rate-limited log summaries are due
+LOG_SUMMARY_CHECK_INTERVAL = 1.0
 
 class aBakedServer:
     # ... (код __init__, _setup_tunnel без изменений) ...
@@ -20,15 +71,31 @@ class aBakedServer:
                  ssh_config: Optional[Dict] = None,
                  metrics_config: Optional[Dict] = None,
                  timing_config: Optional[Dict] = None,
-                 suppress_client_errors: bool = True):
+                 suppress_client_errors: bool = True,
+                 listen_fd: Optional[int] = None,
+                 logging_config: Optional[Dict] = None,
+                 broadcast_config: Optional[Dict] = None,
+                 listeners: Optional[List[Dict]] = None,
+                 socket_config: Optional[Dict] = None,
+                 tls_config: Optional[Dict] = None):
         
-        logger.debug(f"Initializing aBakedServer: host={host}, port={port}")
+        check_that(logging_config, 'is dict or none', "logging_config must be a dictionary or None")
+        if logging_config is not None:
+            configure_logging(**logging_config)
+        logger.debug("Initializing aBakedServer: host=%s, port=%s", host, port)
         check_that(host, 'is not empty string', f"Host must be a non-empty string, got {host}")
         check_that(port, 'is non-negative', f"Port must be a non-negative integer, got {port}")
         check_that(max_concurrent_connections, 'is int or none', "max_concurrent_connections must be a positive integer or None")
         if max_concurrent_connections is not None:
             check_that(max_concurrent_connections, 'is positive', "max_concurrent_connections must be a positive integer")
         check_that(suppress_client_errors, 'is bool', "suppress_client_errors must be a boolean")
+        check_that(listen_fd, 'is int or none', "listen_fd must be an integer file descriptor or None")
+        if listeners is not None and not isinstance(listeners, (list, tuple)):
+            raise ValueError("listeners must be a list of listener dictionaries or None")
+        self._extra_listeners = [normalize_listener(spec) for spec in (listeners or ())]
+        names = [listener['name'] for listener in self._extra_listeners]
+        if len(set(names)) != len(names):
+            raise ValueError(f"Listener names must be unique, got {names}; set 'name' explicitly")
 
         self.ssh_config = {
             'known_hosts': None,
@@ -43,28 +110,340 @@ class aBakedServer:
             'idle_timeout': None,
             'close_timeout': 1.0,
             'ssh_close_timeout': 5.0,
+            'drain_timeout': 0.0,
+            'teardown_timeout': 5.0,
+            'teardown_batch_size': 1000,
+            'timer_resolution': 0.05,
+            'timer_wheel_slots': 512,
             **(timing_config or {})
         }
+        check_that(self.timing_config['close_timeout'], 'is positive', "close_timeout must be a positive number")
+        check_that(self.timing_config['drain_timeout'], 'is non-negative', "drain_timeout must be a non-negative number")
+        check_that(self.timing_config['teardown_timeout'], 'is positive', "teardown_timeout must be a positive number")
+        check_that(self.timing_config['teardown_batch_size'], 'is int', "teardown_batch_size must be a positive integer")
+        check_that(self.timing_config['teardown_batch_size'], 'is positive', "teardown_batch_size must be a positive integer")
+        check_that(self.timing_config['timer_resolution'], 'is positive', "timer_resolution must be a positive number")
+        check_that(self.timing_config['timer_wheel_slots'], 'is int', "timer_wheel_slots must be a positive integer")
+        check_that(self.timing_config['timer_wheel_slots'], 'is positive', "timer_wheel_slots must be a positive integer")
         self.metrics_config = metrics_config or {}
+        self.socket_config = validate_socket_config(socket_config)
+        self._listening_sockopts = listening_socket_options(self.socket_config)
+        self._accepted_sockopts = accepted_socket_options(self.socket_config)
+        self.tls_config = validate_tls_config(tls_config)
+        # One context for every TLS listener: a shared session cache and ticket keys
+        self.tls_context = create_server_context(self.tls_config) if self.tls_config else None
+        self._tls_listeners = frozenset(
+            [MAIN_LISTENER, *(listener['name'] for listener in self._extra_listeners if listener['tls'])]
+            if self.tls_context else ()
+        )
+        check_that(broadcast_config, 'is dict or none', "broadcast_config must be a dictionary or None")
+        self.broadcast_config = {
+            'max_buffer': 256 * 1024,
+            'slow_policy': 'skip',
+            'encoding': 'utf-8',
+            **(broadcast_config or {})
+        }
+        check_that(self.broadcast_config['max_buffer'], 'is non-negative', "max_buffer must be a non-negative number of bytes")
+        if self.broadcast_config['slow_policy'] not in SLOW_POLICIES:
+            raise ValueError(f"slow_policy must be one of {SLOW_POLICIES}, got {self.broadcast_config['slow_policy']}")
 
         self.host, self.port = host, int(port)
         self.use_ssh = 'ssh_host' in self.ssh_config
+        if self.use_ssh:
+            _load_asyncssh()
         self.max_concurrent_connections = max_concurrent_connections
         self.suppress_client_errors = suppress_client_errors
+        self.listen_fd = listen_fd
         
         self.server = self.tunnel = self.conn = None
         self._running = False
         self._conn_num = 0
-        self._active_connections = {}
+        self._active_connections: Dict[int, Connection] = {}
+        self._listener_servers: Dict[str, asyncio.AbstractServer] = {}
+        self._listener_active: Dict[str, int] = dict.fromkeys([MAIN_LISTENER, *names], 0)
+        self._conn_ids = itertools.count(1)
         self._reconnect_lock = asyncio.Lock()
+        self._shutdown_event = asyncio.Event()
+        self._hooks: Dict[str, tuple] = {event: () for event in HOOK_EVENTS}
+        self.profiler: Optional[SamplingProfiler] = None
+        # Shared by the server's own periodic jobs and available to handlers for their timers
+        self.timers = TimerWheel(self.timing_config['timer_resolution'], self.timing_config['timer_wheel_slots'])
 
         self.metrics = MetricsManager(
             host=self.host, port=self.port, use_ssh=self.use_ssh,
             ssh_host=self.ssh_config.get('ssh_host', ''),
             metrics_config=self.metrics_config
         )
+        self.metrics.track_connections(self._active_connections)
+        self.metrics.register_gauge('active_connections', lambda: self._conn_num)
+        self.metrics.register_gauge('open_ssh_channels', self._open_ssh_channels)
+        self.metrics.register_gauge('buffered_bytes', self._buffered_bytes)
+        if self.metrics_config.get('phase_timing'):
+            PhaseTimingAggregator(self.metrics).install(self)
+        self.groups = BroadcastGroups(self, self.metrics, **self.broadcast_config)
+        self.metrics.register_gauge('broadcast_groups', self.groups.sizes)
+        self.metrics.register_gauge('timer_wheel', self.timers.stats)
+        self.metrics.register_gauge('listener_connections', lambda: dict(self._listener_active))
         logger.debug("aBakedServer initialized successfully")
 
+    @property
+    def shutdown_event(self) -> asyncio.Event:
+        """Event that is set as soon as close() starts.
+
+        Long-running handlers can wait on it (or poll ``is_set()``) to finish
+        their current request and return while the server drains.
+        """
+        return self._shutdown_event
+
+    def connections(self) -> Mapping[int, Connection]:
+        """Read-only live view of active connections keyed by connection id."""
+        return MappingProxyType(self._active_connections)
+
+    def get_connection(self, conn_id: int) -> Optional[Connection]:
+        return self._active_connections.get(conn_id)
+
+    def listeners(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Describe the open listeners.
+
+        Returns:
+            dict: Label -> ``{'kind', 'addresses', 'tls'}``; the host/port (or
+            ``listen_fd``) listener is labelled ``'main'``.
+        """
+        result = {}
+        if self.server:
+            result[MAIN_LISTENER] = {'kind': 'fd' if self.listen_fd is not None else 'tcp',
+                                     'addresses': server_addresses(self.server),
+                                     'tls': MAIN_LISTENER in self._tls_listeners}
+        for listener in self._extra_listeners:
+            server = self._listener_servers.get(listener['name'])
+            if server is not None:
+                result[listener['name']] = {'kind': listener['kind'], 'addresses': server_addresses(server),
+                                            'tls': listener['name'] in self._tls_listeners}
+        return result
+
+    def _resolve_connection(self, target) -> Connection:
+        # Handlers hold wrapped streams; accept those as well as records and ids
+        if isinstance(target, int):
+            conn = self._active_connections.get(target)
+        else:
+            conn = target if isinstance(target, Connection) else getattr(target, 'connection', None)
+        if conn is None:
+            raise ValueError(f"Not an active connection: {target!r}")
+        return conn
+
+    def join(self, group: str, target):
+        """
+        Add a connection to a broadcast group.
+
+        Args:
+            group (str): Group name; groups are created on first join.
+            target: The handler's ``WrappedSSHWriter``/``WrappedSSHReader``, a
+                ``Connection`` or a connection id.
+
+        Connections leave all their groups automatically when they close.
+        """
+        check_that(group, 'is not empty string', "group must be a non-empty string")
+        self.groups.join(group, self._resolve_connection(target))
+
+    def leave(self, group: str, target):
+        self.groups.leave(group, self._resolve_connection(target))
+
+    def broadcast(self, group: str, payload, slow_policy: Optional[str] = None) -> Dict[str, int]:
+        """
+        Send one payload to every member of a group.
+
+        ``str`` payloads are encoded once with ``broadcast_config['encoding']``
+        and the resulting bytes object is written to each member's transport.
+        Members whose write buffer exceeds ``broadcast_config['max_buffer']``
+        are skipped or disconnected according to ``slow_policy`` (defaults to
+        ``broadcast_config['slow_policy']``). Fan-out time is recorded in the
+        ``broadcast_fanout_seconds`` histogram.
+
+        Returns:
+            dict: ``{'delivered', 'skipped', 'disconnected'}`` member counts.
+        """
+        if slow_policy is not None and slow_policy not in SLOW_POLICIES:
+            raise ValueError(f"slow_policy must be one of {SLOW_POLICIES}, got {slow_policy}")
+        return self.groups.broadcast(group, payload, slow_policy)
+
+    def add_ticker(self, group: str, interval: float, producer) -> Ticker:
+        """
+        Broadcast ``producer()`` to ``group`` every ``interval`` seconds.
+
+        A single shared task serves the whole group instead of one timer per
+        connection. ``producer`` may be a plain or async callable; returning
+        ``None`` skips the tick. Tickers run while the server is started.
+        """
+        check_that(interval, 'is positive', "interval must be a positive number")
+        return self.groups.add_ticker(group, interval, producer)
+
+    def remove_ticker(self, ticker: Ticker):
+        self.groups.remove_ticker(ticker)
+
+    def pipeline(self, handler: RequestHandler, **options) -> RequestPipeline:
+        """
+        Build a pipelining client handler that reports to this server's metrics.
+
+        ``handler(request)`` receives one decoded request frame and returns
+        (or awaits) the response. Pass the result to ``start_server()``::
+
+            await server.start_server(server.pipeline(handle, framing='line', max_in_flight=32))
+
+        Options are those of ``RequestPipeline``. Its ``name`` (default
+        ``'pipeline'``) keys the stats gauge and prefixes the
+        ``<name>_in_flight`` and ``<name>_request_seconds`` histograms.
+        """
+        return RequestPipeline(handler, metrics=self.metrics, **options)
+
+    def response_cache(self, **options) -> ResponseCache:
+        """
+        Create a ``ResponseCache`` whose statistics appear in this server's metrics.
+
+        Options are those of ``ResponseCache`` (``max_entries``, ``max_bytes``,
+        ``ttl``, ``key``, ``sizeof``, ``name``). Hand it to ``pipeline(...,
+        cache=...)`` or call its ``get_or_compute()`` from a handler::
+
+            cache = server.response_cache(max_entries=10000, ttl=30.0)
+            await server.start_server(server.pipeline(handle, cache=cache))
+        """
+        return ResponseCache(metrics=self.metrics, **options)
+
+    def add_hook(self, event: str, callback):
+        """
+        Register a tracing hook.
+
+        Hooks are called synchronously with monotonic timestamps:
+        ``on_accept(conn, ts)``, ``on_handler_start(conn, ts)``, ``on_close(conn, ts)``,
+        ``on_read(conn, method, started, finished, nbytes)`` and
+        ``on_write(conn, method, started, finished, nbytes)`` (``write``,
+        ``writelines`` and ``drain``). With no hooks registered the stream
+        wrappers skip timing entirely.
+
+        Raises:
+            ValueError: If the event name is unknown.
+        """
+        if event not in self._hooks:
+            raise ValueError(f"Unknown hook event: {event}. Expected one of {HOOK_EVENTS}")
+        self._hooks[event] = self._hooks[event] + (callback,)
+
+    def remove_hook(self, event: str, callback):
+        if event not in self._hooks:
+            raise ValueError(f"Unknown hook event: {event}. Expected one of {HOOK_EVENTS}")
+        self._hooks[event] = tuple(cb for cb in self._hooks[event] if cb != callback)
+
+    def _run_hooks(self, hooks, *args):
+        for callback in hooks:
+            try:
+                callback(*args)
+            except Exception as e:
+                sampled_logger.debug('hook_failure', "Tracing hook %r failed: %s", callback, e, exc_info=True)
+
+    def start_profiler(self, interval: float = 0.01) -> SamplingProfiler:
+        """
+        Start the sampling profiler for the event-loop thread.
+
+        Must be called from the loop thread. A fresh profiler replaces any
+        previous results; calling it while one is running is a no-op.
+
+        Args:
+            interval (float): Seconds between samples (0.01 = 100 Hz).
+        """
+        check_that(interval, 'is positive', "Profiler interval must be a positive number")
+        if self.profiler is None or not self.profiler.running:
+            self.profiler = SamplingProfiler(interval, loop=asyncio.get_running_loop())
+            self.profiler.start()
+        return self.profiler
+
+    def stop_profiler(self, path: Optional[str] = None) -> Optional[SamplingProfiler]:
+        """
+        Stop the sampling profiler and optionally write collapsed stacks to ``path``.
+        """
+        if self.profiler is None:
+            return None
+        self.profiler.stop()
+        if path:
+            self.profiler.write_collapsed(path)
+            logger.info(f"Profile written to {path}")
+        return self.profiler
+
+    def install_profiler_signal(self, signum: int, path: str = 'abakedserver-profile.txt',
+                                interval: float = 0.01):
+        """
+        Toggle the profiler on each delivery of ``signum`` (e.g. ``signal.SIGUSR2``);
+        stopping writes the collapsed stacks to ``path``.
+        """
+        def toggle():
+            if self.profiler is not None and self.profiler.running:
+                self.stop_profiler(path)
+            else:
+                self.start_profiler(interval)
+
+        asyncio.get_running_loop().add_signal_handler(signum, toggle)
+
+    def _open_ssh_channels(self) -> int:
+        # Every tunnelled client arrives over its own forwarded SSH channel; clients
+        # of the extra listeners connect directly and do not count
+        if not self.use_ssh or not self.conn or self.conn.is_closed():
+            return 0
+        return self._listener_active[MAIN_LISTENER]
+
+    def _buffered_bytes(self) -> int:
+        total = 0
+        for conn in self._active_connections.values():
+            transport = conn.writer.transport
+            if transport is not None and not transport.is_closing():
+                total += transport.get_write_buffer_size()
+        return total
+
+    def reload_certificates(self, certfile: Optional[str] = None, keyfile: Optional[str] = None,
+                            password: Optional[str] = None, cafile: Optional[str] = None):
+        """
+        Load a new certificate chain into the shared TLS context.
+
+        Call without arguments after the files in ``tls_config`` were replaced
+        in place, or pass new paths. Listeners keep running, established
+        connections keep their sessions, and new handshakes present the new
+        certificate. If the new files cannot be loaded, the error is raised
+        and the current certificate stays in use.
+
+        When a ``cafile`` is configured, the shared context is replaced by a
+        new one so that CAs removed from the file stop being trusted; this
+        resets session resumption.
+
+        Raises:
+            RuntimeError: If the server was created without ``tls_config``.
+        """
+        if self.tls_context is None:
+            raise RuntimeError("TLS is not enabled; create the server with tls_config")
+        updates = {'certfile': certfile, 'keyfile': keyfile, 'password': password, 'cafile': cafile}
+        config = {**self.tls_config, **{key: value for key, value in updates.items() if value is not None}}
+        # Handshakes read self.tls_context per connection, so a swapped context applies right away
+        self.tls_context = reload_cert_chain(self.tls_context, config)
+        self.tls_config = config
+        logger.info("TLS certificate reloaded from %s", config['certfile'])
+
+    def listener_fd(self) -> int:
+        """
+        Return an inheritable duplicate of the listening socket descriptor.
+
+        Hand it to a replacement process (e.g. ``subprocess.Popen(..., pass_fds=[fd])``)
+        that creates its server with ``aBakedServer(..., listen_fd=fd)``. Both processes
+        share one kernel accept queue, so this instance can drain and close without
+        an accept gap.
+
+        Returns:
+            int: The duplicated file descriptor, owned by the caller.
+
+        Raises:
+            RuntimeError: If the server is not listening.
+        """
+        if not self.server or not self.server.sockets:
+            raise RuntimeError("Server is not listening")
+        fd = os.dup(self.server.sockets[0].fileno())
+        os.set_inheritable(fd, True)
+        return fd
+
     async def _setup_tunnel(self):
         logger.debug("Setting up SSH tunnel")
         required_keys = {'ssh_user', 'ssh_key_path', 'ssh_host', 'remote_bind_host', 'remote_bind_port'}
@@ -97,9 +476,14 @@ class aBakedServer:
         if self.conn and self.conn.is_closed():
             self.conn.close()
 
+        _load_asyncssh()
         try:
             options = SSHClientConnectionOptions(**ssh_options)
-            self.conn = await asyncio.wait_for(asyncssh.connect(options=options), timeout=self.ssh_config['ssh_tun_timeout'])
+            # connect()'s own host/port defaults override the ones in options
+            self.conn = await asyncio.wait_for(
+                asyncssh.connect(ssh_options['host'], ssh_options['port'], options=options),
+                timeout=self.ssh_config['ssh_tun_timeout']
+            )
             
             self.tunnel = await self.conn.forward_remote_port(
                 self.ssh_config['remote_bind_host'],
@@ -113,54 +497,114 @@ class aBakedServer:
 
     async def start_server(self, client_handler):
         logger.debug("Starting server")
-        async def connection_handler(reader, writer):
-            # ... (connection_handler без изменений) ...
-            conn_id = id(writer)
-            reject_connection = False
+        # Handler tasks are named after the client handler so that loop
+        # diagnostics (slow callbacks, profiler samples) point at user code.
+        handler_name = getattr(client_handler, '__qualname__', None) or repr(client_handler)
+
+        async def connection_handler(reader, writer, listener=MAIN_LISTENER):
+            conn = None
+            tls = listener in self._tls_listeners
+            if tls:
+                # The ClientHello must reach start_tls(), not the plaintext StreamReader
+                writer.transport.pause_reading()
             
             async with self.metrics.lock:
-                if self.max_concurrent_connections is not None and self._conn_num >= self.max_concurrent_connections:
-                    reject_connection = True
-                else:
+                at_capacity = (self.max_concurrent_connections is not None
+                               and self._conn_num >= self.max_concurrent_connections)
+                if self._running and not at_capacity:
+                    task = asyncio.current_task()
+                    task.set_name(handler_name)
+                    conn = Connection(next(self._conn_ids), writer.get_extra_info('peername'), writer, task, listener)
                     self._conn_num += 1
-                    self._active_connections[conn_id] = writer
+                    self._listener_active[listener] += 1
+                    self._active_connections[conn.id] = conn
             
-            if reject_connection:
-                await self.metrics.record_rejection()
+            if conn is None:
+                sampled_logger.info('connection_rejected', "Rejected connection from %s on %s (%s)",
+                                    writer.get_extra_info('peername'), listener,
+                                    'shutting down' if not self._running else 'connection limit reached')
+                await self.metrics.record_rejection(listener)
                 writer.close()
                 return
 
-            start_time = time.monotonic()
+            if self._accepted_sockopts:
+                sock = writer.get_extra_info('socket')
+                if sock is not None:
+                    apply_socket_options(sock, self._accepted_sockopts)
+
+            if self._hooks['on_accept']:
+                self._run_hooks(self._hooks['on_accept'], conn, conn.start_time)
+
             errors = []
             try:
-                smart_reader = WrappedSSHReader(reader, self)
-                smart_writer = WrappedSSHWriter(writer, self)
+                if tls:
+                    try:
+                        conn.tls = await server_handshake(writer, self.tls_context, self.tls_config['handshake_timeout'])
+                    except (OSError, asyncio.TimeoutError) as e:
+                        self.metrics.record_tls_handshake(None)
+                        sampled_logger.info('tls_handshake_failed', "TLS handshake with %s failed: %s", conn.peer, e)
+                        errors.append(type(e).__name__)
+                        return
+                    self.metrics.record_tls_handshake(conn.tls['handshake_seconds'], conn.tls['resumed'])
+
+                smart_reader = WrappedSSHReader(reader, self, conn)
+                smart_writer = WrappedSSHWriter(writer, self, conn)
                 
+                if self._hooks['on_handler_start']:
+                    self._run_hooks(self._hooks['on_handler_start'], conn, time.monotonic())
                 await client_handler(smart_reader, smart_writer)
             except Exception as e:
                 errors.append(type(e).__name__)
-                if not self.suppress_client_errors and not isinstance(e, (asyncio.TimeoutError, ConnectionResetError, asyncssh.DisconnectError)):
+                if not self.suppress_client_errors and not isinstance(e, _expected_client_errors()):
                     raise
             finally:
-                duration = time.monotonic() - start_time
-                await self.metrics.record_connection(duration, errors)
+                conn.state = Connection.CLOSED
+                if conn.groups:
+                    self.groups.discard(conn)
+                if self._hooks['on_close']:
+                    self._run_hooks(self._hooks['on_close'], conn, time.monotonic())
+                await self.metrics.record_connection(conn.duration, errors, conn)
                 if not writer.is_closing():
                     writer.close()
                 async with self.metrics.lock:
-                    if conn_id in self._active_connections:
+                    if self._active_connections.pop(conn.id, None) is not None:
                         self._conn_num -= 1
-                        del self._active_connections[conn_id]
+                        self._listener_active[listener] -= 1
 
         self._running = True
+        self._shutdown_event.clear()
         await self.metrics.start()
+        # Suppressed-message summaries must not wait for the next log() call
+        self.timers.call_every(LOG_SUMMARY_CHECK_INTERVAL, sampled_logger.flush_if_due)
         
         # --- ИСПРАВЛЕННАЯ ЛОГИКА ЗАПУСКА ("ТРАНЗАКЦИЯ") ---
-        self.server = await asyncio.start_server(connection_handler, self.host, self.port)
+        if self.listen_fd is not None:
+            # Listener handed off by a previous process (see listener_fd())
+            listen_sock = socket.socket(fileno=self.listen_fd)
+            self.server = await asyncio.start_server(connection_handler, sock=listen_sock,
+                                                     backlog=self.socket_config['backlog'], start_serving=False)
+        else:
+            self.server = await asyncio.start_server(connection_handler, self.host, self.port,
+                                                     backlog=self.socket_config['backlog'], start_serving=False)
+        # Listening options (buffers, TCP_DEFER_ACCEPT, TCP_FASTOPEN) must be set before listen()
+        await start_serving(self.server, self._listening_sockopts)
         
         if self.port == 0:
             self.port = self.server.sockets[0].getsockname()[1]
         
         logger.info(f"Server TCP listener started on {self.host}:{self.port}")
+
+        try:
+            for listener in self._extra_listeners:
+                self._listener_servers[listener['name']] = await open_listener(
+                    listener, partial(connection_handler, listener=listener['name']),
+                    self.socket_config['backlog'], self._listening_sockopts)
+                logger.info("Listener %s started on %s", listener['name'],
+                            server_addresses(self._listener_servers[listener['name']]))
+        except Exception as e:
+            logger.error("Listener setup failed. Shutting down listeners. Error: %s", e)
+            await self._close_listeners()
+            raise
         
         if self.use_ssh:
             try:
@@ -168,45 +612,136 @@ class aBakedServer:
             except Exception as e:
                 # Если настройка туннеля провалилась, останавливаем TCP-сервер
                 logger.error(f"SSH tunnel setup failed. Shutting down TCP listener. Error: {e}")
-                self.server.close()
-                await self.server.wait_closed()
+                await self._close_listeners()
                 # И "пробрасываем" ошибку дальше, чтобы пользователь знал о сбое
                 raise
 
+        self.groups.start_tickers()
         return self
 
     # ... (остальные методы close, _reconnect_tunnel и т.д. без изменений) ...
-    async def close(self):
+    async def close(self, drain_timeout: Optional[float] = None):
+        """
+        Shut the server down, optionally draining in-flight connections first.
+
+        Args:
+            drain_timeout: Seconds to wait for active handlers to finish on their
+                own after the listener stops accepting and ``shutdown_event`` is set.
+                Defaults to ``timing_config['drain_timeout']``; ``0`` closes
+                active connections immediately.
+        """
         logger.debug("Closing server")
         self._running = False
+        self._shutdown_event.set()
+        self.groups.stop_tickers()
+        if drain_timeout is None:
+            drain_timeout = self.timing_config.get('drain_timeout') or 0.0
 
-        if self._active_connections:
-            logger.debug(f"Closing {len(self._active_connections)} active client connection(s)...")
-            active_writers = list(self._active_connections.values())
-            for writer in active_writers:
-                if not writer.is_closing():
-                    writer.close()
-            await asyncio.gather(*(w.wait_closed() for w in active_writers if not w.is_closing()), return_exceptions=True)
-
+        # Stop accepting first so no new client is accepted only to be killed;
+        # with a handed-off listener the replacement process keeps accepting.
         if self.server:
             self.server.close()
-            await self.server.wait_closed()
-            
+        for server in self._listener_servers.values():
+            server.close()
         if self.tunnel:
             self.tunnel.close()
+
+        drained = 0
+        if self._active_connections and drain_timeout > 0:
+            logger.info(f"Draining {len(self._active_connections)} active client connection(s) for up to {drain_timeout}s...")
+            for conn in self._active_connections.values():
+                conn.state = Connection.DRAINING
+            tasks = [conn.task for conn in self._active_connections.values()]
+            done, _ = await asyncio.wait(tasks, timeout=drain_timeout)
+            drained = len(done)
+
+        killed = len(self._active_connections)
+        if self._active_connections:
+            logger.debug("Closing %d active client connection(s)...", len(self._active_connections))
+            active = list(self._active_connections.values())
+            for conn in active:
+                conn.state = Connection.CLOSING
+            await self._teardown_connections([conn.writer for conn in active])
+        await self.metrics.record_shutdown(drained=drained, killed=killed)
+
+        await self._close_listeners()
+            
         if self.conn and not self.conn.is_closed():
             self.conn.close()
             try:
                 timeout = self.timing_config.get('ssh_close_timeout', 5.0)
                 await asyncio.wait_for(self.conn.wait_closed(), timeout=timeout)
             except asyncio.TimeoutError:
-                logger.debug(f"SSH connection wait_closed timed out after {timeout} seconds.")
+                logger.warning("SSH connection wait_closed timed out after %s seconds.", timeout)
             except Exception as e:
-                logger.info(f"An error occurred while waiting for SSH connection to close: {e}", exc_info=True)
+                logger.warning("An error occurred while waiting for SSH connection to close: %s", e, exc_info=True)
         
+        if self.profiler is not None and self.profiler.running:
+            self.profiler.stop()
+        self.timers.close()
+        sampled_logger.flush()
         await self.metrics.stop()
         logger.info("Server closed")
 
+    async def _close_listeners(self):
+        if self.server:
+            self.server.close()
+            await self.server.wait_closed()
+        for listener in self._extra_listeners:
+            server = self._listener_servers.pop(listener['name'], None)
+            if server is not None:
+                server.close()
+                await server.wait_closed()
+                remove_unix_socket(listener)
+
+    async def _teardown_connections(self, writers):
+        """
+        Close writers concurrently in batches, bounded by close_timeout per batch
+        and teardown_timeout overall. Transports that have not finished closing
+        by then are aborted, dropping any unflushed data.
+        """
+        close_timeout = self.timing_config['close_timeout']
+        batch_size = self.timing_config['teardown_batch_size']
+        started = time.monotonic()
+        deadline = started + self.timing_config['teardown_timeout']
+        latencies = []
+        aborted = 0
+
+        def on_closed(task, batch_start):
+            if task.cancelled():
+                return  # aborted straggler, counted separately
+            task.exception()  # reset/broken pipe while flushing is expected here
+            latencies.append(time.monotonic() - batch_start)
+
+        for i in range(0, len(writers), batch_size):
+            batch = writers[i:i + batch_size]
+            batch_start = time.monotonic()
+            timeout = min(close_timeout, deadline - batch_start)
+            if timeout <= 0:
+                for writer in batch:
+                    writer.transport.abort()
+                aborted += len(batch)
+                continue
+
+            waiters = {}
+            for writer in batch:
+                if not writer.is_closing():
+                    writer.close()
+                waiter = asyncio.ensure_future(writer.wait_closed())
+                waiter.add_done_callback(lambda t, s=batch_start: on_closed(t, s))
+                waiters[waiter] = writer
+
+            _, pending = await asyncio.wait(waiters, timeout=timeout)
+            for waiter in pending:
+                waiters[waiter].transport.abort()
+                waiter.cancel()
+            aborted += len(pending)
+
+        elapsed = time.monotonic() - started
+        if aborted:
+            logger.warning(f"Aborted {aborted} connection(s) that did not close within the teardown deadline.")
+        await self.metrics.record_teardown(latencies=latencies, aborted=aborted, elapsed=elapsed)
+
     async def _reconnect_tunnel(self):
         async with self._reconnect_lock:
             if not self._running or (self.conn and not self.conn.is_closed()):
@@ -0,0 +1,171 @@
+import time
+import asyncio
+import inspect
+import logging
+from typing import Any, Callable, Dict, Optional, Union
+
+from .connection import Connection
+
+logger = logging.getLogger('abakedserver')
+
+SLOW_POLICIES = ('skip', 'disconnect')
+
+
+class Ticker:
+    """
+    A single periodic task that broadcasts ``producer()`` to a group.
+
+    One ticker replaces one timer per member: the payload is produced and
+    encoded once per tick no matter how many connections are in the group.
+    Ticks are scheduled against the loop clock, so a slow tick does not make
+    the schedule drift; missed ticks are skipped rather than bunched up.
+    """
+
+    def __init__(self, groups: 'BroadcastGroups', group: str, interval: float,
+                 producer: Callable[[], Any]):
+        self.group = group
+        self.interval = interval
+        self.producer = producer
+        self._groups = groups
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def start(self):
+        if not self.running:
+            self._task = asyncio.get_running_loop().create_task(self._run(), name=f"ticker:{self.group}")
+
+    def cancel(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        next_at = loop.time() + self.interval
+        while True:
+            await asyncio.sleep(max(0.0, next_at - loop.time()))
+            try:
+                payload = self.producer()
+                if inspect.isawaitable(payload):
+                    payload = await payload
+                if payload is not None:
+                    self._groups.broadcast(self.group, payload)
+            except Exception as e:
+                logger.error("Ticker for group %r failed: %s", self.group, e, exc_info=True)
+            now = loop.time()
+            next_at += self.interval
+            if next_at <= now:
+                next_at = now + self.interval
+
+    def __repr__(self) -> str:
+        return f"<Ticker group={self.group!r} interval={self.interval} running={self.running}>"
+
+
+class BroadcastGroups:
+    """
+    Named groups of connections with encode-once fan-out.
+
+    ``broadcast()`` turns the payload into a single ``bytes`` object and hands
+    that same object to every member's transport, bypassing the per-stream
+    wrappers. Members whose transport write buffer already exceeds
+    ``max_buffer`` bytes are slow consumers and are skipped for this message
+    (``'skip'``) or disconnected (``'disconnect'``).
+
+    Owned by ``aBakedServer``; use the server's ``join``/``leave``/
+    ``broadcast``/``add_ticker`` methods rather than this class directly.
+    """
+
+    def __init__(self, server, metrics, max_buffer: int = 256 * 1024, slow_policy: str = 'skip',
+                 encoding: str = 'utf-8'):
+        self._server = server
+        self._metrics = metrics
+        self.max_buffer = max_buffer
+        self.slow_policy = slow_policy
+        self.encoding = encoding
+        self._groups: Dict[str, Dict[int, Connection]] = {}
+        self._tickers: Dict[int, Ticker] = {}
+        self._fanout = metrics.histogram('broadcast_fanout_seconds')
+
+    def join(self, group: str, conn: Connection):
+        self._groups.setdefault(group, {})[conn.id] = conn
+        if conn.groups is None:
+            conn.groups = set()
+        conn.groups.add(group)
+
+    def leave(self, group: str, conn: Connection):
+        members = self._groups.get(group)
+        if members is not None:
+            members.pop(conn.id, None)
+            if not members:
+                del self._groups[group]
+        if conn.groups:
+            conn.groups.discard(group)
+
+    def discard(self, conn: Connection):
+        """Remove a closing connection from every group it joined."""
+        for group in tuple(conn.groups or ()):
+            self.leave(group, conn)
+
+    def members(self, group: str) -> Dict[int, Connection]:
+        return self._groups.get(group, {})
+
+    def sizes(self) -> Dict[str, int]:
+        return {group: len(members) for group, members in self._groups.items()}
+
+    def broadcast(self, group: str, payload: Union[bytes, bytearray, memoryview, str],
+                  slow_policy: Optional[str] = None) -> Dict[str, int]:
+        started = time.monotonic()
+        data = payload.encode(self.encoding) if isinstance(payload, str) else bytes(payload)
+        policy = slow_policy or self.slow_policy
+        max_buffer = self.max_buffer
+        nbytes = len(data)
+        hooks = self._server._hooks['on_write']
+        delivered = skipped = disconnected = 0
+
+        for conn in tuple(self._groups.get(group, {}).values()):
+            transport = conn.writer.transport if conn.writer is not None else None
+            if transport is None or transport.is_closing():
+                skipped += 1
+                continue
+            if transport.get_write_buffer_size() > max_buffer:
+                if policy == 'disconnect':
+                    # abort() drops the backlog; the handler sees EOF and exits
+                    transport.abort()
+                    self.discard(conn)
+                    disconnected += 1
+                else:
+                    skipped += 1
+                continue
+            transport.write(data)
+            conn.bytes_out += nbytes
+            conn.messages_out += 1
+            conn.last_activity = now = time.monotonic()
+            if hooks:
+                self._server._run_hooks(hooks, conn, 'broadcast', now, now, nbytes)
+            delivered += 1
+
+        self._fanout.observe(time.monotonic() - started)
+        self._metrics.record_broadcast(delivered, skipped, disconnected, nbytes * delivered)
+        return {'delivered': delivered, 'skipped': skipped, 'disconnected': disconnected}
+
+    def add_ticker(self, group: str, interval: float, producer: Callable[[], Any]) -> Ticker:
+        ticker = Ticker(self, group, interval, producer)
+        self._tickers[id(ticker)] = ticker
+        if self._server._running:
+            ticker.start()
+        return ticker
+
+    def remove_ticker(self, ticker: Ticker):
+        self._tickers.pop(id(ticker), None)
+        ticker.cancel()
+
+    def start_tickers(self):
+        for ticker in self._tickers.values():
+            ticker.start()
+
+    def stop_tickers(self):
+        for ticker in self._tickers.values():
+            ticker.cancel()
@@ -0,0 +1,188 @@
+import sys
+import time
+import asyncio
+import inspect
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Union
+
+from .utils import check_that
+
+_MISSING = object()
+
+
+class _Entry:
+    __slots__ = ('value', 'size', 'expires_at')
+
+    def __init__(self, value: Any, size: int, expires_at: Optional[float]):
+        self.value = value
+        self.size = size
+        self.expires_at = expires_at
+
+
+def _default_size(value: Any) -> int:
+    if isinstance(value, (bytes, bytearray, memoryview, str)):
+        return len(value)
+    return sys.getsizeof(value)
+
+
+class ResponseCache:
+    """
+    LRU + TTL cache of responses to idempotent requests.
+
+    Bounded by ``max_entries`` and ``max_bytes`` (the sum of ``sizeof(value)``);
+    the least recently used entries are evicted first. Entries older than
+    ``ttl`` seconds are dropped when next looked up. ``get_or_compute()``
+    coalesces concurrent misses for the same key: the first caller computes
+    the response and the others await its result, so a burst of identical
+    requests costs one computation. Failures are not cached.
+
+    Create it through ``aBakedServer.response_cache()`` so its statistics
+    appear in the server metrics, and pass it to ``aBakedServer.pipeline()``
+    or call ``get_or_compute()`` from a handler.
+    """
+
+    def __init__(self, max_entries: int = 1024, max_bytes: int = 16 * 1024 * 1024,
+                 ttl: Optional[float] = None, key: Optional[Callable[[Any], Hashable]] = None,
+                 sizeof: Callable[[Any], int] = _default_size, metrics=None, name: str = 'response_cache'):
+        check_that(max_entries, 'is int', "max_entries must be a positive integer")
+        check_that(max_entries, 'is positive', "max_entries must be a positive integer")
+        check_that(max_bytes, 'is int', "max_bytes must be a positive integer")
+        check_that(max_bytes, 'is positive', "max_bytes must be a positive integer")
+        if ttl is not None:
+            check_that(ttl, 'is positive', "ttl must be a positive number of seconds or None")
+        if key is not None and not callable(key):
+            raise ValueError("key must be a callable or None")
+        check_that(name, 'is not empty string', "name must be a non-empty string")
+
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.key = key
+        self.sizeof = sizeof
+        self.name = name
+        self._entries: 'OrderedDict[Hashable, _Entry]' = OrderedDict()
+        self._pending: Dict[Hashable, asyncio.Future] = {}
+        self._bytes = 0
+        self._hits = self._misses = self._coalesced = 0
+        self._evictions = self._expirations = 0
+        if metrics is not None:
+            metrics.register_gauge(name, self.stats)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: Hashable) -> bool:
+        entry = self._entries.get(key)
+        return entry is not None and not self._expired(entry, time.monotonic())
+
+    def stats(self) -> Dict[str, Union[int, float]]:
+        lookups = self._hits + self._misses
+        return {
+            'entries': len(self._entries), 'bytes': self._bytes,
+            'hits': self._hits, 'misses': self._misses, 'coalesced': self._coalesced,
+            'evictions': self._evictions, 'expirations': self._expirations,
+            'hit_rate': self._hits / lookups if lookups else 0.0,
+        }
+
+    def make_key(self, request: Any) -> Hashable:
+        return self.key(request) if self.key is not None else request
+
+    @staticmethod
+    def _expired(entry: _Entry, now: float) -> bool:
+        return entry.expires_at is not None and entry.expires_at <= now
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Return the cached value for ``key`` (a hit refreshes its LRU position)."""
+        entry = self._entries.get(key)
+        if entry is not None:
+            if not self._expired(entry, time.monotonic()):
+                self._entries.move_to_end(key)
+                self._hits += 1
+                return entry.value
+            self._remove(key)
+            self._expirations += 1
+        self._misses += 1
+        return default
+
+    def put(self, key: Hashable, value: Any, ttl: Optional[float] = None):
+        """
+        Store ``value`` under ``key``; ``ttl`` overrides the cache default.
+
+        ``None`` values and values larger than ``max_bytes`` are not stored.
+        """
+        if value is None:
+            return
+        size = self.sizeof(value)
+        if size > self.max_bytes:
+            return
+        ttl = self.ttl if ttl is None else ttl
+        if key in self._entries:
+            self._remove(key)
+        self._entries[key] = _Entry(value, size, time.monotonic() + ttl if ttl is not None else None)
+        self._bytes += size
+        while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+            oldest = next(iter(self._entries))
+            self._remove(oldest)
+            self._evictions += 1
+
+    def invalidate(self, key: Hashable) -> bool:
+        if key in self._entries:
+            self._remove(key)
+            return True
+        return False
+
+    def clear(self):
+        self._entries.clear()
+        self._bytes = 0
+
+    def _remove(self, key: Hashable):
+        self._bytes -= self._entries.pop(key).size
+
+    async def get_or_compute(self, request: Any, compute: Callable[[Any], Union[Any, Awaitable[Any]]],
+                             ttl: Optional[float] = None) -> Any:
+        """
+        Return the cached response to ``request`` or compute and cache it.
+
+        ``compute(request)`` may be a plain or async callable. While it runs,
+        other callers with the same key wait for its result instead of
+        computing it again; if it raises, they all see the exception.
+        """
+        key = self.make_key(request)
+        while True:
+            value = self.get(key, _MISSING)
+            if value is not _MISSING:
+                return value
+            pending = self._pending.get(key)
+            if pending is None:
+                break
+            self._coalesced += 1
+            try:
+                return await asyncio.shield(pending)
+            except asyncio.CancelledError:
+                if not pending.cancelled():
+                    raise
+                # The computing caller was cancelled; compute it ourselves
+
+        future = asyncio.get_running_loop().create_future()
+        self._pending[key] = future
+        try:
+            value = compute(request)
+            if inspect.isawaitable(value):
+                value = await value
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            future.exception()  # waiters re-raise it; don't warn if there are none
+            raise
+        finally:
+            del self._pending[key]
+        self.put(key, value, ttl)
+        future.set_result(value)
+        return value
+
+    def __repr__(self) -> str:
+        return (f"<ResponseCache {self.name!r} entries={len(self._entries)}/{self.max_entries} "
+                f"bytes={self._bytes}/{self.max_bytes} ttl={self.ttl}>")
+
@@ -0,0 +1,76 @@
+import time
+from typing import Any, Dict, Optional, Tuple
+
+
+class Connection:
+    """
+    Compact state record for one client connection.
+
+    Instances live in the server registry (``aBakedServer.connections()``) for the
+    lifetime of the connection. ``__slots__`` keeps them free of a per-instance
+    ``__dict__``, which matters when tens of thousands of clients are connected.
+    """
+    ACTIVE = 'active'
+    DRAINING = 'draining'
+    CLOSING = 'closing'
+    CLOSED = 'closed'
+
+    __slots__ = (
+        'id', 'peer', 'start_time', 'bytes_in', 'bytes_out',
+        'messages_in', 'messages_out', 'last_activity', 'state', 'writer', 'task', 'groups', 'listener', 'tls',
+        '_rolled_bytes_in', '_rolled_bytes_out', '_rolled_messages_in', '_rolled_messages_out'
+    )
+
+    def __init__(self, conn_id: int, peer: Any = None, writer: Any = None, task: Any = None,
+                 listener: Optional[str] = None):
+        now = time.monotonic()
+        self.id = conn_id
+        self.peer = peer
+        self.start_time = now
+        self.last_activity = now
+        self.bytes_in = 0
+        self.bytes_out = 0
+        self.messages_in = 0
+        self.messages_out = 0
+        self._rolled_bytes_in = self._rolled_bytes_out = 0
+        self._rolled_messages_in = self._rolled_messages_out = 0
+        self.state = Connection.ACTIVE
+        self.writer = writer
+        self.task = task
+        self.groups = None  # broadcast groups joined, created on first join
+        self.listener = listener
+        self.tls = None  # negotiated session details once the TLS handshake completes
+
+    @property
+    def duration(self) -> float:
+        return time.monotonic() - self.start_time
+
+    @property
+    def idle_time(self) -> float:
+        return time.monotonic() - self.last_activity
+
+    def take_traffic_delta(self) -> Tuple[int, int, int, int]:
+        """
+        Return traffic accumulated since the previous call and mark it as rolled up.
+
+        Returns:
+            tuple: ``(bytes_in, bytes_out, messages_in, messages_out)`` deltas.
+        """
+        delta = (
+            self.bytes_in - self._rolled_bytes_in, self.bytes_out - self._rolled_bytes_out,
+            self.messages_in - self._rolled_messages_in, self.messages_out - self._rolled_messages_out
+        )
+        self._rolled_bytes_in, self._rolled_bytes_out = self.bytes_in, self.bytes_out
+        self._rolled_messages_in, self._rolled_messages_out = self.messages_in, self.messages_out
+        return delta
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            'id': self.id, 'peer': self.peer, 'listener': self.listener, 'state': self.state,
+            'duration': self.duration, 'idle_time': self.idle_time,
+            'bytes_in': self.bytes_in, 'bytes_out': self.bytes_out,
+            'messages_in': self.messages_in, 'messages_out': self.messages_out, 'tls': self.tls
+        }
+
+    def __repr__(self) -> str:
+        return f"<Connection id={self.id} peer={self.peer} state={self.state}>"
@@ -0,0 +1,122 @@
+import time
+import asyncio
+from collections import Counter, deque
+from typing import Any, Dict, List, Optional
+
+
+class LoopLagMonitor:
+    """
+    Measures event-loop lag as timer drift.
+
+    A callback is scheduled ``interval`` seconds ahead with ``loop.call_at``; the
+    difference between the time it actually runs and the time it was due is
+    how long the loop was busy with other work. One timer handle at a time,
+    no task, so it is cheap enough to keep on in production.
+    """
+
+    def __init__(self, histogram, interval: float = 0.5):
+        self._histogram = histogram
+        self._interval = interval
+        self._handle: Optional[asyncio.TimerHandle] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._due = 0.0
+        self.last_lag = 0.0
+
+    def start(self):
+        if self._handle is not None:
+            return
+        self._loop = asyncio.get_running_loop()
+        self._schedule()
+
+    def stop(self):
+        if self._handle is not None:
+            self._handle.cancel()
+            self._handle = None
+
+    def _schedule(self):
+        self._due = self._loop.time() + self._interval
+        self._handle = self._loop.call_at(self._due, self._probe)
+
+    def _probe(self):
+        self.last_lag = max(0.0, self._loop.time() - self._due)
+        self._histogram.observe(self.last_lag)
+        self._schedule()
+
+
+# Loop -> detectors timing its callbacks; Handle._run is patched while any is active
+_slow_callback_detectors: Dict[asyncio.AbstractEventLoop, List['SlowCallbackDetector']] = {}
+_original_handle_run = asyncio.events.Handle._run
+
+
+def _timed_handle_run(handle: asyncio.Handle):
+    detectors = _slow_callback_detectors.get(handle._loop)
+    if not detectors:
+        return _original_handle_run(handle)
+    callback = handle._callback
+    started = time.perf_counter()
+    _original_handle_run(handle)
+    elapsed = time.perf_counter() - started
+    for detector in detectors:
+        if elapsed >= detector.threshold:
+            detector.record(callback, elapsed)
+
+
+class SlowCallbackDetector:
+    """
+    Records callbacks that block the loop for longer than ``threshold`` seconds.
+
+    While started, every callback run by the loop (``Handle._run``) is timed
+    with two ``perf_counter()`` calls; only the ones over the threshold are
+    described and recorded, and each sample names the task that blocked.
+    Unlike asyncio debug mode there is no coroutine origin tracking or
+    per-callback logging, so the overhead stays small enough to leave on.
+    """
+
+    def __init__(self, histogram, threshold: float, max_samples: int = 100):
+        self._histogram = histogram
+        self.threshold = threshold
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self.counts = Counter()
+        self.samples = deque(maxlen=max_samples)
+
+    def start(self):
+        if self._loop is not None:
+            return
+        self._loop = asyncio.get_running_loop()
+        if not _slow_callback_detectors:
+            asyncio.events.Handle._run = _timed_handle_run
+        _slow_callback_detectors.setdefault(self._loop, []).append(self)
+
+    def stop(self):
+        if self._loop is None:
+            return
+        detectors = _slow_callback_detectors[self._loop]
+        detectors.remove(self)
+        if not detectors:
+            del _slow_callback_detectors[self._loop]
+        if not _slow_callback_detectors:
+            asyncio.events.Handle._run = _original_handle_run
+        self._loop = None
+
+    def record(self, callback, duration: float):
+        name = self._describe(callback)
+        self._histogram.observe(duration)
+        self.counts[name] += 1
+        self.samples.append({'callback': name, 'duration': duration, 'timestamp': time.time()})
+
+    @staticmethod
+    def _describe(callback) -> str:
+        # Task steps and wakeups are bound to their task. Prefer an explicit
+        # task name (the server names handler tasks after the client handler),
+        # then the coroutine, then the callback itself.
+        task = getattr(callback, '__self__', None)
+        if isinstance(task, asyncio.Task):
+            name = task.get_name()
+            if not name.startswith('Task-'):
+                return name
+            coro = task.get_coro()
+            return getattr(coro, '__qualname__', None) or repr(coro)[:200]
+        return getattr(callback, '__qualname__', None) or repr(callback)[:200]
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {'by_callback': dict(self.counts), 'recent': [dict(sample) for sample in self.samples]}
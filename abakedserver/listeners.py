@@ -0,0 +1,195 @@
+import os
+import stat
+import socket
+import asyncio
+import logging
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from .utils import check_that
+
+logger = logging.getLogger('abakedserver')
+
+MAIN_LISTENER = 'main'
+LISTENER_KINDS = {'port': 'tcp', 'path': 'unix', 'fd': 'fd'}
+
+SOCKET_DEFAULTS = {
+    'backlog': 100,
+    'nodelay': None,
+    'keepalive': None,
+    'keepalive_idle': None,
+    'keepalive_interval': None,
+    'keepalive_count': None,
+    'rcvbuf': None,
+    'sndbuf': None,
+    'defer_accept': None,
+    'fastopen': None,
+}
+
+# (level, option, value, TCP only)
+SocketOption = Tuple[int, int, int, bool]
+
+
+def _option(level_name: str, option_name: str, value: int, tcp_only: bool) -> Optional[SocketOption]:
+    option = getattr(socket, option_name, None)
+    if option is None:
+        logger.warning("Socket option %s is not supported on this platform; ignoring it", option_name)
+        return None
+    return getattr(socket, level_name), option, int(value), tcp_only
+
+
+def validate_socket_config(socket_config: Optional[Dict]) -> Dict[str, Any]:
+    """Merge ``socket_config`` with SOCKET_DEFAULTS and validate every key."""
+    check_that(socket_config, 'is dict or none', "socket_config must be a dictionary or None")
+    config = {**SOCKET_DEFAULTS, **(socket_config or {})}
+    unknown = set(config) - set(SOCKET_DEFAULTS)
+    if unknown:
+        raise ValueError(f"Unknown socket_config keys: {sorted(unknown)}")
+    check_that(config['backlog'], 'is int', "backlog must be a positive integer")
+    check_that(config['backlog'], 'is positive', "backlog must be a positive integer")
+    check_that(config['nodelay'], 'is bool or none', "nodelay must be a boolean or None")
+    check_that(config['keepalive'], 'is bool or none', "keepalive must be a boolean or None")
+    for key in ('keepalive_idle', 'keepalive_interval', 'keepalive_count', 'rcvbuf', 'sndbuf', 'fastopen'):
+        check_that(config[key], 'is int or none', f"{key} must be a positive integer or None")
+        if config[key] is not None:
+            check_that(config[key], 'is positive', f"{key} must be a positive integer or None")
+    check_that(config['defer_accept'], 'is int or none', "defer_accept must be a non-negative integer or None")
+    if config['defer_accept'] is not None:
+        check_that(config['defer_accept'], 'is non-negative', "defer_accept must be a non-negative integer or None")
+    return config
+
+
+def listening_socket_options(config: Dict[str, Any]) -> List[SocketOption]:
+    """Options set on listening sockets before ``listen()``; buffers are inherited by accepted sockets."""
+    options = []
+    if config['rcvbuf'] is not None:
+        options.append(_option('SOL_SOCKET', 'SO_RCVBUF', config['rcvbuf'], False))
+    if config['sndbuf'] is not None:
+        options.append(_option('SOL_SOCKET', 'SO_SNDBUF', config['sndbuf'], False))
+    if config['defer_accept'] is not None:
+        options.append(_option('IPPROTO_TCP', 'TCP_DEFER_ACCEPT', config['defer_accept'], True))
+    if config['fastopen'] is not None:
+        options.append(_option('IPPROTO_TCP', 'TCP_FASTOPEN', config['fastopen'], True))
+    return [option for option in options if option is not None]
+
+
+def accepted_socket_options(config: Dict[str, Any]) -> List[SocketOption]:
+    """Options set on every accepted socket; empty unless the config asks for them."""
+    options = []
+    if config['nodelay'] is not None:
+        # asyncio enables TCP_NODELAY itself, so only False changes anything
+        options.append(_option('IPPROTO_TCP', 'TCP_NODELAY', config['nodelay'], True))
+    if config['keepalive'] is not None:
+        options.append(_option('SOL_SOCKET', 'SO_KEEPALIVE', config['keepalive'], False))
+    if config['keepalive']:
+        for key, name in (('keepalive_idle', 'TCP_KEEPIDLE'), ('keepalive_interval', 'TCP_KEEPINTVL'),
+                          ('keepalive_count', 'TCP_KEEPCNT')):
+            if config[key] is not None:
+                options.append(_option('IPPROTO_TCP', name, config[key], True))
+    return [option for option in options if option is not None]
+
+
+def apply_socket_options(sock, options: List[SocketOption]):
+    is_tcp = sock.family in (socket.AF_INET, socket.AF_INET6)
+    for level, option, value, tcp_only in options:
+        if tcp_only and not is_tcp:
+            continue
+        try:
+            sock.setsockopt(level, option, value)
+        except OSError as e:
+            logger.debug("setsockopt(%s, %s, %s) failed: %s", level, option, value, e)
+
+
+async def start_serving(server: asyncio.AbstractServer, options: List[SocketOption]) -> asyncio.AbstractServer:
+    """Apply listening options to a server created with ``start_serving=False``, then start it."""
+    try:
+        for sock in server.sockets:
+            apply_socket_options(sock, options)
+        await server.start_serving()
+    except BaseException:
+        server.close()
+        raise
+    return server
+
+
+def normalize_listener(spec: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Validate one entry of ``aBakedServer(listeners=[...])`` and fill in defaults.
+
+    An entry is a dict with exactly one of:
+
+    * ``port`` (and optional ``host``): a TCP listener; ``host`` may be an
+      IPv4 or IPv6 address or name, ``None`` binds all interfaces.
+    * ``path`` (and optional ``mode``): a Unix domain socket, chmod-ed to
+      ``mode`` after binding.
+    * ``fd``: an inherited, already-listening socket descriptor.
+
+    ``name`` sets the label used in metrics; it defaults to the endpoint.
+    ``tls`` chooses whether the server's ``tls_config`` applies to the
+    listener; it defaults to ``True`` except for Unix domain sockets.
+    """
+    check_that(spec, 'is dict or none', f"Each listener must be a dictionary, got {spec!r}")
+    keys = [key for key in LISTENER_KINDS if key in (spec or {})]
+    if len(keys) != 1:
+        raise ValueError(f"A listener must define exactly one of 'port', 'path' or 'fd', got {spec!r}")
+    kind = LISTENER_KINDS[keys[0]]
+    listener = {'kind': kind, **spec}
+
+    if kind == 'tcp':
+        listener.setdefault('host', None)
+        check_that(listener['host'], 'is string or none', "Listener host must be a string or None")
+        check_that(listener['port'], 'is int', "Listener port must be a non-negative integer")
+        check_that(listener['port'], 'is non-negative', "Listener port must be a non-negative integer")
+        default_name = f"tcp:{listener['host'] or '*'}:{listener['port']}"
+    elif kind == 'unix':
+        listener.setdefault('mode', None)
+        check_that(listener['path'], 'is not empty string', "Listener path must be a non-empty string")
+        check_that(listener['mode'], 'is int or none', "Listener mode must be an integer (e.g. 0o660) or None")
+        default_name = f"unix:{listener['path']}"
+    else:
+        check_that(listener['fd'], 'is int', "Listener fd must be an integer file descriptor")
+        default_name = f"fd:{listener['fd']}"
+
+    listener.setdefault('name', default_name)
+    listener.setdefault('tls', kind != 'unix')
+    check_that(listener['tls'], 'is bool', "Listener tls must be a boolean")
+    check_that(listener['name'], 'is not empty string', "Listener name must be a non-empty string")
+    if listener['name'] == MAIN_LISTENER:
+        raise ValueError(f"Listener name '{MAIN_LISTENER}' is reserved for the host/port listener")
+    return listener
+
+
+async def open_listener(listener: Dict[str, Any], handler: Callable,
+                        backlog: int = 100, options: Optional[List[SocketOption]] = None) -> asyncio.AbstractServer:
+    kind = listener['kind']
+    if kind == 'tcp':
+        server = await asyncio.start_server(handler, listener['host'], listener['port'],
+                                            backlog=backlog, start_serving=False)
+    elif kind == 'unix':
+        server = await asyncio.start_unix_server(handler, path=listener['path'],
+                                                 backlog=backlog, start_serving=False)
+        if listener['mode'] is not None:
+            try:
+                os.chmod(listener['path'], listener['mode'])
+            except BaseException:
+                server.close()
+                remove_unix_socket(listener)
+                raise
+    else:
+        server = await asyncio.start_server(handler, sock=socket.socket(fileno=listener['fd']),
+                                            backlog=backlog, start_serving=False)
+    return await start_serving(server, options or [])
+
+
+def remove_unix_socket(listener: Dict[str, Any]):
+    """Unlink a Unix socket file left behind by a closed listener."""
+    if listener['kind'] != 'unix':
+        return
+    try:
+        if stat.S_ISSOCK(os.stat(listener['path']).st_mode):
+            os.unlink(listener['path'])
+    except FileNotFoundError:
+        pass
+
+
+def server_addresses(server: asyncio.AbstractServer) -> List[Any]:
+    return [sock.getsockname() for sock in (server.sockets or ())]
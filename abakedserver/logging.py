@@ -1,6 +1,15 @@
 import logging
 import logging.handlers
+import queue
 import sys
+import time
+from typing import Any, Dict, Optional
+
+DROP_POLICIES = ('drop_new', 'drop_old')
+
+_async_pipelines: Dict[str, 'AsyncLoggingPipeline'] = {}
+_rate_limited_loggers: Dict[str, 'RateLimitedLogger'] = {}
+
 
 def configure_logger(name: str) -> logging.Logger:
     """
@@ -13,7 +22,7 @@ def configure_logger(name: str) -> logging.Logger:
         logging.Logger: Configured logger instance.
     """
     logger = logging.getLogger(name)
-    if not logger.handlers:
+    if not _configured_handlers(logger):
         logger.setLevel(logging.DEBUG)
         file_handler = logging.handlers.RotatingFileHandler(
             'abakedserver.log', maxBytes=10*1024*1024, backupCount=5
@@ -28,3 +37,306 @@ def configure_logger(name: str) -> logging.Logger:
         logger.addHandler(console_handler)
     return logger
 
+
+def _configured_handlers(logger: logging.Logger) -> list:
+    return [h for h in logger.handlers if not isinstance(h, logging.NullHandler)]
+
+
+def configure_logging(name: str = 'abakedserver', level: Any = logging.INFO,
+                      log_file: Optional[str] = None, console: bool = True,
+                      max_bytes: int = 10*1024*1024, backup_count: int = 5,
+                      fmt: str = '%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+                      async_logging: bool = False, queue_size: int = 10000,
+                      drop_policy: str = 'drop_new') -> logging.Logger:
+    """
+    Explicitly configure the package logger.
+
+    Importing abakedserver never touches handlers or the filesystem; the package
+    logger only carries a ``NullHandler`` until this function is called (directly
+    or through ``aBakedServer(logging_config=...)``). Calling it again replaces
+    the handlers installed by the previous call.
+
+    Args:
+        name (str): Logger name. Defaults to 'abakedserver'.
+        level: Logger level (int or level name). Defaults to INFO.
+        log_file (str, optional): Path of a rotating log file. No file is created if None.
+        console (bool): Whether to log to stdout. Defaults to True.
+        max_bytes (int): Rotation size of the log file.
+        backup_count (int): Number of rotated log files to keep.
+        fmt (str): Record format.
+        async_logging (bool): Route the handlers through ``enable_async_logging``.
+        queue_size (int): Queue size for the async pipeline.
+        drop_policy (str): Overflow policy for the async pipeline.
+
+    Returns:
+        logging.Logger: Configured logger instance.
+    """
+    logger = logging.getLogger(name)
+    disable_async_logging(name)
+    for handler in _configured_handlers(logger):
+        logger.removeHandler(handler)
+        handler.close()
+    if isinstance(level, str):
+        level = logging.getLevelName(level.upper())
+    logger.setLevel(level)
+    formatter = logging.Formatter(fmt)
+    if log_file is not None:
+        file_handler = logging.handlers.RotatingFileHandler(
+            log_file, maxBytes=max_bytes, backupCount=backup_count
+        )
+        file_handler.setFormatter(formatter)
+        logger.addHandler(file_handler)
+    if console:
+        console_handler = logging.StreamHandler(sys.stdout)
+        console_handler.setFormatter(formatter)
+        logger.addHandler(console_handler)
+    if async_logging:
+        enable_async_logging(name, queue_size=queue_size, drop_policy=drop_policy)
+    return logger
+
+
+class _BoundedQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler that never blocks the caller and counts what it drops."""
+
+    def __init__(self, log_queue: queue.Queue, pipeline: 'AsyncLoggingPipeline'):
+        super().__init__(log_queue)
+        self._pipeline = pipeline
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Only merge args (cheap) and render tracebacks, which must not outlive
+        # the frame; timestamps, layout and I/O happen on the listener thread.
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord):
+        # Every record ends up counted once as emitted or dropped; queued counts
+        # those that entered the queue, including ones evicted later by drop_old.
+        pipeline = self._pipeline
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            if pipeline.drop_policy == 'drop_old':
+                try:
+                    self.queue.get_nowait()
+                except queue.Empty:
+                    pass
+                else:
+                    pipeline.dropped += 1
+                try:
+                    self.queue.put_nowait(record)
+                except queue.Full:
+                    pass
+                else:
+                    pipeline.queued += 1
+                    return
+            pipeline.dropped += 1
+            return
+        pipeline.queued += 1
+
+
+class _CountingQueueListener(logging.handlers.QueueListener):
+    def __init__(self, log_queue: queue.Queue, pipeline: 'AsyncLoggingPipeline', *handlers):
+        super().__init__(log_queue, *handlers, respect_handler_level=True)
+        self._pipeline = pipeline
+
+    def handle(self, record: logging.LogRecord):
+        super().handle(record)
+        self._pipeline.emitted += 1
+
+    def enqueue_sentinel(self):
+        # The base class uses put_nowait(), which raises queue.Full on a full
+        # bounded queue; wait for the listener thread to free a slot instead.
+        self.queue.put(self._sentinel)
+
+
+class AsyncLoggingPipeline:
+    """
+    Moves a logger's handlers behind a bounded queue served by a background thread.
+
+    The calling thread (usually the event loop) only enqueues the record; when
+    the queue is full the record is dropped according to ``drop_policy``
+    (``'drop_new'`` discards the incoming record, ``'drop_old'`` the oldest
+    queued one) instead of blocking. Use enable_async_logging() to create one.
+    """
+
+    def __init__(self, logger: logging.Logger, queue_size: int = 10000, drop_policy: str = 'drop_new'):
+        if drop_policy not in DROP_POLICIES:
+            raise ValueError(f"drop_policy must be one of {DROP_POLICIES}, got {drop_policy}")
+        self.logger = logger
+        self.drop_policy = drop_policy
+        self.queue_size = queue_size
+        self.queued = self.emitted = self.dropped = 0
+        self._queue: queue.Queue = queue.Queue(maxsize=queue_size)
+        self._handlers = list(logger.handlers)
+        self._queue_handler = _BoundedQueueHandler(self._queue, self)
+        self._listener = _CountingQueueListener(self._queue, self, *self._handlers)
+
+    def start(self):
+        for handler in self._handlers:
+            self.logger.removeHandler(handler)
+        self.logger.addHandler(self._queue_handler)
+        self._listener.start()
+
+    def stop(self):
+        """Flush queued records and put the original handlers back."""
+        self.logger.removeHandler(self._queue_handler)
+        try:
+            self._listener.stop()
+        finally:
+            for handler in self._handlers:
+                self.logger.addHandler(handler)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'queued': self.queued, 'emitted': self.emitted, 'dropped': self.dropped,
+            'pending': self._queue.qsize(), 'queue_size': self.queue_size,
+            'drop_policy': self.drop_policy
+        }
+
+
+def enable_async_logging(name: str = 'abakedserver', queue_size: int = 10000,
+                         drop_policy: str = 'drop_new') -> AsyncLoggingPipeline:
+    """
+    Switch a logger to non-blocking, queue-based output.
+
+    Args:
+        name (str): Logger name whose current handlers are moved to the background thread.
+        queue_size (int): Maximum number of records waiting to be written.
+        drop_policy (str): ``'drop_new'`` or ``'drop_old'`` when the queue is full.
+
+    Returns:
+        AsyncLoggingPipeline: The running pipeline; calling again returns it unchanged.
+    """
+    if name in _async_pipelines:
+        return _async_pipelines[name]
+    pipeline = AsyncLoggingPipeline(logging.getLogger(name), queue_size, drop_policy)
+    pipeline.start()
+    _async_pipelines[name] = pipeline
+    return pipeline
+
+
+def disable_async_logging(name: str = 'abakedserver'):
+    pipeline = _async_pipelines.pop(name, None)
+    if pipeline is not None:
+        pipeline.stop()
+
+
+def get_async_logging(name: str = 'abakedserver') -> Optional[AsyncLoggingPipeline]:
+    return _async_pipelines.get(name)
+
+
+class RateLimitedLogger:
+    """
+    Token-bucket rate limiting and deduplication for repetitive log messages.
+
+    Each message key (e.g. ``'idle_timeout'``) gets its own bucket of ``burst``
+    tokens refilled at ``rate`` per second. Messages that find the bucket empty
+    are counted instead of logged, and a single "N similar messages suppressed"
+    line is emitted per key when the key is allowed to log again or at least
+    every ``summary_interval`` seconds, whichever comes first.
+    """
+
+    def __init__(self, logger: logging.Logger, rate: float = 1.0, burst: int = 10,
+                 summary_interval: float = 10.0, max_keys: int = 1024):
+        self.logger = logger
+        self.rate = rate
+        self.burst = burst
+        self.summary_interval = summary_interval
+        self.max_keys = max_keys
+        # key -> [tokens, last refill, suppressed count, level of suppressed messages]
+        self._buckets: Dict[str, list] = {}
+        self._last_summary = time.monotonic()
+
+    def log(self, level: int, key: str, msg: str, *args, **kwargs) -> bool:
+        """
+        Log ``msg`` under ``key`` if its bucket allows it.
+
+        Returns:
+            bool: True if the message was emitted, False if it was suppressed.
+        """
+        if not self.logger.isEnabledFor(level):
+            return False
+        now = time.monotonic()
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            if len(self._buckets) >= self.max_keys:
+                self._evict_oldest()
+            bucket = self._buckets[key] = [float(self.burst), now, 0, level]
+        else:
+            bucket[0] = min(float(self.burst), bucket[0] + (now - bucket[1]) * self.rate)
+            bucket[1] = now
+
+        self.flush_if_due(now)
+
+        if bucket[0] < 1.0:
+            bucket[2] += 1
+            bucket[3] = max(bucket[3], level)
+            return False
+        bucket[0] -= 1.0
+        if bucket[2]:
+            self._summarize(key, bucket)
+        self.logger.log(level, msg, *args, **kwargs)
+        return True
+
+    def debug(self, key: str, msg: str, *args, **kwargs) -> bool:
+        return self.log(logging.DEBUG, key, msg, *args, **kwargs)
+
+    def info(self, key: str, msg: str, *args, **kwargs) -> bool:
+        return self.log(logging.INFO, key, msg, *args, **kwargs)
+
+    def warning(self, key: str, msg: str, *args, **kwargs) -> bool:
+        return self.log(logging.WARNING, key, msg, *args, **kwargs)
+
+    def error(self, key: str, msg: str, *args, **kwargs) -> bool:
+        return self.log(logging.ERROR, key, msg, *args, **kwargs)
+
+    def flush_if_due(self, now: Optional[float] = None) -> bool:
+        """
+        Flush summaries if ``summary_interval`` has passed since the last flush.
+
+        Called from ``log()`` and periodically by aBakedServer, so summaries
+        appear even when no more messages are logged.
+
+        Returns:
+            bool: True if a flush was due.
+        """
+        if (time.monotonic() if now is None else now) - self._last_summary < self.summary_interval:
+            return False
+        self.flush()
+        return True
+
+    def flush(self):
+        """Emit pending "suppressed" summaries for all keys."""
+        self._last_summary = time.monotonic()
+        for key, bucket in self._buckets.items():
+            if bucket[2]:
+                self._summarize(key, bucket)
+
+    def suppressed(self) -> Dict[str, int]:
+        return {key: bucket[2] for key, bucket in self._buckets.items() if bucket[2]}
+
+    def _summarize(self, key: str, bucket: list):
+        self.logger.log(bucket[3], "%d similar messages suppressed [%s]", bucket[2], key)
+        bucket[2] = 0
+
+    def _evict_oldest(self):
+        key = next(iter(self._buckets))
+        bucket = self._buckets.pop(key)
+        if bucket[2]:
+            self._summarize(key, bucket)
+
+
+def get_rate_limited_logger(name: str = 'abakedserver', **kwargs) -> RateLimitedLogger:
+    """
+    Return the shared RateLimitedLogger for ``name``, creating it on first use.
+
+    Keyword arguments (``rate``, ``burst``, ``summary_interval``, ``max_keys``)
+    only apply when the instance is created.
+    """
+    if name not in _rate_limited_loggers:
+        _rate_limited_loggers[name] = RateLimitedLogger(logging.getLogger(name), **kwargs)
+    return _rate_limited_loggers[name]
@@ -1,10 +1,128 @@
+import math
+import time
+import heapq
 import asyncio
+import logging
+from bisect import bisect_left
+from collections import Counter, deque
 from datetime import datetime
-from typing import Dict, Optional, List, Any
+from typing import Dict, Optional, List, Any, Mapping, Callable
 from copy import deepcopy
-from .logging import configure_logger
+from .diagnostics import LoopLagMonitor, SlowCallbackDetector
+from .shared_metrics import SharedMetricsSegment, SharedMetricsSlot, set_path
+from .statsd import StatsdExporter
+from .utils import check_that
+
+logger = logging.getLogger('abakedserver')
+
+DEFAULT_RATE_WINDOWS = {'1m': 60.0, '5m': 300.0, '15m': 900.0}
+RATE_SERIES = ('connections', 'rejections', 'reconnects', 'errors')
+# Keys get_metrics() adds on top of the rolled-up counters; gauges may not shadow them
+SNAPSHOT_KEYS = frozenset({
+    'labels', 'histograms', 'connection_errors', 'connection_error_rates',
+    'recent_errors', 'rates', 'load_average', 'workers'
+})
+DEFAULT_LATENCY_BUCKETS = (
+    0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0
+)
+
+
+class Histogram:
+    """
+    Fixed-bucket histogram of non-negative values (seconds by default).
+
+    observe() is a bisect plus a few integer updates, so it can be called from
+    the hot path without the metrics lock. Quantiles are estimated as the upper
+    bound of the bucket that contains them.
+    """
+    __slots__ = ('bounds', 'counts', 'count', 'sum', 'max')
+
+    def __init__(self, bounds=DEFAULT_LATENCY_BUCKETS):
+        self.bounds = tuple(sorted(bounds))
+        self.reset()
+
+    def reset(self):
+        self.counts = [0] * (len(self.bounds) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.sum += value
+        if value > self.max:
+            self.max = value
+
+    def quantile(self, q: float) -> float:
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for i, bucket_count in enumerate(self.counts):
+            seen += bucket_count
+            if seen >= rank and bucket_count:
+                return self.bounds[i] if i < len(self.bounds) else self.max
+        return self.max
+
+    def snapshot(self) -> Dict[str, Any]:
+        cumulative, buckets = 0, {}
+        for bound, bucket_count in zip(self.bounds, self.counts):
+            cumulative += bucket_count
+            buckets[bound] = cumulative
+        buckets['+Inf'] = self.count
+        return {
+            'count': self.count, 'sum': self.sum, 'max': self.max,
+            'mean': self.sum / self.count if self.count else 0.0,
+            'p50': self.quantile(0.5), 'p90': self.quantile(0.9), 'p99': self.quantile(0.99),
+            'buckets': buckets
+        }
+
+
+class RateWindow:
+    """
+    Ring buffer of per-tick event counts with running sums for several windows.
+
+    push() is O(number of windows): each window's sum gains the new bucket and
+    loses the one that just slid out of it. EWMA rates use the same decay as
+    Unix load averages (``exp(-tick / window)``).
+    """
+    __slots__ = ('_tick', '_spans', '_buckets', '_head', '_filled', '_sums', '_decay', '_ewma')
+
+    def __init__(self, tick: float, windows: Dict[str, float]):
+        self._tick = tick
+        self._spans = {name: max(1, round(seconds / tick)) for name, seconds in windows.items()}
+        self._buckets = [0] * max(self._spans.values())
+        self._head = 0
+        self._filled = 0
+        self._sums = dict.fromkeys(windows, 0)
+        self._decay = {name: math.exp(-tick / seconds) for name, seconds in windows.items()}
+        self._ewma = dict.fromkeys(windows, 0.0)
+
+    def push(self, count: int):
+        size = len(self._buckets)
+        for name, span in self._spans.items():
+            if self._filled >= span:
+                self._sums[name] -= self._buckets[(self._head - span) % size]
+            self._sums[name] += count
+        self._buckets[self._head] = count
+        self._head = (self._head + 1) % size
+        self._filled = min(self._filled + 1, size)
+
+        rate = count / self._tick
+        for name, decay in self._decay.items():
+            self._ewma[name] = self._ewma[name] * decay + rate * (1.0 - decay)
+
+    def rates(self) -> Dict[str, float]:
+        """Events per second over each window (or the part of it seen so far)."""
+        return {
+            name: self._sums[name] / (min(self._filled, span) * self._tick) if self._filled else 0.0
+            for name, span in self._spans.items()
+        }
+
+    def ewma(self) -> Dict[str, float]:
+        return dict(self._ewma)
 
-logger = configure_logger('abakedserver')
 
 class MetricsManager:
     def __init__(self, host: str, port: int, use_ssh: bool, ssh_host: str, metrics_config: Dict):
@@ -13,11 +131,24 @@ class MetricsManager:
         self._metrics_interval = metrics_config.get('interval', 1.0)
         self._max_connection_durations = metrics_config.get('max_durations', 1000)
         self._duration_retention_strategy = metrics_config.get('retention_strategy', 'recent')
+        self._top_talkers = metrics_config.get('top_talkers', 10)
+        self._error_rate_window = metrics_config.get('error_rate_window', 60.0)
+        self._max_error_samples = metrics_config.get('max_error_samples', 100)
+        self._rate_windows = metrics_config.get('rate_windows', DEFAULT_RATE_WINDOWS)
+        self._loop_lag_interval = metrics_config.get('loop_lag_interval', 0.5)
+        self._slow_callback_threshold = metrics_config.get('slow_callback_threshold')
+        shared_memory = metrics_config.get('shared_memory')
+        statsd = metrics_config.get('statsd')
+        check_that(statsd, 'is dict or none', "statsd must be a dictionary or None")
 
         self.lock = asyncio.Lock()
         self._metrics_task = None
         self._running = False
         self._start_time: Optional[datetime] = None
+        self._connections: Optional[Mapping] = None
+        self._gauges: Dict[str, Callable[[], Any]] = {}
+        self._histograms: Dict[str, Histogram] = {}
+        self._last_tick: Optional[float] = None
         
         self._metrics_labels = {
             'host': str(host), 'port': str(port),
@@ -26,31 +157,150 @@ class MetricsManager:
         }
         self._metrics = self._get_initial_metrics_state()
         self._pending_metrics = self._get_initial_pending_state()
+        self._reset_error_state()
+        self._reset_rate_windows()
+
+        self._loop_monitor = self._slow_callbacks = None
+        if self._loop_lag_interval:
+            self._loop_monitor = LoopLagMonitor(self.histogram('event_loop_lag_seconds'), self._loop_lag_interval)
+            self.register_gauge('event_loop_lag', lambda: self._loop_monitor.last_lag)
+        if self._slow_callback_threshold:
+            self._slow_callbacks = SlowCallbackDetector(self.histogram('slow_callback_seconds'),
+                                                        self._slow_callback_threshold)
+            self.register_gauge('slow_callbacks', self._slow_callbacks.snapshot)
+
+        self._shared_slot: Optional[SharedMetricsSlot] = None
+        if shared_memory is not None:
+            check_that(shared_memory, 'is dict or none', "shared_memory must be a dictionary or None")
+            check_that(shared_memory.get('name'), 'is not empty string', "shared_memory name must be a non-empty string")
+            check_that(shared_memory.get('worker'), 'is int', "shared_memory worker must be a non-negative integer")
+            check_that(shared_memory.get('worker'), 'is non-negative', "shared_memory worker must be a non-negative integer")
+            segment = SharedMetricsSegment.attach(shared_memory['name'])
+            try:
+                self._shared_slot = SharedMetricsSlot(segment, shared_memory['worker'])
+            except ValueError:
+                segment.close()
+                raise
+
+        self._statsd: Optional[StatsdExporter] = None
+        if statsd is not None:
+            self._statsd = StatsdExporter(**statsd)
+            self.register_gauge('statsd', self._statsd.stats)
+
+    def _reset_rate_windows(self):
+        self._rates = {series: RateWindow(self._metrics_interval, self._rate_windows) for series in RATE_SERIES}
+
+    def _reset_error_state(self):
+        # Errors live outside self._metrics: totals per type, a window of
+        # per-tick counters for rates and a bounded ring of recent samples.
+        window_ticks = max(1, round(self._error_rate_window / self._metrics_interval))
+        self._error_counts = Counter()
+        self._error_window = deque(maxlen=window_ticks)
+        self._error_window_counts = Counter()
+        self._error_samples = deque(maxlen=self._max_error_samples)
 
     def _get_initial_metrics_state(self):
         return {
-            'connections_total': 0, 'active_connections': 0,
-            'connection_errors': [], 'ssh_reconnects_total': 0,
+            'connections_total': 0,
+            'ssh_reconnects_total': 0,
             'ssh_reconnect_successes_total': 0, 'connection_durations': [],
             'connection_stats': {'mean': 0.0, 'max': 0.0, 'count': 0},
             'uptime_seconds': 0.0, 'metrics_task_health': {'restarts': 0},
-            'rejected_connections_total': 0
+            'rejected_connections_total': 0,
+            'drained_connections_total': 0, 'killed_connections_total': 0,
+            'aborted_connections_total': 0,
+            'teardown_stats': {'mean': 0.0, 'max': 0.0, 'count': 0, 'seconds': 0.0},
+            'bytes_in_total': 0, 'bytes_out_total': 0,
+            'messages_in_total': 0, 'messages_out_total': 0,
+            'throughput': {
+                'bytes_in_per_sec': 0.0, 'bytes_out_per_sec': 0.0,
+                'messages_in_per_sec': 0.0, 'messages_out_per_sec': 0.0
+            },
+            'top_talkers': [],
+            'broadcasts_total': 0, 'broadcast_deliveries_total': 0,
+            'broadcast_skipped_total': 0, 'broadcast_disconnected_total': 0,
+            'broadcast_bytes_total': 0,
+            'listeners': {},
+            'tls': {'handshakes_total': 0, 'resumed_total': 0, 'failures_total': 0, 'resumption_rate': 0.0}
         }
 
     def _get_initial_pending_state(self):
         return {
-            'total': 0, 'active_delta': 0, 'errors': [], 'reconnects': 0,
-            'reconnect_successes': 0, 'durations': [], 'rejected': 0
+            'total': 0, 'errors': Counter(), 'reconnects': 0,
+            'reconnect_successes': 0, 'durations': [], 'rejected': 0,
+            'bytes_in': 0, 'bytes_out': 0, 'messages_in': 0, 'messages_out': 0,
+            'listener_connections': Counter(), 'listener_rejections': Counter()
         }
 
+    def register_gauge(self, name: str, callback: Callable[[], Any]):
+        """
+        Register a live gauge read through ``callback()`` at snapshot time.
+
+        Gauges cost nothing on the hot path: the owner keeps its own state and
+        get_metrics() asks for the current value, so it is never stale.
+
+        Args:
+            name (str): Key under which the value appears in get_metrics().
+            callback: Synchronous, cheap callable returning the current value.
+
+        Raises:
+            ValueError: If ``name`` is already a gauge or a built-in metric.
+        """
+        if name in self._gauges or name in self._metrics or name in SNAPSHOT_KEYS:
+            raise ValueError(f"Metric name {name!r} is already in use")
+        self._gauges[name] = callback
+
+    def histogram(self, name: str, bounds=None) -> Histogram:
+        """
+        Get or create a named histogram exported under ``histograms`` in get_metrics().
+
+        Callers keep the returned object and call ``observe()`` on it directly.
+        """
+        if name not in self._histograms:
+            self._histograms[name] = Histogram(bounds or DEFAULT_LATENCY_BUCKETS)
+        return self._histograms[name]
+
+    def unregister_gauge(self, name: str):
+        self._gauges.pop(name, None)
+
+    def read_gauges(self) -> Dict[str, Any]:
+        values = {}
+        for name, callback in self._gauges.items():
+            try:
+                values[name] = callback()
+            except Exception as e:
+                logger.debug("Gauge %s failed: %s", name, e)
+                values[name] = None
+        return values
+
+    def track_connections(self, connections: Mapping):
+        """
+        Attach the server's live registry of Connection records.
+
+        Traffic of still-open connections is rolled up from it on every tick;
+        closed connections are rolled up by record_connection().
+        """
+        self._connections = connections
+
     async def start(self):
         self._running = True
         self._start_time = datetime.now()
+        self._last_tick = time.monotonic()
         if not self._metrics_task or self._metrics_task.done():
             self._metrics_task = asyncio.create_task(self._update_metrics_periodically())
+        if self._loop_monitor:
+            self._loop_monitor.start()
+        if self._slow_callbacks:
+            self._slow_callbacks.start()
+        if self._statsd:
+            await self._connect_statsd()
 
     async def stop(self):
         self._running = False
+        if self._loop_monitor:
+            self._loop_monitor.stop()
+        if self._slow_callbacks:
+            self._slow_callbacks.stop()
         if self._metrics_task:
             self._metrics_task.cancel()
             try:
@@ -58,20 +308,86 @@ class MetricsManager:
             except asyncio.CancelledError:
                 pass
         self._metrics_task = None
+        if self._shared_slot:
+            async with self.lock:
+                self._publish_shared()
+        if self._statsd:
+            async with self.lock:
+                self._flush_statsd()
+            self._statsd.close()
 
-    async def get_metrics(self) -> Dict[str, Any]:
+    async def get_metrics(self, aggregate: bool = False) -> Dict[str, Any]:
+        """
+        Snapshot of the metrics.
+
+        With ``aggregate=True`` the shared counters and histograms are summed
+        over every worker attached to the ``shared_memory`` segment; all
+        other values stay local to this process.
+        """
+        if aggregate and self._shared_slot is None:
+            raise RuntimeError("get_metrics(aggregate=True) requires metrics_config['shared_memory']")
         async with self.lock:
             # Update uptime before returning
             if self._start_time:
                 self._metrics['uptime_seconds'] = (datetime.now() - self._start_time).total_seconds()
             metrics_copy = deepcopy(self._metrics)
             metrics_copy['labels'] = self._metrics_labels
+            metrics_copy.update(self.read_gauges())
+            metrics_copy['histograms'] = {name: h.snapshot() for name, h in self._histograms.items()}
+            metrics_copy['connection_errors'] = dict(self._error_counts)
+            metrics_copy['connection_error_rates'] = self._get_error_rates()
+            metrics_copy['recent_errors'] = [dict(sample) for sample in self._error_samples]
+            metrics_copy['rates'] = {series: window.rates() for series, window in self._rates.items()}
+            metrics_copy['load_average'] = {series: window.ewma() for series, window in self._rates.items()}
+            if aggregate:
+                self._publish_shared()
+                totals = self._shared_slot.segment.aggregate()
+                for path, value in totals['counters'].items():
+                    set_path(metrics_copy, path, value)
+                for name, histogram in totals['histograms'].items():
+                    metrics_copy['histograms'][name] = histogram.snapshot()
+                metrics_copy['workers'] = totals['workers']
             return metrics_copy
 
+    async def _connect_statsd(self):
+        try:
+            await self._statsd.connect()
+        except OSError as e:
+            # Retried on the next tick; until then flushed lines count as dropped
+            logger.warning("Cannot open StatsD socket to %s:%s: %s", self._statsd.host, self._statsd.port, e)
+
+    def _flush_statsd(self):
+        # Called under the lock once per tick; only non-blocking sendto() calls
+        try:
+            self._statsd.flush(self._metrics, self.read_gauges(), self._histograms)
+        except Exception as e:
+            logger.warning("Failed to push metrics to StatsD: %s", e)
+
+    def _publish_shared(self):
+        # Called under the lock: copies cumulative values into this worker's slot
+        try:
+            self._shared_slot.publish(self._metrics, self._histograms)
+        except Exception as e:
+            logger.warning("Failed to publish metrics to shared memory: %s", e)
+
+    def _get_error_rates(self) -> Dict[str, float]:
+        span = len(self._error_window) * self._metrics_interval
+        if not span:
+            return {}
+        return {name: count / span for name, count in self._error_window_counts.items()}
+
     async def reset_metrics(self):
         async with self.lock:
+            if self._shared_slot:
+                # Fold the local totals into the slot so fleet-wide counters keep growing
+                self._publish_shared()
+                self._shared_slot.rebase()
             self._metrics = self._get_initial_metrics_state()
             self._pending_metrics = self._get_initial_pending_state()
+            self._reset_error_state()
+            self._reset_rate_windows()
+            for histogram in self._histograms.values():
+                histogram.reset()
         self._start_time = datetime.now()
         logger.info("Metrics reset successfully")
 
@@ -84,23 +400,126 @@ class MetricsManager:
             if success:
                 self._pending_metrics['reconnect_successes'] += 1
 
-    async def record_connection(self, duration: float, errors: List[str]):
+    async def record_connection(self, duration: float, errors: List[str], conn=None):
         async with self.lock:
             self._pending_metrics['total'] += 1
             self._pending_metrics['durations'].append(duration)
-            self._pending_metrics['errors'].extend(errors)
+            self._pending_metrics['errors'].update(errors)
+            if conn is not None:
+                self._add_traffic(conn.take_traffic_delta())
+                if conn.listener is not None:
+                    self._pending_metrics['listener_connections'][conn.listener] += 1
+            if errors:
+                peer = conn.peer if conn is not None else None
+                timestamp = time.time()
+                self._error_samples.extend(
+                    {'type': name, 'peer': peer, 'timestamp': timestamp} for name in errors
+                )
+
+    def _add_traffic(self, delta):
+        pending = self._pending_metrics
+        pending['bytes_in'] += delta[0]
+        pending['bytes_out'] += delta[1]
+        pending['messages_in'] += delta[2]
+        pending['messages_out'] += delta[3]
+
+    def _roll_up_traffic(self, elapsed: float):
+        # Called under the lock on each tick
+        if self._connections:
+            for conn in self._connections.values():
+                self._add_traffic(conn.take_traffic_delta())
+            top = heapq.nlargest(self._top_talkers, self._connections.values(),
+                                 key=lambda c: c.bytes_in + c.bytes_out)
+            self._metrics['top_talkers'] = [
+                {'id': c.id, 'peer': c.peer, 'bytes_in': c.bytes_in, 'bytes_out': c.bytes_out,
+                 'messages_in': c.messages_in, 'messages_out': c.messages_out}
+                for c in top
+            ]
+        else:
+            self._metrics['top_talkers'] = []
+
+        pending = self._pending_metrics
+        for field in ('bytes_in', 'bytes_out', 'messages_in', 'messages_out'):
+            self._metrics[f'{field}_total'] += pending[field]
+            self._metrics['throughput'][f'{field}_per_sec'] = pending[field] / elapsed if elapsed > 0 else 0.0
+
+    async def record_shutdown(self, drained: int, killed: int):
+        # Shutdown happens once, right before stop(), so write straight to the
+        # aggregated state instead of waiting for the next tick.
+        async with self.lock:
+            self._metrics['drained_connections_total'] += drained
+            self._metrics['killed_connections_total'] += killed
 
-    async def record_rejection(self):
+    async def record_teardown(self, latencies: List[float], aborted: int, elapsed: float):
+        async with self.lock:
+            self._metrics['aborted_connections_total'] += aborted
+            self._metrics['teardown_stats'] = {
+                'mean': sum(latencies) / len(latencies) if latencies else 0.0,
+                'max': max(latencies, default=0.0),
+                'count': len(latencies),
+                'seconds': elapsed
+            }
+
+    def record_broadcast(self, delivered: int, skipped: int, disconnected: int, nbytes: int):
+        # Called synchronously from broadcast(); nothing here yields, so the
+        # counters cannot interleave with a tick and go straight to _metrics.
+        metrics = self._metrics
+        metrics['broadcasts_total'] += 1
+        metrics['broadcast_deliveries_total'] += delivered
+        metrics['broadcast_skipped_total'] += skipped
+        metrics['broadcast_disconnected_total'] += disconnected
+        metrics['broadcast_bytes_total'] += nbytes
+
+    def record_tls_handshake(self, seconds: Optional[float], resumed: bool = False):
+        # Synchronous for the same reason as record_broadcast(); ``seconds`` is
+        # None for a failed handshake.
+        tls = self._metrics['tls']
+        if seconds is None:
+            tls['failures_total'] += 1
+            return
+        tls['handshakes_total'] += 1
+        tls['resumed_total'] += resumed
+        tls['resumption_rate'] = tls['resumed_total'] / tls['handshakes_total']
+        self.histogram('tls_handshake_seconds').observe(seconds)
+
+    async def record_rejection(self, listener: Optional[str] = None):
         async with self.lock:
             self._pending_metrics['rejected'] += 1
+            if listener is not None:
+                self._pending_metrics['listener_rejections'][listener] += 1
+
+    def _roll_up_listeners(self):
+        pending = self._pending_metrics
+        for field, counts in (('connections_total', pending['listener_connections']),
+                              ('rejected_total', pending['listener_rejections'])):
+            for listener, count in counts.items():
+                stats = self._metrics['listeners'].setdefault(
+                    listener, {'connections_total': 0, 'rejected_total': 0})
+                stats[field] += count
+
+    def _roll_up_errors(self, tick_errors: Counter):
+        # O(number of error types) per tick regardless of the error volume
+        self._error_counts.update(tick_errors)
+        if len(self._error_window) == self._error_window.maxlen:
+            expired = self._error_window[0]
+            self._error_window_counts.subtract(expired)
+            for name in expired:
+                if self._error_window_counts[name] <= 0:
+                    del self._error_window_counts[name]
+        self._error_window.append(tick_errors)
+        self._error_window_counts.update(tick_errors)
 
     async def _update_metrics_periodically(self):
         while self._running:
             try:
                 await asyncio.sleep(self._metrics_interval)
+                if self._statsd and not self._statsd.connected:
+                    await self._connect_statsd()
                 async with self.lock:
+                    now = time.monotonic()
+                    self._roll_up_traffic(now - self._last_tick)
+                    self._last_tick = now
                     self._metrics['connections_total'] += self._pending_metrics['total']
-                    self._metrics['active_connections'] += self._pending_metrics['active_delta']
                     self._metrics['rejected_connections_total'] += self._pending_metrics['rejected']
                     self._metrics['ssh_reconnects_total'] += self._pending_metrics['reconnects']
                     self._metrics['ssh_reconnect_successes_total'] += self._pending_metrics['reconnect_successes']
@@ -122,11 +541,18 @@ class MetricsManager:
                             combined = self._metrics['connection_durations'] + durations
                             self._metrics['connection_durations'] = combined[-self._max_connection_durations:]
                     
-                    if self._pending_metrics['errors']:
-                         self._metrics['connection_errors'].extend(self._pending_metrics['errors'])
-                         self._metrics['connection_errors'] = self._metrics['connection_errors'][-1000:] # Limit stored errors
+                    self._roll_up_errors(self._pending_metrics['errors'])
+                    self._roll_up_listeners()
+                    self._rates['connections'].push(self._pending_metrics['total'])
+                    self._rates['rejections'].push(self._pending_metrics['rejected'])
+                    self._rates['reconnects'].push(self._pending_metrics['reconnects'])
+                    self._rates['errors'].push(sum(self._pending_metrics['errors'].values()))
                     
                     self._pending_metrics = self._get_initial_pending_state()
+                    if self._shared_slot:
+                        self._publish_shared()
+                    if self._statsd:
+                        self._flush_statsd()
 
             except asyncio.CancelledError:
                 break
@@ -0,0 +1,238 @@
+import time
+import struct
+import asyncio
+import inspect
+import logging
+from typing import Awaitable, Callable, Dict, Optional, Set, Tuple, Union
+
+from .cache import ResponseCache
+from .utils import check_that
+
+logger = logging.getLogger('abakedserver')
+
+FRAMINGS = ('line', 'length', 'tagged')
+IN_FLIGHT_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128, 256, 512, 1024)
+
+_LENGTH = struct.Struct('!I')
+_TAGGED = struct.Struct('!II')
+
+Response = Union[bytes, bytearray, memoryview, str, None]
+RequestHandler = Callable[[bytes], Union[Response, Awaitable[Response]]]
+
+
+class FrameError(ValueError):
+    """A request frame violates the pipeline's framing (e.g. exceeds max_frame_size)."""
+
+
+class RequestPipeline:
+    """
+    Client handler that reads framed requests ahead and serves them concurrently.
+
+    Each connection gets a window of ``max_in_flight`` requests: the reader
+    keeps decoding frames and starting ``handler(request)`` tasks until the
+    window is full, and a single responder writes the responses back. A slot
+    is freed only after its response has been written and drained, so a client
+    that stops reading stalls the reader instead of growing buffers.
+
+    Framings:
+
+    * ``'line'``: requests and responses end with ``delimiter``. Lines are
+      bounded by the StreamReader limit (64 KiB by default).
+    * ``'length'``: a 4-byte big-endian length prefix.
+    * ``'tagged'``: a 4-byte tag and a 4-byte length; each response carries
+      the tag of its request, so clients can match out-of-order responses.
+
+    With ``ordered=True`` (the default except for ``'tagged'``) responses are
+    written in request order; otherwise each is written as soon as it is
+    ready. A handler may return ``None`` to send nothing. If the handler
+    raises, ``on_error(request, exc)`` supplies the response; without
+    ``on_error`` the exception closes the connection. With a ``cache``
+    (a ``ResponseCache``), repeated requests are answered from it and
+    concurrent identical requests share one handler call.
+
+    Use it as the server's client handler, typically via
+    ``aBakedServer.pipeline()`` which also wires up metrics.
+    """
+
+    def __init__(self, handler: RequestHandler, framing: str = 'line', max_in_flight: int = 16,
+                 ordered: Optional[bool] = None, delimiter: bytes = b'\n',
+                 max_frame_size: int = 1024 * 1024, encoding: str = 'utf-8',
+                 on_error: Optional[Callable[[bytes, Exception], Response]] = None,
+                 cache: Optional[ResponseCache] = None, metrics=None, name: str = 'pipeline'):
+        if not callable(handler):
+            raise ValueError("handler must be callable")
+        if framing not in FRAMINGS:
+            raise ValueError(f"framing must be one of {FRAMINGS}, got {framing!r}")
+        check_that(max_in_flight, 'is int', "max_in_flight must be a positive integer")
+        check_that(max_in_flight, 'is positive', "max_in_flight must be a positive integer")
+        check_that(ordered, 'is bool or none', "ordered must be a boolean or None")
+        if not isinstance(delimiter, bytes) or not delimiter:
+            raise ValueError("delimiter must be non-empty bytes")
+        check_that(max_frame_size, 'is int', "max_frame_size must be a positive integer")
+        check_that(max_frame_size, 'is positive', "max_frame_size must be a positive integer")
+        check_that(name, 'is not empty string', "name must be a non-empty string")
+
+        self.handler = handler
+        self.framing = framing
+        self.max_in_flight = max_in_flight
+        self.ordered = framing != 'tagged' if ordered is None else ordered
+        self.delimiter = delimiter
+        self.max_frame_size = max_frame_size
+        self.encoding = encoding
+        self.on_error = on_error
+        self.cache = cache
+        self.name = name
+
+        self._connections = 0
+        self._in_flight = 0
+        self._requests = 0
+        self._errors = 0
+        self._window_full = 0
+        self._depth_histogram = self._latency_histogram = None
+        if metrics is not None:
+            metrics.register_gauge(name, self.stats)  # first: rejects a name already in use
+            self._depth_histogram = metrics.histogram(f'{name}_in_flight', IN_FLIGHT_BUCKETS)
+            self._latency_histogram = metrics.histogram(f'{name}_request_seconds')
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            'connections': self._connections, 'in_flight': self._in_flight,
+            'requests_total': self._requests, 'errors_total': self._errors,
+            'window_full_total': self._window_full,
+        }
+
+    async def __call__(self, reader, writer):
+        self._connections += 1
+        conn = _PipelinedConnection(self, reader, writer)
+        try:
+            await conn.run()
+        finally:
+            self._connections -= 1
+
+    async def read_frame(self, reader) -> Optional[Tuple[int, bytes]]:
+        """Return ``(tag, request)``, or ``None`` at end of stream."""
+        # An idle timeout in the stream wrappers also surfaces as b''
+        try:
+            if self.framing == 'line':
+                line = await reader.readuntil(self.delimiter)
+                return (0, line[:-len(self.delimiter)]) if line else None
+            header_size = _TAGGED.size if self.framing == 'tagged' else _LENGTH.size
+            header = await reader.readexactly(header_size)
+            if not header:
+                return None
+            tag, length = _TAGGED.unpack(header) if self.framing == 'tagged' else (0, *_LENGTH.unpack(header))
+            if length > self.max_frame_size:
+                raise FrameError(f"Request frame of {length} bytes exceeds max_frame_size ({self.max_frame_size})")
+            if not length:
+                return tag, b''
+            payload = await reader.readexactly(length)
+            return (tag, payload) if payload else None
+        except asyncio.IncompleteReadError:
+            # EOF, possibly in the middle of a frame; a partial request is dropped
+            return None
+        except asyncio.LimitOverrunError as e:
+            raise FrameError(f"Request line exceeds the stream limit: {e}") from e
+
+    def encode_frame(self, tag: int, response: Response) -> bytes:
+        data = response.encode(self.encoding) if isinstance(response, str) else bytes(response)
+        if self.framing == 'line':
+            return data + self.delimiter
+        if self.framing == 'length':
+            return _LENGTH.pack(len(data)) + data
+        return _TAGGED.pack(tag, len(data)) + data
+
+    def __repr__(self) -> str:
+        return (f"<RequestPipeline {self.name!r} framing={self.framing} max_in_flight={self.max_in_flight} "
+                f"ordered={self.ordered} in_flight={self._in_flight}>")
+
+
+class _PipelinedConnection:
+    """Reader and responder coroutines sharing one connection's window."""
+
+    __slots__ = ('pipeline', 'reader', 'writer', 'window', 'responses', 'tasks', 'depth')
+
+    def __init__(self, pipeline: RequestPipeline, reader, writer):
+        self.pipeline = pipeline
+        self.reader = reader
+        self.writer = writer
+        self.window = asyncio.Semaphore(pipeline.max_in_flight)
+        self.responses: asyncio.Queue = asyncio.Queue()
+        self.tasks: Set[asyncio.Task] = set()
+        self.depth = 0
+
+    async def run(self):
+        reading = asyncio.ensure_future(self.read_requests())
+        responding = asyncio.ensure_future(self.write_responses())
+        try:
+            await asyncio.wait((reading, responding), return_when=asyncio.FIRST_EXCEPTION)
+            for task in (reading, responding):
+                if task.done() and not task.cancelled() and task.exception() is not None:
+                    raise task.exception()
+        finally:
+            for task in (reading, responding, *self.tasks):
+                task.cancel()
+            self.pipeline._in_flight -= self.depth
+            self.depth = 0
+
+    async def read_requests(self):
+        pipeline = self.pipeline
+        depth_histogram = pipeline._depth_histogram
+        while True:
+            frame = await pipeline.read_frame(self.reader)
+            if frame is None:
+                break
+            if self.window.locked():
+                pipeline._window_full += 1
+            await self.window.acquire()
+            tag, request = frame
+            task = asyncio.ensure_future(self.call_handler(request))
+            self.tasks.add(task)
+            task.add_done_callback(self.tasks.discard)
+            item = (tag, request, time.monotonic(), task)
+            if pipeline.ordered:
+                self.responses.put_nowait(item)
+            else:
+                task.add_done_callback(lambda _, item=item: self.responses.put_nowait(item))
+            self.depth += 1
+            pipeline._in_flight += 1
+            pipeline._requests += 1
+            if depth_histogram is not None:
+                depth_histogram.observe(self.depth)
+
+        # End of requests: let in-flight responses go out, then stop the responder
+        if not self.pipeline.ordered and self.tasks:
+            await asyncio.wait(tuple(self.tasks))
+        self.responses.put_nowait(None)
+
+    async def call_handler(self, request: bytes) -> Response:
+        if self.pipeline.cache is not None:
+            return await self.pipeline.cache.get_or_compute(request, self.pipeline.handler)
+        response = self.pipeline.handler(request)
+        if inspect.isawaitable(response):
+            response = await response
+        return response
+
+    async def write_responses(self):
+        pipeline = self.pipeline
+        latency_histogram = pipeline._latency_histogram
+        while True:
+            item = await self.responses.get()
+            if item is None:
+                return
+            tag, request, received, task = item
+            try:
+                response = await task
+            except Exception as e:
+                pipeline._errors += 1
+                if pipeline.on_error is None:
+                    raise
+                logger.debug("Pipeline %r handler failed: %s", pipeline.name, e)
+                response = pipeline.on_error(request, e)
+            if response is not None:
+                self.writer.write(pipeline.encode_frame(tag, response))
+                await self.writer.drain()
+            self.depth -= 1
+            pipeline._in_flight -= 1
+            self.window.release()
+            if latency_histogram is not None:
+                latency_histogram.observe(time.monotonic() - received)
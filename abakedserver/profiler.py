@@ -0,0 +1,114 @@
+import os
+import sys
+import time
+import asyncio
+import logging
+import threading
+from collections import Counter
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger('abakedserver')
+
+
+class SamplingProfiler:
+    """
+    Low-frequency stack sampler for the event-loop thread.
+
+    A daemon thread wakes up every ``interval`` seconds, grabs the loop thread's
+    current frame via ``sys._current_frames()`` and counts the collapsed stack.
+    Samples taken while a task is running are rooted at ``handler:<task name>``;
+    the server names handler tasks after the client handler, so time is
+    attributed to connection handlers. The current task is read before and
+    after the stack walk; if the loop switched tasks in between, the sample
+    is skipped rather than attributed to the wrong handler. Output uses the collapsed-stack format
+    understood by flamegraph.pl and speedscope.
+
+    Overhead: each sample holds the GIL for one stack walk (tens of
+    microseconds for typical depths), so the default 100 Hz costs well under
+    1% of one core. ``stats()['overhead_ratio']`` reports the measured share.
+    """
+
+    def __init__(self, interval: float = 0.01, loop: Optional[asyncio.AbstractEventLoop] = None,
+                 thread_id: Optional[int] = None):
+        self._interval = interval
+        self._loop = loop
+        self._thread_id = thread_id if thread_id is not None else threading.get_ident()
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._started_at = 0.0
+        self._stopped_at = 0.0
+        self._sampling_time = 0.0
+        self.samples = Counter()
+        self.skipped = 0
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None
+
+    def start(self):
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._started_at = time.monotonic()
+        self._thread = threading.Thread(target=self._run, name='abakedserver-profiler', daemon=True)
+        self._thread.start()
+        logger.info("Sampling profiler started at %.0f Hz", 1 / self._interval)
+
+    def stop(self):
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._thread.join()
+        self._thread = None
+        self._stopped_at = time.monotonic()
+        logger.info("Sampling profiler stopped after %d samples", sum(self.samples.values()))
+
+    def _run(self):
+        while not self._stop.wait(self._interval):
+            started = time.perf_counter()
+            task = self._current_task()
+            frame = sys._current_frames().get(self._thread_id)
+            if frame is not None:
+                stack = self._collapse(frame, task)
+                # The GIL may have switched to the loop thread during the walk
+                if self._current_task() is task:
+                    self.samples[stack] += 1
+                else:
+                    self.skipped += 1
+            del frame
+            self._sampling_time += time.perf_counter() - started
+
+    def _current_task(self) -> Optional[asyncio.Task]:
+        return asyncio.current_task(self._loop) if self._loop is not None else None
+
+    @staticmethod
+    def _collapse(frame, task: Optional[asyncio.Task]) -> str:
+        stack = []
+        while frame is not None:
+            code = frame.f_code
+            stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+            frame = frame.f_back
+        if task is not None:
+            stack.append(f"handler:{task.get_name()}")
+        stack.reverse()
+        return ';'.join(stack)
+
+    def collapsed(self) -> str:
+        """Return samples as ``frame;frame;frame count`` lines."""
+        return ''.join(f"{stack} {count}\n" for stack, count in self.samples.most_common())
+
+    def write_collapsed(self, path: str):
+        with open(path, 'w') as f:
+            f.write(self.collapsed())
+
+    def stats(self) -> Dict[str, Any]:
+        end = time.monotonic() if self.running else self._stopped_at
+        wall = max(end - self._started_at, 1e-9) if self._started_at else 0.0
+        return {
+            'running': self.running,
+            'interval': self._interval,
+            'samples': sum(self.samples.values()),
+            'skipped_samples': self.skipped,
+            'wall_seconds': wall,
+            'overhead_ratio': self._sampling_time / wall if wall else 0.0
+        }
@@ -0,0 +1,306 @@
+import os
+import json
+import time
+import logging
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Sequence, Tuple
+
+from .utils import check_that
+
+logger = logging.getLogger('abakedserver')
+
+MAGIC = 0x61624B4D45545231  # identifies a metrics segment; written last by create()
+VERSION = 1
+HEADER_WORDS = 8        # magic, version, workers, slot_words, schema_bytes, reserved...
+SLOT_HEADER_WORDS = 4   # seq, pid, updated_ns, reserved
+READ_RETRIES = 100
+
+# Top-level (or dotted, for nested dicts) integer counters of get_metrics()
+DEFAULT_SHARED_COUNTERS = (
+    'connections_total', 'rejected_connections_total',
+    'drained_connections_total', 'killed_connections_total', 'aborted_connections_total',
+    'bytes_in_total', 'bytes_out_total', 'messages_in_total', 'messages_out_total',
+    'ssh_reconnects_total', 'ssh_reconnect_successes_total',
+    'broadcasts_total', 'broadcast_deliveries_total', 'broadcast_skipped_total',
+    'broadcast_disconnected_total', 'broadcast_bytes_total',
+    'tls.handshakes_total', 'tls.resumed_total', 'tls.failures_total',
+)
+
+
+def _shared_memory(name: Optional[str], create: bool, size: int = 0):
+    from multiprocessing import shared_memory
+    if create:
+        return shared_memory.SharedMemory(name=name, create=True, size=size)
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)  # Python 3.13+
+    except TypeError:
+        pass
+    # Before 3.13 every attaching process registers the segment with the
+    # resource tracker, which unlinks it when that process exits. Unregistering
+    # afterwards would also drop the creator's registration if it is the same
+    # tracker, so skip the registration instead.
+    from multiprocessing import resource_tracker
+    register = resource_tracker.register
+    resource_tracker.register = lambda name, rtype: None if rtype == 'shared_memory' else register(name, rtype)
+    try:
+        return shared_memory.SharedMemory(name=name)
+    finally:
+        resource_tracker.register = register
+
+
+def get_path(metrics: Mapping, path: str) -> Any:
+    value = metrics
+    for key in path.split('.'):
+        value = value[key]
+    return value
+
+
+def set_path(metrics: Dict, path: str, value: Any):
+    *parents, leaf = path.split('.')
+    for key in parents:
+        metrics = metrics.setdefault(key, {})
+    metrics[leaf] = value
+
+
+class SharedMetricsSegment:
+    """
+    Fixed-layout metrics segment in shared memory with one slot per worker.
+
+    The segment starts with a header and a JSON schema (counter paths and
+    histogram bucket bounds), so any process can attach by name alone. Each
+    worker owns one slot and is its only writer; it publishes cumulative
+    counters and histogram buckets there, guarded by a per-slot sequence
+    number. Readers never lock: they copy a slot, and retry if its sequence
+    number was odd or changed meanwhile.
+
+    A supervisor creates the segment before starting workers::
+
+        segment = SharedMetricsSegment.create('myapp-metrics', workers=4,
+                                              histograms={'pipeline_request_seconds': None})
+
+    Workers attach through ``metrics_config={'shared_memory': {'name':
+    'myapp-metrics', 'worker': i}}``, and anyone reads the totals with
+    ``segment.read_metrics()`` or ``MetricsManager.get_metrics(aggregate=True)``.
+    The creator calls ``close()`` and ``unlink()`` when done.
+    """
+
+    def __init__(self, shm, created: bool):
+        self._shm = shm
+        self._closed = False
+        self.created = created
+        self._q = shm.buf.cast('q')
+        self._d = shm.buf.cast('d')
+        q = self._q
+        if q[0] != MAGIC or q[1] != VERSION:
+            self.close()
+            raise ValueError(f"Shared memory segment {shm.name!r} is not an aBakedServer metrics segment")
+        self.workers, self.slot_words, schema_bytes = q[2], q[3], q[4]
+        schema = json.loads(bytes(shm.buf[HEADER_WORDS * 8:HEADER_WORDS * 8 + schema_bytes]))
+        self.counters: Tuple[str, ...] = tuple(schema['counters'])
+        self.histograms: Dict[str, Tuple[float, ...]] = {name: tuple(bounds) for name, bounds in schema['histograms']}
+        self._slots_offset = HEADER_WORDS + (schema_bytes + 7) // 8
+        # Offsets (in words, relative to a slot) of each histogram: buckets..., count, sum, max
+        self._histogram_offsets: Dict[str, int] = {}
+        offset = SLOT_HEADER_WORDS + len(self.counters)
+        for name, bounds in self.histograms.items():
+            self._histogram_offsets[name] = offset
+            offset += len(bounds) + 4
+
+    @classmethod
+    def create(cls, name: Optional[str] = None, workers: int = 1,
+               counters: Iterable[str] = DEFAULT_SHARED_COUNTERS,
+               histograms: Optional[Mapping[str, Optional[Sequence[float]]]] = None) -> 'SharedMetricsSegment':
+        """
+        Create a segment for ``workers`` slots.
+
+        Args:
+            name: Shared memory name; a random one is chosen if ``None``.
+            workers: Number of worker slots.
+            counters: Counter paths into get_metrics(), dotted for nested dicts.
+            histograms: Histogram name -> bucket bounds (``None`` for the
+                default latency buckets). Workers publish a histogram only if
+                their local one has the same bounds.
+        """
+        from .metrics import DEFAULT_LATENCY_BUCKETS
+        check_that(workers, 'is int', "workers must be a positive integer")
+        check_that(workers, 'is positive', "workers must be a positive integer")
+        counters = list(counters)
+        histogram_list = [[hist_name, list(bounds or DEFAULT_LATENCY_BUCKETS)]
+                          for hist_name, bounds in (histograms or {}).items()]
+        schema = json.dumps({'counters': counters, 'histograms': histogram_list}).encode()
+        slot_words = SLOT_HEADER_WORDS + len(counters) + sum(len(bounds) + 4 for _, bounds in histogram_list)
+        size = 8 * (HEADER_WORDS + (len(schema) + 7) // 8 + workers * slot_words)
+
+        shm = _shared_memory(name, create=True, size=size)
+        shm.buf[HEADER_WORDS * 8:HEADER_WORDS * 8 + len(schema)] = schema
+        header = shm.buf.cast('q')
+        header[1], header[2], header[3], header[4] = VERSION, workers, slot_words, len(schema)
+        header[0] = MAGIC  # last, so attachers reject a half-initialised segment
+        header.release()
+        return cls(shm, created=True)
+
+    @classmethod
+    def attach(cls, name: str) -> 'SharedMetricsSegment':
+        return cls(_shared_memory(name, create=False), created=False)
+
+    @property
+    def name(self) -> str:
+        return self._shm.name
+
+    def _slot_base(self, worker: int) -> int:
+        if not 0 <= worker < self.workers:
+            raise ValueError(f"worker must be in 0..{self.workers - 1}, got {worker}")
+        return self._slots_offset + worker * self.slot_words
+
+    def read_slot(self, worker: int) -> Optional[Dict[str, Any]]:
+        """Consistent copy of one worker's slot, or ``None`` if it was never claimed."""
+        base = self._slot_base(worker)
+        end = base + self.slot_words
+        q, d = self._q, self._d
+        for _ in range(READ_RETRIES):
+            seq = q[base]
+            if seq & 1:
+                time.sleep(0)
+                continue
+            words = q[base:end].tolist()
+            floats = d[base:end].tolist()
+            if q[base] == seq:
+                break
+        else:
+            raise RuntimeError(f"Worker slot {worker} kept changing while being read")
+        if not words[1]:
+            return None
+        counters = dict(zip(self.counters, words[SLOT_HEADER_WORDS:SLOT_HEADER_WORDS + len(self.counters)]))
+        histograms = {}
+        for name, offset in self._histogram_offsets.items():
+            n = len(self.histograms[name]) + 1
+            histograms[name] = {
+                'counts': words[offset:offset + n], 'count': words[offset + n],
+                'sum': floats[offset + n + 1], 'max': floats[offset + n + 2],
+            }
+        return {'worker': worker, 'pid': words[1], 'updated_ns': words[2],
+                'counters': counters, 'histograms': histograms}
+
+    def write_slot(self, worker: int, pid: int, counters: Sequence[int],
+                   histograms: Mapping[str, Tuple[Sequence[int], int, float, float]]):
+        """Publish one worker's values; only that worker may call this for its slot."""
+        base = self._slot_base(worker)
+        q, d = self._q, self._d
+        q[base] += 1  # odd: write in progress
+        q[base + 1] = pid
+        start = base + SLOT_HEADER_WORDS
+        for i, value in enumerate(counters):
+            q[start + i] = value
+        for name, (counts, count, total, maximum) in histograms.items():
+            offset = base + self._histogram_offsets[name]
+            for i, value in enumerate(counts):
+                q[offset + i] = value
+            n = len(counts)
+            q[offset + n] = count
+            d[offset + n + 1] = total
+            d[offset + n + 2] = maximum
+        q[base + 2] = time.time_ns()
+        q[base] += 1
+
+    def aggregate(self) -> Dict[str, Any]:
+        """Sum every claimed slot: ``{'workers', 'counters', 'histograms'}``."""
+        from .metrics import Histogram
+        counters = dict.fromkeys(self.counters, 0)
+        histograms = {name: Histogram(bounds) for name, bounds in self.histograms.items()}
+        workers = 0
+        for worker in range(self.workers):
+            slot = self.read_slot(worker)
+            if slot is None:
+                continue
+            workers += 1
+            for path, value in slot['counters'].items():
+                counters[path] += value
+            for name, values in slot['histograms'].items():
+                histogram = histograms[name]
+                histogram.counts = [a + b for a, b in zip(histogram.counts, values['counts'])]
+                histogram.count += values['count']
+                histogram.sum += values['sum']
+                histogram.max = max(histogram.max, values['max'])
+        return {'workers': workers, 'counters': counters, 'histograms': histograms}
+
+    def read_metrics(self) -> Dict[str, Any]:
+        """Summed counters and histogram snapshots, laid out as in get_metrics()."""
+        totals = self.aggregate()
+        result: Dict[str, Any] = {}
+        for path, value in totals['counters'].items():
+            set_path(result, path, value)
+        result['histograms'] = {name: h.snapshot() for name, h in totals['histograms'].items()}
+        result['workers'] = totals['workers']
+        return result
+
+    def close(self):
+        """Unmap the segment in this process; other processes are unaffected."""
+        if self._closed:
+            return
+        self._closed = True
+        # The typed views must go before the mapping can be closed
+        self._q.release()
+        self._d.release()
+        self._shm.close()
+
+    def unlink(self):
+        """Destroy the segment once every process has closed it (creator only)."""
+        self._shm.unlink()
+
+    def __del__(self):
+        if not getattr(self, '_closed', True):
+            self.close()
+
+    def __repr__(self) -> str:
+        return f"<SharedMetricsSegment workers={self.workers} counters={len(self.counters)} histograms={len(self.histograms)}>"
+
+
+class SharedMetricsSlot:
+    """
+    A worker's claim on one slot of a SharedMetricsSegment.
+
+    Values left in the slot by a previous process (e.g. a restarted worker)
+    become the base that this process's totals are added to, so the
+    fleet-wide counters never go backwards.
+    """
+
+    def __init__(self, segment: SharedMetricsSegment, worker: int):
+        self.segment = segment
+        self.worker = worker
+        self.pid = os.getpid()
+        self._mismatched: set = set()
+        self.rebase()
+
+    def rebase(self):
+        """Take the slot's current values as the base for the local totals (e.g. after a local reset)."""
+        previous = self.segment.read_slot(self.worker)
+        self._base_counters: List[int] = [previous['counters'][path] if previous else 0
+                                          for path in self.segment.counters]
+        self._base_histograms = previous['histograms'] if previous else {}
+
+    def publish(self, metrics: Mapping[str, Any], histograms: Mapping[str, Any]):
+        """Write this process's cumulative ``metrics`` and ``histograms`` into the slot."""
+        segment = self.segment
+        counters = []
+        for path, base in zip(segment.counters, self._base_counters):
+            try:
+                counters.append(base + int(get_path(metrics, path)))
+            except (KeyError, TypeError, ValueError):
+                counters.append(base)
+        published = {}
+        for name, bounds in segment.histograms.items():
+            histogram = histograms.get(name)
+            if histogram is not None and histogram.bounds != bounds:
+                if name not in self._mismatched:
+                    self._mismatched.add(name)
+                    logger.warning("Histogram %s has different bounds than the shared segment; not published", name)
+                histogram = None
+            base = self._base_histograms.get(name)
+            counts = list(base['counts']) if base else [0] * (len(bounds) + 1)
+            count, total, maximum = (base['count'], base['sum'], base['max']) if base else (0, 0.0, 0.0)
+            if histogram is not None:
+                counts = [a + b for a, b in zip(counts, histogram.counts)]
+                count += histogram.count
+                total += histogram.sum
+                maximum = max(maximum, histogram.max)
+            published[name] = (counts, count, total, maximum)
+        segment.write_slot(self.worker, self.pid, counters, published)
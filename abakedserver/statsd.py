@@ -0,0 +1,173 @@
+import asyncio
+import logging
+from typing import Any, Dict, Iterable, List, Mapping, Optional
+
+from .shared_metrics import DEFAULT_SHARED_COUNTERS, get_path
+from .utils import check_that
+
+logger = logging.getLogger('abakedserver')
+
+# Characters with a meaning in the StatsD line protocol
+_NAME_TRANSLATION = str.maketrans({c: '_' for c in ':|@#,\n '})
+_TAG_TRANSLATION = str.maketrans({c: '_' for c in '|,\n'})
+
+
+def _format_value(value) -> str:
+    return str(value) if isinstance(value, int) else f'{value:.6g}'
+
+
+class _StatsdProtocol(asyncio.DatagramProtocol):
+    def __init__(self, exporter: 'StatsdExporter'):
+        self.exporter = exporter
+
+    def error_received(self, exc: Exception):
+        # e.g. ECONNREFUSED from an earlier datagram when no agent listens
+        self.exporter._errors += 1
+        logger.debug("StatsD datagram failed: %s", exc)
+
+
+class StatsdExporter:
+    """
+    Pushes metrics to a StatsD/DogStatsD agent over UDP once per metrics tick.
+
+    Everything is aggregated in-process between flushes: a counter becomes one
+    ``|c`` line with its increase since the previous flush, a histogram one
+    line per bucket that received samples (``|ms`` in milliseconds for
+    ``*_seconds`` histograms, ``|h`` otherwise) whose sample rate ``1/k`` makes
+    the agent count the ``k`` samples of that bucket, and numeric gauges
+    become ``|g`` lines. Lines are packed into datagrams of at most
+    ``max_packet_size`` bytes. Sending is a non-blocking ``sendto()`` on a
+    datagram transport; if the socket backs up past ``max_buffer`` bytes
+    the packet is dropped rather than queued.
+
+    Enable it with ``metrics_config={'statsd': {...}}``; the options are the
+    keyword arguments of this class.
+    """
+
+    def __init__(self, host: str = '127.0.0.1', port: int = 8125, prefix: Optional[str] = 'abakedserver',
+                 tags: Optional[Mapping[str, Any]] = None, max_packet_size: int = 1432,
+                 max_buffer: int = 64 * 1024, counters: Iterable[str] = DEFAULT_SHARED_COUNTERS,
+                 gauges: bool = True, histograms: bool = True):
+        check_that(host, 'is not empty string', "statsd host must be a non-empty string")
+        check_that(port, 'is int', "statsd port must be an integer in 1..65535")
+        if not 0 < port < 65536:
+            raise ValueError("statsd port must be an integer in 1..65535")
+        check_that(prefix, 'is string or none', "statsd prefix must be a string or None")
+        check_that(tags, 'is dict or none', "statsd tags must be a dictionary or None")
+        check_that(max_packet_size, 'is int', "statsd max_packet_size must be an integer of at least 64")
+        if max_packet_size < 64:
+            raise ValueError("statsd max_packet_size must be an integer of at least 64")
+        check_that(max_buffer, 'is non-negative', "statsd max_buffer must be a non-negative number of bytes")
+        check_that(gauges, 'is bool', "statsd gauges must be a boolean")
+        check_that(histograms, 'is bool', "statsd histograms must be a boolean")
+
+        self.host = host
+        self.port = port
+        self.prefix = f'{prefix.translate(_NAME_TRANSLATION)}.' if prefix else ''
+        self.tags = '|#' + ','.join(f'{k}:{v}'.translate(_TAG_TRANSLATION) for k, v in tags.items()) if tags else ''
+        self.max_packet_size = max_packet_size
+        self.max_buffer = max_buffer
+        self.counters = tuple(counters)
+        self.gauges = gauges
+        self.histograms = histograms
+
+        self._transport: Optional[asyncio.DatagramTransport] = None
+        self._last_counters: Dict[str, int] = {}
+        self._last_buckets: Dict[str, List[int]] = {}
+        self._packets = self._lines = self._dropped = self._errors = 0
+
+    @property
+    def connected(self) -> bool:
+        return self._transport is not None and not self._transport.is_closing()
+
+    def stats(self) -> Dict[str, int]:
+        return {'packets_total': self._packets, 'lines_total': self._lines,
+                'dropped_total': self._dropped, 'errors_total': self._errors}
+
+    async def connect(self):
+        """Open the UDP socket; resolving ``host`` is the only step that waits."""
+        if not self.connected:
+            self._transport, _ = await asyncio.get_running_loop().create_datagram_endpoint(
+                lambda: _StatsdProtocol(self), remote_addr=(self.host, self.port))
+
+    def close(self):
+        if self._transport is not None:
+            self._transport.close()
+            self._transport = None
+
+    def _line(self, name: str, value, kind: str, rate: str = '') -> bytes:
+        return f'{self.prefix}{name.translate(_NAME_TRANSLATION)}:{_format_value(value)}|{kind}{rate}{self.tags}'.encode()
+
+    def collect(self, metrics: Mapping[str, Any], gauges: Mapping[str, Any], histograms: Mapping[str, Any]) -> List[bytes]:
+        """Lines for everything that changed since the previous call."""
+        lines = []
+        for path in self.counters:
+            try:
+                value = int(get_path(metrics, path))
+            except (KeyError, TypeError, ValueError):
+                continue
+            last = self._last_counters.get(path, 0)
+            self._last_counters[path] = value
+            delta = value - last if value >= last else value  # a reset starts over
+            if delta:
+                lines.append(self._line(path, delta, 'c'))
+
+        if self.gauges:
+            for name, value in gauges.items():
+                items = value.items() if isinstance(value, dict) else ((None, value),)
+                for key, item in items:
+                    if isinstance(item, (int, float)) and not isinstance(item, bool):
+                        lines.append(self._line(name if key is None else f'{name}.{key}', item, 'g'))
+
+        if self.histograms:
+            for name, histogram in histograms.items():
+                lines.extend(self._histogram_lines(name, histogram))
+        return lines
+
+    def _histogram_lines(self, name: str, histogram) -> List[bytes]:
+        counts = histogram.counts
+        last = self._last_buckets.get(name)
+        if last is None or len(last) != len(counts) or sum(last) > histogram.count:
+            last = [0] * len(counts)
+        self._last_buckets[name] = list(counts)
+        timer = name.endswith('_seconds')
+        lines = []
+        for i, (now, before) in enumerate(zip(counts, last)):
+            samples = now - before
+            if samples <= 0:
+                continue
+            value = histogram.bounds[i] if i < len(histogram.bounds) else histogram.max
+            rate = f'|@{1 / samples:.6g}' if samples > 1 else ''
+            lines.append(self._line(name, value * 1000 if timer else value, 'ms' if timer else 'h', rate))
+        return lines
+
+    def send(self, lines: List[bytes]):
+        """Pack ``lines`` into as few datagrams as ``max_packet_size`` allows and send them."""
+        if not self.connected:
+            self._dropped += len(lines)
+            return
+        packet, size = [], 0
+        for line in lines:
+            # A line that alone exceeds the limit still goes out in its own datagram
+            if packet and size + 1 + len(line) > self.max_packet_size:
+                self._send_packet(packet)
+                packet, size = [], 0
+            size += len(line) + (1 if packet else 0)
+            packet.append(line)
+        if packet:
+            self._send_packet(packet)
+
+    def _send_packet(self, lines: List[bytes]):
+        if self._transport.get_write_buffer_size() > self.max_buffer:
+            self._dropped += len(lines)
+            return
+        self._transport.sendto(b'\n'.join(lines))
+        self._packets += 1
+        self._lines += len(lines)
+
+    def flush(self, metrics: Mapping[str, Any], gauges: Mapping[str, Any], histograms: Mapping[str, Any]):
+        self.send(self.collect(metrics, gauges, histograms))
+
+    def __repr__(self) -> str:
+        return (f"<StatsdExporter {self.host}:{self.port} prefix={self.prefix!r} "
+                f"connected={self.connected} packets={self._packets}>")
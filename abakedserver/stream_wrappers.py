@@ -1,16 +1,40 @@
 # abakedserver/stream_wrappers.py
 
+import os
+import mmap
+import time
 import asyncio
 import inspect
-import asyncssh
-from .logging import configure_logger
+from .logging import get_rate_limited_logger
 
-logger = configure_logger('abakedserver')
+sampled_logger = get_rate_limited_logger('abakedserver')
+
+# sendfile() hands the kernel this much per loop.sendfile() call so traffic
+# accounting and last_activity advance during long transfers
+SENDFILE_SEGMENT = 4 * 1024 * 1024
+# Write size of the mmap fallback; each chunk is drained before the next
+SENDFILE_CHUNK = 256 * 1024
+
+
+# asyncio.timeout() cancels only the awaited read and, unlike wait_for() before
+# Python 3.12, does not wrap it in a Task. Older Pythons fall back to wait_for().
+_read_deadline = getattr(asyncio, 'timeout', None)
+
+
+async def _ensure_ssh_connection(server, method_name):
+    if server.use_ssh and server.conn and server.conn.is_closed():
+        if server.ssh_config.get('reconnect_on_disconnect'):
+            sampled_logger.warning('ssh_reconnect', "SSH connection closed; attempting to reconnect before %s()", method_name)
+            await server._reconnect_tunnel()
+        else:
+            import asyncssh  # already loaded in SSH mode
+            raise asyncssh.DisconnectError(11, "SSH connection is closed and reconnect is disabled")  # 11 = SSH_DISCONNECT_BY_APPLICATION
 
 
 class WrappedSSHMeta(type):
     EXCLUDE_METHODS = {'is_closing', 'close', 'wait_closed', 'at_eof'}
     READ_METHODS_WITH_TIMEOUT = {'read', 'readline', 'readuntil', 'readexactly'}
+    WRITE_METHODS = {'write', 'writelines'}
 
     def __new__(mcs, name, bases, dct):
         target_base = None
@@ -32,16 +56,26 @@ class WrappedSSHMeta(type):
 
     @staticmethod
     def _make_proxy(method_name, method_impl):
+        # Traffic accounting only touches plain ints on the Connection record
+        is_read = method_name in WrappedSSHMeta.READ_METHODS_WITH_TIMEOUT
+        is_write = method_name in WrappedSSHMeta.WRITE_METHODS
+        # Tracing hooks fired by this method, if any (see aBakedServer.add_hook)
+        if is_read:
+            hook_event = 'on_read'
+        elif is_write or method_name == 'drain':
+            hook_event = 'on_write'
+        else:
+            hook_event = None
+
         if inspect.iscoroutinefunction(method_impl):
             async def async_proxy(self, *args, **kwargs):
                 # 1. Логика SSH-переподключения СОХРАНЕНА
-                if self._server.use_ssh and self._server.conn and self._server.conn.is_closed():
-                    if self._server.ssh_config.get('reconnect_on_disconnect'):
-                        logger.warning(f"SSH connection closed; attempting to reconnect before {method_name}()")
-                        await self._server._reconnect_tunnel()
-                    else:
-                        raise asyncssh.DisconnectError(11, "SSH connection is closed and reconnect is disabled")  # 11 = SSH_DISCONNECT_BY_APPLICATION
-                
+                await _ensure_ssh_connection(self._server, method_name)
+
+                conn = self._conn
+                hooks = self._server._hooks[hook_event] if hook_event and conn is not None else None
+                started = time.monotonic() if hooks else 0.0
+
                 # "Целевой" вызов, который мы будем выполнять
                 target_call = getattr(self._stream_object, method_name)(*args, **kwargs)
 
@@ -49,37 +83,193 @@ class WrappedSSHMeta(type):
                 idle_timeout = self._server.timing_config.get('idle_timeout')
 
                 # Применяем тайм-аут только к методам чтения и если он задан
-                if idle_timeout is not None and method_name in WrappedSSHMeta.READ_METHODS_WITH_TIMEOUT:
+                if idle_timeout is not None and is_read:
                     try:
-                        return await asyncio.wait_for(target_call, timeout=idle_timeout)
+                        if _read_deadline is not None:
+                            async with _read_deadline(idle_timeout):
+                                data = await target_call
+                        else:
+                            data = await asyncio.wait_for(target_call, timeout=idle_timeout)
                     except asyncio.TimeoutError:
-                        logger.warning(f"Client idle timeout ({idle_timeout}s) exceeded.")                        # 11 = SSH_DISCONNECT_BY_APPLICATION
-                        return b'' # Имитируем чистое закрытие соединения
+                        sampled_logger.warning('idle_timeout', "Client idle timeout (%ss) exceeded.", idle_timeout)
+                        data = b'' # Имитируем чистое закрытие соединения
                 else:
                     # Для остальных методов (write, drain) просто выполняем вызов
-                    return await target_call
+                    data = await target_call
+
+                if is_read and data and conn is not None:
+                    conn.bytes_in += len(data)
+                    conn.messages_in += 1
+                    conn.last_activity = time.monotonic()
+                if hooks:
+                    nbytes = len(data) if is_read and data else 0
+                    self._server._run_hooks(hooks, conn, method_name, started, time.monotonic(), nbytes)
+                return data
             return async_proxy
         else:
             def sync_proxy(self, *args, **kwargs):
                 if self._server.use_ssh and self._server.conn and self._server.conn.is_closed():
+                    import asyncssh  # already loaded in SSH mode
                     raise asyncssh.DisconnectError(11, "SSH connection is closed")
+                conn = self._conn
+                if is_write and conn is not None:
+                    if method_name == 'writelines':
+                        chunks = list(args[0]) if args else list(kwargs.pop('data'))
+                        args = (chunks,) + args[1:]
+                        nbytes = sum(map(len, chunks))
+                    else:
+                        nbytes = len(args[0] if args else kwargs['data'])
+                    conn.bytes_out += nbytes
+                    conn.messages_out += 1
+                    conn.last_activity = now = time.monotonic()
+                    hooks = self._server._hooks['on_write']
+                    if hooks:
+                        self._server._run_hooks(hooks, conn, method_name, now, now, nbytes)
                 return getattr(self._stream_object, method_name)(*args, **kwargs)
             return sync_proxy
 
 
 class WrappedSSHReader(metaclass=WrappedSSHMeta):
-    def __init__(self, reader, server):
+    __slots__ = ('_stream_object', '_server', '_conn')
+
+    def __init__(self, reader, server, conn=None):
         self._stream_object = reader
         self._server = server
+        self._conn = conn
+
+    @property
+    def connection(self):
+        """The server's Connection record for this stream, if any."""
+        return self._conn
 
     def __getattr__(self, name):
         return getattr(self._stream_object, name)
 
 
 class WrappedSSHWriter(metaclass=WrappedSSHMeta):
-    def __init__(self, writer, server):
+    __slots__ = ('_stream_object', '_server', '_conn')
+
+    def __init__(self, writer, server, conn=None):
         self._stream_object = writer
         self._server = server
+        self._conn = conn
+
+    @property
+    def connection(self):
+        """The server's Connection record for this stream, if any."""
+        return self._conn
+
+    async def sendfile(self, file, offset: int = 0, count=None) -> int:
+        """
+        Send ``count`` bytes of a file starting at ``offset`` (to EOF if ``None``).
+
+        ``file`` is a path or a binary file object. Where the transport
+        supports it (plain TCP and Unix sockets, including the local leg of
+        the SSH tunnel) the kernel copies the data with ``loop.sendfile()``;
+        otherwise (e.g. TLS) the file is memory-mapped and written in drained
+        chunks, so it is never read into Python buffers. Any data already
+        written is flushed first.
+
+        Returns:
+            int: The number of bytes sent.
+        """
+        if isinstance(file, (str, bytes, os.PathLike)):
+            with open(file, 'rb') as f:
+                return await self.sendfile(f, offset, count)
+        if offset < 0 or (count is not None and count < 0):
+            raise ValueError("offset and count must be non-negative")
+        await _ensure_ssh_connection(self._server, 'sendfile')
+
+        conn = self._conn
+        hooks = self._server._hooks['on_write'] if conn is not None else None
+        started = time.monotonic()
+        try:
+            size = os.fstat(file.fileno()).st_size
+        except (AttributeError, OSError):
+            size = None  # not a real file: no sendfile, no mmap
+        if size is not None:
+            count = max(0, min(size - offset, size if count is None else count))
+
+        def account(nbytes):
+            if conn is not None and nbytes:
+                conn.bytes_out += nbytes
+                conn.last_activity = time.monotonic()
+
+        sent = None
+        try:
+            if size is not None:
+                sent = await self._sendfile_native(file, offset, count, account)
+            if sent is None:
+                sent = await self._sendfile_chunked(file, offset, count, size is not None, account)
+        finally:
+            if conn is not None:
+                conn.messages_out += 1
+                if hooks:
+                    self._server._run_hooks(hooks, conn, 'sendfile', started, time.monotonic(), sent or 0)
+        return sent
+
+    async def _sendfile_native(self, file, offset, count, account):
+        # None means the transport cannot do zero-copy sendfile
+        transport = self._stream_object.transport
+        if transport.get_extra_info('sslcontext') is not None:
+            # TLS transports only offer the read/write fallback, which with
+            # fallback=False raises RuntimeError rather than SendfileNotAvailableError
+            return None
+        loop = asyncio.get_running_loop()
+        sent = 0
+        while sent < count:
+            try:
+                n = await loop.sendfile(transport, file, offset + sent, min(SENDFILE_SEGMENT, count - sent),
+                                        fallback=False)
+            except asyncio.SendfileNotAvailableError:
+                if sent:
+                    raise
+                return None
+            if not n:
+                break
+            sent += n
+            account(n)
+        return sent
+
+    async def _sendfile_chunked(self, file, offset, count, mappable, account):
+        writer = self._stream_object
+        sent = 0
+        mapped = None
+        if mappable and count:
+            # mmap offsets must be page aligned; map from the page containing offset
+            start = offset - offset % mmap.ALLOCATIONGRANULARITY
+            try:
+                mapped = mmap.mmap(file.fileno(), offset - start + count, offset=start, access=mmap.ACCESS_READ)
+            except (OSError, ValueError):
+                mapped = None
+        try:
+            if mapped is not None:
+                view = memoryview(mapped)[offset - start:]
+                for pos in range(0, count, SENDFILE_CHUNK):
+                    chunk = view[pos:pos + SENDFILE_CHUNK]
+                    writer.write(chunk)
+                    await writer.drain()
+                    sent += len(chunk)
+                    account(len(chunk))
+                    chunk.release()
+                view.release()
+            else:
+                file.seek(offset)
+                while count is None or sent < count:
+                    data = file.read(SENDFILE_CHUNK if count is None else min(SENDFILE_CHUNK, count - sent))
+                    if not data:
+                        break
+                    writer.write(data)
+                    await writer.drain()
+                    sent += len(data)
+                    account(len(data))
+        finally:
+            if mapped is not None:
+                try:
+                    mapped.close()
+                except BufferError:
+                    pass  # the transport still buffers a slice; the map closes when it is released
+        return sent
 
     def __getattr__(self, name):
         return getattr(self._stream_object, name)
@@ -0,0 +1,175 @@
+import math
+import asyncio
+import logging
+from typing import Any, Callable, Dict, List, Optional, Set
+
+logger = logging.getLogger('abakedserver')
+
+
+class WheelTimer:
+    """Handle for a callback scheduled on a TimerWheel."""
+
+    __slots__ = ('callback', 'args', 'interval', 'deadline', 'expires', 'cancelled', '_wheel')
+
+    def __init__(self, wheel: 'TimerWheel', callback: Callable, args: tuple,
+                 deadline: float, interval: Optional[float]):
+        self._wheel = wheel
+        self.callback = callback
+        self.args = args
+        self.deadline = deadline
+        self.interval = interval
+        self.expires = 0
+        self.cancelled = False
+
+    def cancel(self):
+        if not self.cancelled:
+            self.cancelled = True
+            self._wheel._remove(self)
+
+    def __repr__(self) -> str:
+        kind = f"every {self.interval}s" if self.interval else "once"
+        return f"<WheelTimer {getattr(self.callback, '__qualname__', self.callback)} {kind} cancelled={self.cancelled}>"
+
+
+class TimerWheel:
+    """
+    Hashed timer wheel for large numbers of coarse per-connection timers.
+
+    Every timer lands in one of ``slots`` buckets (a set) according to its
+    expiry tick, so scheduling and cancelling are O(1) and independent of the
+    number of timers, whereas each ``asyncio.sleep``/``call_later`` adds to the
+    loop's timer heap at O(log n). The wheel itself keeps a single loop timer
+    armed, one tick ahead, and only while it holds timers.
+
+    Callbacks run on the loop thread, never early and at most ``resolution``
+    seconds late (plus loop lag). Delays longer than one revolution
+    (``resolution * slots``) stay in their bucket for extra rounds.
+    """
+
+    def __init__(self, resolution: float = 0.05, slots: int = 512):
+        self.resolution = resolution
+        self._buckets: List[Set[WheelTimer]] = [set() for _ in range(slots)]
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._origin = 0.0
+        self._tick = 0
+        self._handle: Optional[asyncio.TimerHandle] = None
+        self._ticking = False
+        self._count = 0
+        self.fired = 0
+        self.ticks = 0
+
+    def __len__(self) -> int:
+        return self._count
+
+    def call_later(self, delay: float, callback: Callable, *args: Any) -> WheelTimer:
+        """Run ``callback(*args)`` once after ``delay`` seconds."""
+        loop = self._get_loop()
+        timer = WheelTimer(self, callback, args, loop.time() + delay, None)
+        self._insert(timer)
+        return timer
+
+    def call_every(self, interval: float, callback: Callable, *args: Any,
+                   first_delay: Optional[float] = None) -> WheelTimer:
+        """
+        Run ``callback(*args)`` every ``interval`` seconds until cancelled.
+
+        The schedule follows the original deadlines, so it does not drift;
+        periods missed while the loop was blocked are skipped, not replayed.
+        """
+        loop = self._get_loop()
+        delay = interval if first_delay is None else first_delay
+        timer = WheelTimer(self, callback, args, loop.time() + delay, interval)
+        self._insert(timer)
+        return timer
+
+    def close(self):
+        """Drop every scheduled timer and disarm the wheel."""
+        for bucket in self._buckets:
+            for timer in bucket:
+                timer.cancelled = True
+            bucket.clear()
+        self._count = 0
+        if self._handle is not None:
+            self._handle.cancel()
+            self._handle = None
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'timers': self._count, 'fired': self.fired, 'ticks': self.ticks,
+            'resolution': self.resolution, 'slots': len(self._buckets)
+        }
+
+    def _get_loop(self) -> asyncio.AbstractEventLoop:
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            # First use, or a new loop (e.g. the server restarted under asyncio.run)
+            self.close()
+            self._loop = loop
+            self._origin = loop.time()
+            self._tick = 0
+        return loop
+
+    def _current_tick(self) -> int:
+        return int((self._loop.time() - self._origin) / self.resolution)
+
+    def _insert(self, timer: WheelTimer):
+        idle = self._handle is None and not self._ticking
+        if idle:
+            # Idle wheels do not tick; catch the position up before inserting
+            self._tick = self._current_tick()
+        timer.expires = max(self._tick + 1, math.ceil((timer.deadline - self._origin) / self.resolution))
+        self._buckets[timer.expires % len(self._buckets)].add(timer)
+        self._count += 1
+        if idle:
+            self._arm()
+
+    def _remove(self, timer: WheelTimer):
+        bucket = self._buckets[timer.expires % len(self._buckets)]
+        if timer in bucket:
+            bucket.discard(timer)
+            self._count -= 1
+
+    def _arm(self):
+        self._handle = self._loop.call_at(self._origin + (self._tick + 1) * self.resolution, self._on_tick)
+
+    def _on_tick(self):
+        self._handle = None
+        self.ticks += 1
+        # The loop may run a handle up to its clock resolution early
+        now_tick = max(self._current_tick(), self._tick + 1)
+        buckets = self._buckets
+        # After a long loop stall visit every bucket once rather than replaying each tick
+        steps = min(now_tick - self._tick, len(buckets))
+        start, self._tick = self._tick, now_tick
+        due: List[WheelTimer] = []
+        for step in range(1, steps + 1):
+            bucket = buckets[(start + step) % len(buckets)]
+            if bucket:
+                expired = [timer for timer in bucket if timer.expires <= now_tick]
+                bucket.difference_update(expired)
+                due.extend(expired)
+        self._count -= len(due)
+
+        now = self._loop.time()
+        self._ticking = True
+        try:
+            for timer in due:
+                if timer.cancelled:
+                    continue
+                self.fired += 1
+                try:
+                    timer.callback(*timer.args)
+                except Exception as e:
+                    logger.error("Timer callback %r failed: %s", timer.callback, e, exc_info=True)
+                if timer.interval and not timer.cancelled:
+                    timer.deadline += timer.interval
+                    if timer.deadline <= now:
+                        timer.deadline = now + timer.interval
+                    self._insert(timer)
+                else:
+                    # A one-shot timer is done; cancel() on it becomes a no-op
+                    timer.cancelled = True
+        finally:
+            self._ticking = False
+        if self._count:
+            self._arm()
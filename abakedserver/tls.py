@@ -0,0 +1,110 @@
+import ssl
+import time
+import asyncio
+import logging
+from typing import Any, Dict, Optional
+
+from .utils import check_that
+
+logger = logging.getLogger('abakedserver')
+
+TLS_DEFAULTS = {
+    'certfile': None,
+    'keyfile': None,
+    'password': None,
+    'cafile': None,
+    'verify_client': False,
+    'alpn_protocols': None,
+    'ciphers': None,
+    'minimum_version': 'TLSv1_2',
+    'session_tickets': True,
+    'handshake_timeout': 10.0,
+}
+
+
+def validate_tls_config(tls_config: Optional[Dict]) -> Optional[Dict[str, Any]]:
+    """Merge ``tls_config`` with TLS_DEFAULTS and validate it; ``None`` leaves TLS off."""
+    check_that(tls_config, 'is dict or none', "tls_config must be a dictionary or None")
+    if tls_config is None:
+        return None
+    if not hasattr(asyncio.StreamWriter, 'start_tls'):
+        raise RuntimeError("tls_config requires Python 3.11+ (asyncio.StreamWriter.start_tls)")
+    config = {**TLS_DEFAULTS, **tls_config}
+    unknown = set(config) - set(TLS_DEFAULTS)
+    if unknown:
+        raise ValueError(f"Unknown tls_config keys: {sorted(unknown)}")
+    check_that(config['certfile'], 'is not empty string', "certfile is required and must be a path")
+    check_that(config['keyfile'], 'is string or none', "keyfile must be a path or None")
+    check_that(config['cafile'], 'is string or none', "cafile must be a path or None")
+    check_that(config['verify_client'], 'is bool', "verify_client must be a boolean")
+    if config['verify_client'] and config['cafile'] is None:
+        raise ValueError("verify_client requires cafile")
+    alpn = config['alpn_protocols']
+    if alpn is not None and (not isinstance(alpn, (list, tuple)) or not alpn
+                             or not all(isinstance(p, str) and p for p in alpn)):
+        raise ValueError("alpn_protocols must be a non-empty list of protocol names or None")
+    check_that(config['ciphers'], 'is string or none', "ciphers must be an OpenSSL cipher string or None")
+    if config['minimum_version'] not in ssl.TLSVersion.__members__:
+        raise ValueError(f"minimum_version must be one of {list(ssl.TLSVersion.__members__)}")
+    check_that(config['session_tickets'], 'is bool', "session_tickets must be a boolean")
+    check_that(config['handshake_timeout'], 'is positive', "handshake_timeout must be a positive number")
+    return config
+
+
+def create_server_context(config: Dict[str, Any]) -> ssl.SSLContext:
+    """
+    Build the server-side SSLContext shared by every TLS listener.
+
+    One context means one session cache and one set of ticket keys, so a
+    client can resume a session whichever listener it reconnects to.
+    """
+    context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+    context.minimum_version = ssl.TLSVersion[config['minimum_version']]
+    context.load_cert_chain(config['certfile'], config['keyfile'], config['password'])
+    if config['cafile']:
+        context.load_verify_locations(config['cafile'])
+    if config['verify_client']:
+        context.verify_mode = ssl.CERT_REQUIRED
+    if config['ciphers']:
+        context.set_ciphers(config['ciphers'])
+    if config['alpn_protocols']:
+        context.set_alpn_protocols(list(config['alpn_protocols']))
+    if not config['session_tickets']:
+        # TLS 1.2 falls back to the server-side session cache; TLS 1.3 resumes via tickets only
+        context.options |= ssl.OP_NO_TICKET
+        context.num_tickets = 0
+    return context
+
+
+def reload_cert_chain(context: ssl.SSLContext, config: Dict[str, Any]) -> ssl.SSLContext:
+    """
+    Apply ``config``'s certificates and return the context to use from now on.
+
+    A complete new context is built first, so a bad file raises before the
+    live context is touched. Without a ``cafile`` only the certificate chain
+    changes and it is loaded into ``context`` itself, keeping its session
+    cache and ticket keys. With a ``cafile`` the new context is returned
+    instead: load_verify_locations() can only add to a trust store, so an
+    in-place reload would keep trusting a CA that was rotated out. The swap
+    resets session resumption (clients do a full handshake once).
+    Established connections are unaffected either way.
+    """
+    fresh = create_server_context(config)
+    if config['cafile']:
+        return fresh
+    context.load_cert_chain(config['certfile'], config['keyfile'], config['password'])
+    return context
+
+
+async def server_handshake(writer, context: ssl.SSLContext, timeout: float) -> Dict[str, Any]:
+    """Upgrade an accepted stream to TLS and describe the negotiated session."""
+    started = time.monotonic()
+    await writer.start_tls(context, ssl_handshake_timeout=timeout)
+    ssl_object = writer.get_extra_info('ssl_object')
+    return {
+        'version': ssl_object.version(),
+        'cipher': ssl_object.cipher()[0],
+        'alpn': ssl_object.selected_alpn_protocol(),
+        'resumed': ssl_object.session_reused,
+        'handshake_seconds': time.monotonic() - started,
+    }
@@ -0,0 +1,63 @@
+from typing import Dict, List
+
+
+class PhaseTimingAggregator:
+    """
+    Built-in tracing hook set that splits connection time into phases.
+
+    Per connection it records the delay from accept to handler start, every
+    read wait, every ``drain()`` and, at close, the handler compute time: the
+    handler's lifetime minus the time spent waiting in reads and drains. Each
+    phase goes into its own histogram in the MetricsManager.
+
+    Enable it with ``metrics_config={'phase_timing': True}`` or call
+    ``install(server)`` yourself.
+    """
+
+    def __init__(self, metrics):
+        self._accept_to_handler = metrics.histogram('phase_accept_to_handler_seconds')
+        self._read_wait = metrics.histogram('phase_read_wait_seconds')
+        self._drain = metrics.histogram('phase_drain_seconds')
+        self._compute = metrics.histogram('phase_handler_compute_seconds')
+        # conn.id -> [handler start, total read wait, total drain]
+        self._open: Dict[int, List[float]] = {}
+
+    def install(self, server):
+        server.add_hook('on_handler_start', self.on_handler_start)
+        server.add_hook('on_read', self.on_read)
+        server.add_hook('on_write', self.on_write)
+        server.add_hook('on_close', self.on_close)
+        return self
+
+    def uninstall(self, server):
+        server.remove_hook('on_handler_start', self.on_handler_start)
+        server.remove_hook('on_read', self.on_read)
+        server.remove_hook('on_write', self.on_write)
+        server.remove_hook('on_close', self.on_close)
+        self._open.clear()
+
+    def on_handler_start(self, conn, ts):
+        self._accept_to_handler.observe(ts - conn.start_time)
+        self._open[conn.id] = [ts, 0.0, 0.0]
+
+    def on_read(self, conn, method, started, finished, nbytes):
+        waited = finished - started
+        self._read_wait.observe(waited)
+        state = self._open.get(conn.id)
+        if state is not None:
+            state[1] += waited
+
+    def on_write(self, conn, method, started, finished, nbytes):
+        if method != 'drain':
+            return
+        waited = finished - started
+        self._drain.observe(waited)
+        state = self._open.get(conn.id)
+        if state is not None:
+            state[2] += waited
+
+    def on_close(self, conn, ts):
+        state = self._open.pop(conn.id, None)
+        if state is not None:
+            handler_start, read_wait, drain = state
+            self._compute.observe(max(0.0, ts - handler_start - read_wait - drain))
@@ -1,7 +1,7 @@
+import logging
 from typing import Any
-from .logging import configure_logger
 
-logger = configure_logger('abakedserver')
+logger = logging.getLogger('abakedserver')
 
 def check_that(arg: Any, req: str, msg: str) -> None:
     """
@@ -20,6 +20,7 @@ def check_that(arg: Any, req: str, msg: str) -> None:
         'is non-negative': lambda x: isinstance(x, (int, float)) and x >= 0,
         'is positive': lambda x: isinstance(x, (int, float)) and x > 0,
         'is bool': lambda x: isinstance(x, bool),
+        'is bool or none': lambda x: x is None or isinstance(x, bool),
         'is string': lambda x: isinstance(x, str),
         'is not empty string': lambda x: isinstance(x, str) and len(x.strip()) > 0,
         'is dict or none': lambda x: x is None or isinstance(x, dict),
@@ -0,0 +1,9 @@
+"""
+Performance benchmarks for aBakedServer.
+
+Run ``python -m benchmarks.run --help`` from the repository root. The server
+under test runs in a child process (``benchmarks.echo_server``); in SSH mode it
+tunnels through a throwaway local asyncssh server (``benchmarks.sshd``). The
+load generator lives in ``benchmarks.loadgen`` and results are emitted as JSON,
+which ``python -m benchmarks.compare`` can diff across commits.
+"""
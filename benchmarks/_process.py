@@ -0,0 +1,95 @@
+import os
+import sys
+import json
+import asyncio
+import resource
+from typing import Any, Dict, List, Optional
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def raise_nofile_limit():
+    """Lift the soft descriptor limit to the hard one so thousands of sockets fit."""
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    if hard == resource.RLIM_INFINITY or soft < hard:
+        try:
+            resource.setrlimit(resource.RLIMIT_NOFILE, (hard, hard))
+        except (ValueError, OSError):
+            pass
+
+
+def rss_bytes() -> Optional[int]:
+    """Resident set size of this process, or None where /proc is unavailable."""
+    try:
+        with open('/proc/self/status') as status:
+            for line in status:
+                if line.startswith('VmRSS:'):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    return None
+
+
+def emit(payload: Dict[str, Any]):
+    sys.stdout.write(json.dumps(payload) + '\n')
+    sys.stdout.flush()
+
+
+async def serve_control(handle_command):
+    """
+    Serve newline-delimited commands from stdin until EOF or ``quit``.
+
+    Child processes report their state to the runner this way instead of
+    sharing memory, so the numbers describe the server process alone.
+    """
+    loop = asyncio.get_running_loop()
+    reader = asyncio.StreamReader()
+    await loop.connect_read_pipe(lambda: asyncio.StreamReaderProtocol(reader), sys.stdin)
+    while True:
+        line = await reader.readline()
+        command = line.decode().strip()
+        if not command or command == 'quit':
+            return
+        emit(await handle_command(command))
+
+
+class ChildProcess:
+    """A benchmark helper process speaking the JSON-lines control protocol."""
+
+    def __init__(self, module: str, args: List[str]):
+        self.module = module
+        self.args = args
+        self.proc = None
+        self.ready: Dict[str, Any] = {}
+
+    async def start(self, timeout: float = 30.0) -> Dict[str, Any]:
+        env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [ROOT, os.environ.get('PYTHONPATH')])))
+        self.proc = await asyncio.create_subprocess_exec(
+            sys.executable, '-m', self.module, *self.args,
+            stdin=asyncio.subprocess.PIPE, stdout=asyncio.subprocess.PIPE, cwd=ROOT, env=env
+        )
+        self.ready = await self._read(timeout)
+        return self.ready
+
+    async def command(self, command: str, timeout: float = 30.0) -> Dict[str, Any]:
+        self.proc.stdin.write(command.encode() + b'\n')
+        await self.proc.stdin.drain()
+        return await self._read(timeout)
+
+    async def _read(self, timeout: float) -> Dict[str, Any]:
+        line = await asyncio.wait_for(self.proc.stdout.readline(), timeout)
+        if not line:
+            raise RuntimeError(f"{self.module} exited with code {await self.proc.wait()}")
+        return json.loads(line)
+
+    async def stop(self, timeout: float = 10.0):
+        if self.proc is None or self.proc.returncode is not None:
+            return
+        try:
+            self.proc.stdin.write(b'quit\n')
+            await self.proc.stdin.drain()
+            self.proc.stdin.close()
+            await asyncio.wait_for(self.proc.wait(), timeout)
+        except (ConnectionError, asyncio.TimeoutError):
+            self.proc.kill()
+            await self.proc.wait()
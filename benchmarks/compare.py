@@ -0,0 +1,59 @@
+"""
+Compare two benchmark JSON reports produced by ``benchmarks.run``.
+
+Example:
+    python -m benchmarks.compare base.json new.json
+"""
+
+import sys
+import json
+import argparse
+from typing import Any, Dict
+
+
+def flatten(node: Any, prefix: str = '') -> Dict[str, float]:
+    """Map dotted result paths to numeric values; list items are keyed by payload size."""
+    values: Dict[str, float] = {}
+    if isinstance(node, dict):
+        for key, value in node.items():
+            values.update(flatten(value, f"{prefix}.{key}" if prefix else key))
+    elif isinstance(node, list):
+        for index, value in enumerate(node):
+            label = value.get('payload_bytes', index) if isinstance(value, dict) else index
+            values.update(flatten(value, f"{prefix}[{label}]"))
+    elif isinstance(node, (int, float)) and not isinstance(node, bool):
+        values[prefix] = float(node)
+    return values
+
+
+def compare(base: Dict[str, Any], new: Dict[str, Any]) -> Dict[str, Dict[str, float]]:
+    base_values, new_values = flatten(base['results']), flatten(new['results'])
+    rows = {}
+    for path in sorted(base_values.keys() & new_values.keys()):
+        old, cur = base_values[path], new_values[path]
+        rows[path] = {'base': old, 'new': cur, 'change_pct': (cur - old) / old * 100 if old else None}
+    return rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare two benchmark reports")
+    parser.add_argument('base')
+    parser.add_argument('new')
+    parser.add_argument('--json', action='store_true', help="print the comparison as JSON")
+    args = parser.parse_args(argv)
+    with open(args.base) as f:
+        base = json.load(f)
+    with open(args.new) as f:
+        new = json.load(f)
+    rows = compare(base, new)
+    if args.json:
+        sys.stdout.write(json.dumps(rows, indent=2) + '\n')
+        return
+    print(f"base: {base['meta'].get('commit')}  new: {new['meta'].get('commit')}")
+    for path, row in rows.items():
+        change = f"{row['change_pct']:+8.1f}%" if row['change_pct'] is not None else '        -'
+        print(f"{path:60} {row['base']:>16.4f} {row['new']:>16.4f} {change}")
+
+
+if __name__ == '__main__':
+    main()
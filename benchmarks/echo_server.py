@@ -0,0 +1,90 @@
+"""
+Echo server used as the benchmark target.
+
+Every client is greeted with a single ``GREETING`` byte as soon as its handler
+starts, then everything it sends is echoed back until EOF. The greeting lets the
+load generator time accepts end to end, including the SSH channel setup in
+tunnel mode. Prints ``{"port": ..., "pid": ...}`` once listening, then answers
+``stats`` commands on stdin.
+
+``--split-writes`` sends each echo as two separate writes, the pattern that
+interacts badly with Nagle's algorithm; ``--socket-config`` passes a JSON
+``socket_config`` to the server.
+"""
+
+import os
+import json
+import asyncio
+import argparse
+
+from abakedserver import aBakedServer
+from ._process import emit, raise_nofile_limit, rss_bytes, serve_control
+
+GREETING = b'+'
+CHUNK_SIZE = 65536
+
+
+async def echo_handler(reader, writer):
+    writer.write(GREETING)
+    await writer.drain()
+    while True:
+        data = await reader.read(CHUNK_SIZE)
+        if not data:
+            break
+        writer.write(data)
+        await writer.drain()
+
+
+async def split_echo_handler(reader, writer):
+    writer.write(GREETING)
+    await writer.drain()
+    while True:
+        data = await reader.read(CHUNK_SIZE)
+        if not data:
+            break
+        half = len(data) // 2 or len(data)
+        writer.write(data[:half])
+        await writer.drain()
+        if data[half:]:
+            writer.write(data[half:])
+            await writer.drain()
+
+
+async def main(args):
+    raise_nofile_limit()
+    ssh_config = None
+    if args.mode == 'ssh':
+        ssh_config = {
+            'ssh_host': '127.0.0.1', 'ssh_port': args.ssh_port,
+            'ssh_user': 'bench', 'ssh_key_path': args.ssh_key,
+            'remote_bind_host': '127.0.0.1', 'remote_bind_port': 0,
+            'reconnect_on_disconnect': False,
+        }
+    server = aBakedServer(
+        host='127.0.0.1', port=0, ssh_config=ssh_config,
+        metrics_config={'loop_lag_interval': None},
+        socket_config=json.loads(args.socket_config) if args.socket_config else None
+    )
+    await server.start_server(split_echo_handler if args.split_writes else echo_handler)
+    port = server.tunnel.get_port() if server.use_ssh else server.port
+
+    async def handle(command):
+        if command == 'stats':
+            return {'connections': len(server.connections()), 'rss_bytes': rss_bytes()}
+        return {'error': f"unknown command {command!r}"}
+
+    emit({'port': port, 'pid': os.getpid(), 'mode': args.mode})
+    try:
+        await serve_control(handle)
+    finally:
+        await server.close()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--mode', choices=('tcp', 'ssh'), default='tcp')
+    parser.add_argument('--ssh-port', type=int)
+    parser.add_argument('--ssh-key')
+    parser.add_argument('--socket-config', help="socket_config as a JSON object")
+    parser.add_argument('--split-writes', action='store_true')
+    asyncio.run(main(parser.parse_args()))
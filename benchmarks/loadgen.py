@@ -0,0 +1,144 @@
+"""
+Load generator: opens concurrent clients against a running echo server and
+measures accept rate, round-trip latency, throughput and idle memory.
+"""
+
+import time
+import asyncio
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from ._process import ChildProcess
+
+GREETING_SIZE = 1
+READ_CHUNK = 65536
+PERCENTILES = (50, 90, 99, 99.9)
+
+Client = Tuple[asyncio.StreamReader, asyncio.StreamWriter]
+
+
+def percentiles(samples: Sequence[float], points: Iterable[float] = PERCENTILES) -> Dict[str, float]:
+    """Summarize latency samples (seconds) in milliseconds using nearest-rank percentiles."""
+    if not samples:
+        return {}
+    ordered = sorted(samples)
+    summary = {
+        'min_ms': ordered[0] * 1000,
+        'mean_ms': sum(ordered) / len(ordered) * 1000,
+        'max_ms': ordered[-1] * 1000,
+    }
+    for point in points:
+        rank = max(0, min(len(ordered) - 1, int(round(point / 100 * len(ordered))) - 1))
+        summary[f"p{point:g}_ms"] = ordered[rank] * 1000
+    return summary
+
+
+async def connect(host: str, port: int) -> Client:
+    """Open one client and wait for the server's greeting, i.e. for its handler to start."""
+    reader, writer = await asyncio.open_connection(host, port)
+    await reader.readexactly(GREETING_SIZE)
+    return reader, writer
+
+
+async def open_clients(host: str, port: int, count: int, concurrency: int) -> List[Client]:
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def open_one():
+        async with semaphore:
+            return await connect(host, port)
+
+    return await asyncio.gather(*(open_one() for _ in range(count)))
+
+
+async def close_clients(clients: List[Client]):
+    for _, writer in clients:
+        writer.close()
+    await asyncio.gather(*(writer.wait_closed() for _, writer in clients), return_exceptions=True)
+
+
+async def bench_accepts(host: str, port: int, count: int, concurrency: int) -> Dict[str, Any]:
+    start = time.perf_counter()
+    clients = await open_clients(host, port, count, concurrency)
+    elapsed = time.perf_counter() - start
+    await close_clients(clients)
+    return {
+        'connections': count, 'concurrency': concurrency,
+        'seconds': elapsed, 'accepts_per_sec': count / elapsed
+    }
+
+
+async def bench_latency(host: str, port: int, clients: int, requests: int, payload_size: int) -> Dict[str, Any]:
+    """Each client performs ``requests`` sequential echo round trips."""
+    conns = await open_clients(host, port, clients, clients)
+    payload = b'x' * payload_size
+    samples: List[float] = []
+
+    async def run(reader, writer):
+        for _ in range(requests):
+            started = time.perf_counter()
+            writer.write(payload)
+            await writer.drain()
+            await reader.readexactly(payload_size)
+            samples.append(time.perf_counter() - started)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(run(reader, writer) for reader, writer in conns))
+    elapsed = time.perf_counter() - start
+    await close_clients(conns)
+    return {
+        'clients': clients, 'requests_per_client': requests, 'payload_bytes': payload_size,
+        'seconds': elapsed, 'requests_per_sec': len(samples) / elapsed, **percentiles(samples)
+    }
+
+
+async def bench_throughput(host: str, port: int, clients: int, payload_size: int, total_bytes: int) -> Dict[str, Any]:
+    """Each client streams ``payload_size`` messages while concurrently reading the echo."""
+    messages = max(1, total_bytes // (clients * payload_size))
+    expected = messages * payload_size
+    conns = await open_clients(host, port, clients, clients)
+    payload = b'x' * payload_size
+
+    async def run(reader, writer):
+        async def send():
+            for _ in range(messages):
+                writer.write(payload)
+                await writer.drain()
+
+        sender = asyncio.create_task(send())
+        received = 0
+        while received < expected:
+            data = await reader.read(READ_CHUNK)
+            if not data:
+                raise ConnectionError("server closed the connection mid-benchmark")
+            received += len(data)
+        await sender
+
+    start = time.perf_counter()
+    await asyncio.gather(*(run(reader, writer) for reader, writer in conns))
+    elapsed = time.perf_counter() - start
+    await close_clients(conns)
+    total = expected * clients
+    return {
+        'payload_bytes': payload_size, 'clients': clients, 'messages': messages * clients,
+        'bytes': total, 'seconds': elapsed,
+        'mb_per_sec': total / elapsed / 1e6, 'messages_per_sec': messages * clients / elapsed
+    }
+
+
+async def bench_idle_memory(host: str, port: int, count: int, concurrency: int,
+                            server: ChildProcess) -> Dict[str, Any]:
+    """Server RSS growth per idle connection, measured in the server process."""
+    # Warm up allocator pools and lazily created state before the baseline
+    await close_clients(await open_clients(host, port, min(count, 100), concurrency))
+    await asyncio.sleep(0.1)
+    before = await server.command('stats')
+    clients = await open_clients(host, port, count, concurrency)
+    after = await server.command('stats')
+    await close_clients(clients)
+    per_connection: Optional[float] = None
+    if before.get('rss_bytes') is not None and after.get('rss_bytes') is not None:
+        per_connection = (after['rss_bytes'] - before['rss_bytes']) / count
+    return {
+        'connections': count, 'server_connections': after.get('connections'),
+        'rss_before_bytes': before.get('rss_bytes'), 'rss_after_bytes': after.get('rss_bytes'),
+        'bytes_per_connection': per_connection
+    }
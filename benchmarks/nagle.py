@@ -0,0 +1,72 @@
+"""
+Nagle benchmark: request/response latency with TCP_NODELAY on and off.
+
+The echo server answers every request with two writes, so with Nagle's
+algorithm enabled the second half waits for the client's (possibly delayed)
+ACK of the first. Each setting runs against a fresh server process.
+
+Example:
+    python -m benchmarks.nagle --clients 10 --requests 200 --output nagle.json
+"""
+
+import sys
+import json
+import asyncio
+import argparse
+import platform
+from datetime import datetime, timezone
+from typing import Any, Dict
+
+from . import loadgen
+from ._process import ChildProcess, raise_nofile_limit
+from .run import HOST, _git_revision
+
+SETTINGS = {'nodelay_on': True, 'nodelay_off': False}
+
+
+async def run_setting(nodelay: bool, args: argparse.Namespace) -> Dict[str, Any]:
+    server_args = ['--socket-config', json.dumps({'nodelay': nodelay})]
+    if not args.single_write:
+        server_args.append('--split-writes')
+    server = ChildProcess('benchmarks.echo_server', server_args)
+    try:
+        port = (await server.start())['port']
+        return await loadgen.bench_latency(HOST, port, args.clients, args.requests, args.payload)
+    finally:
+        await server.stop()
+
+
+async def run(args: argparse.Namespace) -> Dict[str, Any]:
+    raise_nofile_limit()
+    return {
+        'meta': {
+            'timestamp': datetime.now(timezone.utc).isoformat(), **_git_revision(),
+            'python': platform.python_version(), 'platform': platform.platform(),
+            'params': {k: v for k, v in vars(args).items() if k != 'output'},
+        },
+        'results': {name: await run_setting(nodelay, args) for name, nodelay in SETTINGS.items()}
+    }
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="TCP_NODELAY on vs off latency benchmark")
+    parser.add_argument('--clients', type=int, default=10)
+    parser.add_argument('--requests', type=int, default=200, help="round trips per client")
+    parser.add_argument('--payload', type=int, default=512, help="request size in bytes")
+    parser.add_argument('--single-write', action='store_true', help="answer with one write instead of two")
+    parser.add_argument('--output', help="write JSON here instead of stdout")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    text = json.dumps(asyncio.run(run(args)), indent=2)
+    if args.output:
+        with open(args.output, 'w') as out:
+            out.write(text + '\n')
+    else:
+        sys.stdout.write(text + '\n')
+
+
+if __name__ == '__main__':
+    main()
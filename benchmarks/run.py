@@ -0,0 +1,130 @@
+"""
+Run the aBakedServer benchmark suite and print the results as JSON.
+
+Example:
+    python -m benchmarks.run --mode all --output results.json
+"""
+
+import os
+import sys
+import json
+import asyncio
+import argparse
+import platform
+import tempfile
+import subprocess
+from datetime import datetime, timezone
+from typing import Any, Dict, List
+
+from ._process import ROOT, ChildProcess, raise_nofile_limit
+from . import loadgen
+
+HOST = '127.0.0.1'
+
+
+def _git_revision() -> Dict[str, Any]:
+    try:
+        commit = subprocess.run(['git', 'rev-parse', 'HEAD'], cwd=ROOT, capture_output=True,
+                                text=True, check=True).stdout.strip()
+        dirty = bool(subprocess.run(['git', 'status', '--porcelain', '--untracked-files=no'], cwd=ROOT,
+                                    capture_output=True, text=True, check=True).stdout.strip())
+    except (OSError, subprocess.CalledProcessError):
+        return {'commit': None, 'dirty': None}
+    return {'commit': commit, 'dirty': dirty}
+
+
+def _write_client_key(workdir: str) -> Dict[str, str]:
+    import asyncssh
+    key = asyncssh.generate_private_key('ssh-ed25519')
+    key_path = os.path.join(workdir, 'client_key')
+    key.write_private_key(key_path)
+    os.chmod(key_path, 0o600)
+    authorized_keys = os.path.join(workdir, 'authorized_keys')
+    key.write_public_key(authorized_keys)
+    return {'key': key_path, 'authorized_keys': authorized_keys}
+
+
+async def run_mode(mode: str, args: argparse.Namespace) -> Dict[str, Any]:
+    children: List[ChildProcess] = []
+    with tempfile.TemporaryDirectory(prefix='abakedserver-bench-') as workdir:
+        try:
+            server_args = ['--mode', mode]
+            if mode == 'ssh':
+                keys = _write_client_key(workdir)
+                sshd = ChildProcess('benchmarks.sshd', ['--authorized-keys', keys['authorized_keys']])
+                children.append(sshd)
+                sshd_info = await sshd.start()
+                server_args += ['--ssh-port', str(sshd_info['port']), '--ssh-key', keys['key']]
+            server = ChildProcess('benchmarks.echo_server', server_args)
+            children.append(server)
+            port = (await server.start())['port']
+
+            results: Dict[str, Any] = {}
+            results['accepts'] = await loadgen.bench_accepts(HOST, port, args.accept_connections, args.concurrency)
+            results['latency'] = await loadgen.bench_latency(
+                HOST, port, args.clients, args.requests, args.latency_payload)
+            results['throughput'] = [
+                await loadgen.bench_throughput(HOST, port, args.clients, size, args.throughput_bytes)
+                for size in args.payload_sizes
+            ]
+            results['idle_memory'] = await loadgen.bench_idle_memory(
+                HOST, port, args.idle_connections, args.concurrency, server)
+            return results
+        finally:
+            for child in reversed(children):
+                await child.stop()
+
+
+async def run(args: argparse.Namespace) -> Dict[str, Any]:
+    raise_nofile_limit()
+    modes = ('tcp', 'ssh') if args.mode == 'all' else (args.mode,)
+    report = {
+        'meta': {
+            'timestamp': datetime.now(timezone.utc).isoformat(),
+            **_git_revision(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'cpu_count': os.cpu_count(),
+            'params': {k: v for k, v in vars(args).items() if k != 'output'},
+        },
+        'results': {}
+    }
+    for mode in modes:
+        report['results'][mode] = await run_mode(mode, args)
+    return report
+
+
+def _sizes(value: str) -> List[int]:
+    return [int(size) for size in value.split(',') if size]
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="aBakedServer throughput and latency benchmarks")
+    parser.add_argument('--mode', choices=('tcp', 'ssh', 'all'), default='all')
+    parser.add_argument('--clients', type=int, default=50, help="concurrent clients for latency/throughput")
+    parser.add_argument('--requests', type=int, default=200, help="round trips per client in the latency run")
+    parser.add_argument('--latency-payload', type=int, default=64, help="payload size of latency round trips")
+    parser.add_argument('--payload-sizes', type=_sizes, default=[64, 1024, 16384, 262144],
+                        help="comma-separated payload sizes for the throughput runs")
+    parser.add_argument('--throughput-bytes', type=int, default=32 * 1024 * 1024,
+                        help="bytes echoed per throughput run, split across clients")
+    parser.add_argument('--accept-connections', type=int, default=1000)
+    parser.add_argument('--idle-connections', type=int, default=1000)
+    parser.add_argument('--concurrency', type=int, default=200, help="parallel connection attempts")
+    parser.add_argument('--output', help="write JSON here instead of stdout")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    report = asyncio.run(run(args))
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w') as out:
+            out.write(text + '\n')
+    else:
+        sys.stdout.write(text + '\n')
+
+
+if __name__ == '__main__':
+    main()
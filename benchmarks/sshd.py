@@ -0,0 +1,48 @@
+"""
+Throwaway local SSH server for SSH-mode benchmarks.
+
+Accepts public-key logins for the keys in ``--authorized-keys`` and allows
+remote port forwarding, which is all aBakedServer's tunnel needs. The host key
+is generated per run. Prints ``{"port": ..., "pid": ...}`` once listening, then
+answers ``stats`` commands on stdin.
+"""
+
+import os
+import asyncio
+import argparse
+
+import asyncssh
+
+from ._process import emit, raise_nofile_limit, rss_bytes, serve_control
+
+
+class _ForwardingServer(asyncssh.SSHServer):
+    def server_requested(self, listen_host, listen_port):
+        return True
+
+
+async def main(args):
+    raise_nofile_limit()
+    server = await asyncssh.create_server(
+        _ForwardingServer, '127.0.0.1', 0,
+        server_host_keys=[asyncssh.generate_private_key('ssh-ed25519')],
+        authorized_client_keys=args.authorized_keys
+    )
+
+    async def handle(command):
+        if command == 'stats':
+            return {'rss_bytes': rss_bytes()}
+        return {'error': f"unknown command {command!r}"}
+
+    emit({'port': server.sockets[0].getsockname()[1], 'pid': os.getpid()})
+    try:
+        await serve_control(handle)
+    finally:
+        server.close()
+        await server.wait_closed()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--authorized-keys', required=True)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,151 @@
+"""
+Timer benchmark: per-connection asyncio.sleep tasks vs the shared TimerWheel.
+
+Simulates N connections, each with a periodic job (e.g. a heartbeat) whose
+phase is spread uniformly over the interval, and measures CPU time and memory
+for a fixed window. A second scenario measures schedule + cancel cost, the
+pattern of a per-read idle timeout. Each variant runs in a fresh process.
+
+Example:
+    python -m benchmarks.timers --connections 50000 --output timers.json
+"""
+
+import sys
+import json
+import time
+import random
+import asyncio
+import argparse
+import platform
+import subprocess
+from datetime import datetime, timezone
+from typing import Any, Dict
+
+from abakedserver.timers import TimerWheel
+from ._process import ROOT, rss_bytes
+from .run import _git_revision
+
+VARIANTS = ('sleep_tasks', 'timer_wheel')
+
+
+async def _periodic_sleep_tasks(connections: int, interval: float, duration: float) -> Dict[str, Any]:
+    fired = 0
+
+    async def heartbeat(offset):
+        nonlocal fired
+        await asyncio.sleep(offset)
+        while True:
+            fired += 1
+            await asyncio.sleep(interval)
+
+    rss_before = rss_bytes()
+    setup_started = time.perf_counter()
+    tasks = [asyncio.create_task(heartbeat(random.random() * interval)) for _ in range(connections)]
+    await asyncio.sleep(0)
+    setup = time.perf_counter() - setup_started
+    rss_after = rss_bytes()
+
+    cpu_started = time.process_time()
+    await asyncio.sleep(duration)
+    cpu = time.process_time() - cpu_started
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+    return {'setup_seconds': setup, 'cpu_seconds': cpu, 'callbacks': fired,
+            'rss_delta_bytes': None if rss_before is None else rss_after - rss_before}
+
+
+async def _periodic_timer_wheel(connections: int, interval: float, duration: float) -> Dict[str, Any]:
+    wheel = TimerWheel()
+    fired = 0
+
+    def heartbeat():
+        nonlocal fired
+        fired += 1
+
+    rss_before = rss_bytes()
+    setup_started = time.perf_counter()
+    for _ in range(connections):
+        wheel.call_every(interval, heartbeat, first_delay=random.random() * interval)
+    setup = time.perf_counter() - setup_started
+    rss_after = rss_bytes()
+
+    cpu_started = time.process_time()
+    await asyncio.sleep(duration)
+    cpu = time.process_time() - cpu_started
+    wheel.close()
+    return {'setup_seconds': setup, 'cpu_seconds': cpu, 'callbacks': fired,
+            'rss_delta_bytes': None if rss_before is None else rss_after - rss_before}
+
+
+async def _schedule_cancel(variant: str, connections: int, delay: float) -> Dict[str, Any]:
+    loop = asyncio.get_running_loop()
+    wheel = TimerWheel()
+    noop = int
+    started = time.perf_counter()
+    if variant == 'timer_wheel':
+        timers = [wheel.call_later(delay, noop) for _ in range(connections)]
+    else:
+        timers = [loop.call_later(delay, noop) for _ in range(connections)]
+    scheduled = time.perf_counter()
+    for timer in timers:
+        timer.cancel()
+    cancelled = time.perf_counter()
+    wheel.close()
+    return {
+        'schedule_us_per_timer': (scheduled - started) / connections * 1e6,
+        'cancel_us_per_timer': (cancelled - scheduled) / connections * 1e6,
+    }
+
+
+async def run_variant(variant: str, args: argparse.Namespace) -> Dict[str, Any]:
+    random.seed(0)
+    periodic = _periodic_timer_wheel if variant == 'timer_wheel' else _periodic_sleep_tasks
+    return {
+        'periodic': await periodic(args.connections, args.interval, args.duration),
+        'schedule_cancel': await _schedule_cancel(variant, args.connections, args.idle_timeout),
+    }
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Per-task sleep vs TimerWheel benchmark")
+    parser.add_argument('--connections', type=int, default=50000)
+    parser.add_argument('--interval', type=float, default=1.0, help="period of each connection's job")
+    parser.add_argument('--duration', type=float, default=5.0, help="measurement window in seconds")
+    parser.add_argument('--idle-timeout', type=float, default=30.0, help="delay used by the schedule/cancel scenario")
+    parser.add_argument('--variant', choices=VARIANTS, help=argparse.SUPPRESS)
+    parser.add_argument('--output', help="write JSON here instead of stdout")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.variant:
+        # Child mode: measure one variant in this fresh process
+        sys.stdout.write(json.dumps(asyncio.run(run_variant(args.variant, args))) + '\n')
+        return
+
+    params = {k: v for k, v in vars(args).items() if k not in ('output', 'variant')}
+    child_args = [f"--{k.replace('_', '-')}={v}" for k, v in params.items()]
+    results = {}
+    for variant in VARIANTS:
+        proc = subprocess.run([sys.executable, '-m', 'benchmarks.timers', '--variant', variant, *child_args],
+                              cwd=ROOT, capture_output=True, text=True, check=True)
+        results[variant] = json.loads(proc.stdout)
+    report = {
+        'meta': {
+            'timestamp': datetime.now(timezone.utc).isoformat(), **_git_revision(),
+            'python': platform.python_version(), 'platform': platform.platform(), 'params': params,
+        },
+        'results': results
+    }
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w') as out:
+            out.write(text + '\n')
+    else:
+        sys.stdout.write(text + '\n')
+
+
+if __name__ == '__main__':
+    main()
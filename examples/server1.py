@@ -12,55 +12,47 @@ import logging
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
 from abakedserver import aBakedServer
-from abakedserver.logging import configure_logger
+from abakedserver.logging import configure_logging
 
-logger = configure_logger('abakedserver')
+logger = configure_logging('abakedserver', level='DEBUG', log_file='abakedserver.log')
 
 
-async def client_handler(reader, writer):
-    peername = writer.get_extra_info('peername')
-    print(f"Server: Client {peername} connected at {datetime.now().strftime('%H:%M:%S')}")
+def make_client_handler(server):
+    async def client_handler(reader, writer):
+        peername = writer.get_extra_info('peername')
+        print(f"Server: Client {peername} connected at {datetime.now().strftime('%H:%M:%S')}")
+        # Periodic messages come from the shared 'bedtime' ticker (see main())
+        server.join('bedtime', writer)
 
-    async def send_periodic_messages():
-        while True:
-            try:
-                current_time = datetime.now().strftime("%H:%M:%S")
-                message = f"Go to bed, it is {current_time}"
-                print(f"Server: Sending to {peername}: {message}")
-                writer.write(message.encode() + b'\n')
+        try:
+            while True:
+                data = await reader.readuntil(b'\n')
+                message = data.decode().strip()
+                print(f"Server: Received from {peername}: {message}")
+                response = "No!"
+                print(f"Server: Sending to {peername}: {response}")
+                writer.write(response.encode() + b'\n')
                 await writer.drain()
-                await asyncio.sleep(2)
-            except (ConnectionError, asyncio.CancelledError):
-                print(f"Server: Periodic message task stopped for {peername}")
-                break
+        except asyncio.IncompleteReadError:
+            print(f"Server: Client {peername} disconnected (EOF) at {datetime.now().strftime('%H:%M:%S')}")
+        except ConnectionError as e:
+            print(f"Server: Client {peername} disconnected due to error: {e} at {datetime.now().strftime('%H:%M:%S')}")
+        finally:
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except ConnectionError:
+                pass
+            print(f"Server: Connection closed for {peername} at {datetime.now().strftime('%H:%M:%S')}")
 
-    periodic_task = asyncio.create_task(send_periodic_messages())
+    return client_handler
 
-    try:
-        while True:
-            data = await reader.readuntil(b'\n')
-            message = data.decode().strip()
-            print(f"Server: Received from {peername}: {message}")
-            response = "No!"
-            print(f"Server: Sending to {peername}: {response}")
-            writer.write(response.encode() + b'\n')
-            await writer.drain()
-    except asyncio.IncompleteReadError:
-        print(f"Server: Client {peername} disconnected (EOF) at {datetime.now().strftime('%H:%M:%S')}")
-    except ConnectionError as e:
-        print(f"Server: Client {peername} disconnected due to error: {e} at {datetime.now().strftime('%H:%M:%S')}")
-    finally:
-        periodic_task.cancel()
-        try:
-            await periodic_task
-        except asyncio.CancelledError:
-            pass
-        writer.close()
-        try:
-            await writer.wait_closed()
-        except ConnectionError:
-            pass
-        print(f"Server: Connection closed for {peername} at {datetime.now().strftime('%H:%M:%S')}")
+
+def bedtime_message() -> str:
+    # Formatted and encoded once per tick for all connected clients
+    message = f"Go to bed, it is {datetime.now().strftime('%H:%M:%S')}"
+    print(f"Server: Broadcasting: {message}")
+    return message + '\n'
 
 
 async def main(port: int, mode: str):
@@ -110,9 +102,10 @@ async def main(port: int, mode: str):
         ssh_config=ssh_config,
         timing_config=timing_config
     )
+    server.add_ticker('bedtime', 2, bedtime_message)
     
     try:
-        async with await server.start_server(client_handler):
+        async with await server.start_server(make_client_handler(server)):
             print(f"Server: Listening on localhost:{port} (mode: {mode}) at {datetime.now().strftime('%H:%M:%S')}")
             await shutdown_event.wait()
     except (OSError, asyncssh.Error, RuntimeError) as e:
@@ -90,3 +90,44 @@ async def test_sync_method_on_healthy_connection(ssh_server, echo_client_handler
         peername = wrapped_writer.get_extra_info('peername')
         assert peername == ('127.0.0.1', 12345)
 
+
+
+async def test_idle_timeout_warnings_are_rate_limited(tcp_server, caplog):
+    """
+    Проверяет, что массовые тайм-ауты бездействия не заливают лог одинаковыми предупреждениями.
+    """
+    from abakedserver.stream_wrappers import sampled_logger
+    sampled_logger._buckets.clear()
+    tcp_server.timing_config['idle_timeout'] = 0.001
+
+    async def never_returns(*args, **kwargs):
+        await asyncio.sleep(1)
+
+    for _ in range(50):
+        mock_reader = AsyncMock(spec=asyncio.StreamReader)
+        mock_reader.read.side_effect = never_returns
+        assert await WrappedSSHReader(mock_reader, tcp_server).read(10) == b''
+
+    warnings = [r for r in caplog.records if "idle timeout" in r.getMessage()]
+    assert len(warnings) == sampled_logger.burst
+    assert sampled_logger.suppressed()['idle_timeout'] == 50 - sampled_logger.burst
+    sampled_logger._buckets.clear()
+
+
+async def test_idle_timeout_does_not_swallow_external_cancel(tcp_server):
+    """
+    Проверяет, что внешняя отмена задачи во время чтения с тайм-аутом бездействия не превращается в EOF.
+    """
+    tcp_server.timing_config['idle_timeout'] = 0.05
+
+    async def never_returns(*args, **kwargs):
+        await asyncio.sleep(1)
+
+    mock_reader = AsyncMock(spec=asyncio.StreamReader)
+    mock_reader.read.side_effect = never_returns
+
+    task = asyncio.create_task(WrappedSSHReader(mock_reader, tcp_server).read(10))
+    await asyncio.sleep(0.01)
+    task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await task
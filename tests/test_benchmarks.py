@@ -0,0 +1,85 @@
+import os
+import sys
+import json
+import pytest
+import subprocess
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SMOKE_ARGS = [
+    '--clients', '2', '--requests', '5', '--payload-sizes', '64,4096', '--throughput-bytes', '65536',
+    '--accept-connections', '10', '--idle-connections', '10', '--concurrency', '5'
+]
+
+
+def _run_suite(mode, output):
+    subprocess.run(
+        [sys.executable, '-m', 'benchmarks.run', '--mode', mode, '--output', str(output), *SMOKE_ARGS],
+        cwd=ROOT, check=True, timeout=120
+    )
+    with open(output) as f:
+        return json.load(f)
+
+
+@pytest.mark.parametrize('mode', ['tcp', 'ssh'])
+def test_benchmark_suite_smoke(mode, tmp_path):
+    """
+    Дымовой прогон бенчмарков с минимальной нагрузкой: проверяет структуру JSON-отчета.
+    """
+    if mode == 'ssh':
+        pytest.importorskip('asyncssh')
+    report = _run_suite(mode, tmp_path / 'report.json')
+
+    assert report['meta']['params']['mode'] == mode
+    results = report['results'][mode]
+    assert results['accepts']['accepts_per_sec'] > 0
+    assert results['latency']['requests_per_sec'] > 0
+    assert results['latency']['p50_ms'] <= results['latency']['p99_ms']
+    assert [run['payload_bytes'] for run in results['throughput']] == [64, 4096]
+    assert results['idle_memory']['server_connections'] == 10
+
+
+def test_timer_benchmark_smoke(tmp_path):
+    """
+    Дымовой прогон бенчмарка таймеров на небольшом числе соединений.
+    """
+    output = tmp_path / 'timers.json'
+    subprocess.run(
+        [sys.executable, '-m', 'benchmarks.timers', '--connections', '500', '--interval', '0.05',
+         '--duration', '0.2', '--output', str(output)],
+        cwd=ROOT, check=True, timeout=120
+    )
+    with open(output) as f:
+        results = json.load(f)['results']
+    for variant in ('sleep_tasks', 'timer_wheel'):
+        assert results[variant]['periodic']['callbacks'] > 0
+        assert results[variant]['schedule_cancel']['schedule_us_per_timer'] > 0
+
+
+def test_benchmark_compare(tmp_path):
+    """
+    Проверяет сравнение двух отчетов: относительное изменение по совпадающим метрикам.
+    """
+    from benchmarks.compare import compare
+
+    base = {'results': {'tcp': {'accepts': {'accepts_per_sec': 100.0}, 'throughput': [{'payload_bytes': 64, 'mb_per_sec': 10.0}]}}}
+    new = {'results': {'tcp': {'accepts': {'accepts_per_sec': 150.0}, 'throughput': [{'payload_bytes': 64, 'mb_per_sec': 5.0}]}}}
+    rows = compare(base, new)
+
+    assert rows['tcp.accepts.accepts_per_sec']['change_pct'] == pytest.approx(50.0)
+    assert rows['tcp.throughput[64].mb_per_sec']['change_pct'] == pytest.approx(-50.0)
+
+
+def test_nagle_benchmark_smoke(tmp_path):
+    """
+    Дымовой прогон бенчмарка TCP_NODELAY: оба режима дают отчет о задержках.
+    """
+    output = tmp_path / 'nagle.json'
+    subprocess.run(
+        [sys.executable, '-m', 'benchmarks.nagle', '--clients', '2', '--requests', '3', '--output', str(output)],
+        cwd=ROOT, check=True, timeout=120
+    )
+    with open(output) as f:
+        results = json.load(f)['results']
+    for setting in ('nodelay_on', 'nodelay_off'):
+        assert results[setting]['requests_per_sec'] > 0
+        assert results[setting]['p50_ms'] <= results[setting]['p99_ms']
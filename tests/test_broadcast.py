@@ -0,0 +1,150 @@
+import pytest
+import asyncio
+
+from abakedserver import aBakedServer
+
+pytestmark = [pytest.mark.asyncio]
+
+
+def _group_handler(server, group, joined):
+    async def handler(reader, writer):
+        server.join(group, writer)
+        joined.release()
+        await reader.read()
+
+    return handler
+
+
+async def _open_members(server, count, joined):
+    port = server.server.sockets[0].getsockname()[1]
+    clients = [await asyncio.open_connection('localhost', port) for _ in range(count)]
+    for _ in range(count):
+        await asyncio.wait_for(joined.acquire(), timeout=2.0)
+    return clients
+
+
+async def _close(clients):
+    for _, writer in clients:
+        writer.close()
+        await writer.wait_closed()
+
+
+async def test_broadcast_delivers_same_payload_to_all_members():
+    """
+    Проверяет, что broadcast доставляет одно сообщение всем участникам группы и учитывается в метриках.
+    """
+    server = aBakedServer(host='localhost', port=0)
+    joined = asyncio.Semaphore(0)
+    await server.start_server(_group_handler(server, 'news', joined))
+    clients = await _open_members(server, 3, joined)
+    try:
+        result = server.broadcast('news', "hello\n")
+        assert result == {'delivered': 3, 'skipped': 0, 'disconnected': 0}
+        for reader, _ in clients:
+            assert await asyncio.wait_for(reader.readline(), timeout=2.0) == b"hello\n"
+
+        assert all(conn.bytes_out == 6 for conn in server.connections().values())
+        metrics = await server.metrics.get_metrics()
+        assert metrics['broadcasts_total'] == 1
+        assert metrics['broadcast_deliveries_total'] == 3
+        assert metrics['broadcast_bytes_total'] == 18
+        assert metrics['broadcast_groups'] == {'news': 3}
+        assert metrics['histograms']['broadcast_fanout_seconds']['count'] == 1
+    finally:
+        await _close(clients)
+        await server.close()
+
+
+async def test_members_leave_groups_on_close():
+    """
+    Проверяет, что закрытое соединение автоматически удаляется из групп.
+    """
+    server = aBakedServer(host='localhost', port=0)
+    joined = asyncio.Semaphore(0)
+    await server.start_server(_group_handler(server, 'news', joined))
+    clients = await _open_members(server, 2, joined)
+    try:
+        await _close(clients[:1])
+        for _ in range(20):
+            if server.groups.sizes() == {'news': 1}:
+                break
+            await asyncio.sleep(0.05)
+        assert server.groups.sizes() == {'news': 1}
+        assert server.broadcast('news', b"x")['delivered'] == 1
+    finally:
+        await _close(clients[1:])
+        await server.close()
+    assert server.groups.sizes() == {}
+
+
+@pytest.mark.parametrize('policy, expected', [
+    ('skip', {'delivered': 1, 'skipped': 1, 'disconnected': 0}),
+    ('disconnect', {'delivered': 1, 'skipped': 0, 'disconnected': 1}),
+])
+async def test_slow_members_follow_policy(policy, expected, monkeypatch):
+    """
+    Проверяет обработку медленных участников: пропуск или отключение по политике.
+    """
+    server = aBakedServer(host='localhost', port=0, broadcast_config={'max_buffer': 1024, 'slow_policy': policy})
+    joined = asyncio.Semaphore(0)
+    await server.start_server(_group_handler(server, 'news', joined))
+    clients = await _open_members(server, 2, joined)
+    try:
+        slow = next(iter(server.connections().values()))
+        monkeypatch.setattr(slow.writer.transport, 'get_write_buffer_size', lambda: 4096)
+
+        assert server.broadcast('news', b"tick") == expected
+        metrics = await server.metrics.get_metrics()
+        assert metrics['broadcast_skipped_total'] == expected['skipped']
+        assert metrics['broadcast_disconnected_total'] == expected['disconnected']
+        if policy == 'disconnect':
+            assert server.groups.sizes() == {'news': 1}
+    finally:
+        await _close(clients)
+        await server.close()
+
+
+async def test_ticker_broadcasts_periodically():
+    """
+    Проверяет общий тикер: периодическая рассылка, пропуск тика при None и остановка при close().
+    """
+    server = aBakedServer(host='localhost', port=0)
+    joined = asyncio.Semaphore(0)
+    ticks = []
+
+    def producer():
+        ticks.append(len(ticks))
+        return None if len(ticks) == 1 else f"tick {len(ticks)}\n"
+
+    ticker = server.add_ticker('clock', 0.05, producer)
+    assert not ticker.running
+    await server.start_server(_group_handler(server, 'clock', joined))
+    clients = await _open_members(server, 2, joined)
+    try:
+        assert ticker.running
+        for reader, _ in clients:
+            line = await asyncio.wait_for(reader.readline(), timeout=2.0)
+            assert line.startswith(b"tick ") and line != b"tick 1\n"
+    finally:
+        await _close(clients)
+        await server.close()
+    assert not ticker.running
+
+
+async def test_broadcast_validation():
+    """
+    Проверяет валидацию параметров широковещательной рассылки.
+    """
+    with pytest.raises(ValueError, match="slow_policy"):
+        aBakedServer(host='localhost', port=0, broadcast_config={'slow_policy': 'drop'})
+    with pytest.raises(ValueError, match="broadcast_config"):
+        aBakedServer(host='localhost', port=0, broadcast_config=[])
+
+    server = aBakedServer(host='localhost', port=0)
+    with pytest.raises(ValueError, match="Not an active connection"):
+        server.join('news', 42)
+    with pytest.raises(ValueError, match="slow_policy"):
+        server.broadcast('news', b"x", slow_policy='drop')
+    with pytest.raises(ValueError, match="interval"):
+        server.add_ticker('news', 0, lambda: b"x")
+    assert server.broadcast('empty', b"x") == {'delivered': 0, 'skipped': 0, 'disconnected': 0}
@@ -0,0 +1,148 @@
+import pytest
+import asyncio
+
+from abakedserver import aBakedServer
+from abakedserver.cache import ResponseCache
+
+pytestmark = [pytest.mark.asyncio]
+
+
+async def test_lru_eviction_by_entries_and_bytes():
+    """
+    Проверяет вытеснение по LRU при превышении лимитов на число записей и на объем.
+    """
+    cache = ResponseCache(max_entries=2, max_bytes=10)
+    cache.put(b"a", b"1111")
+    cache.put(b"b", b"2222")
+    assert cache.get(b"a") == b"1111"  # "a" becomes most recently used
+    cache.put(b"c", b"3333")
+    assert b"b" not in cache and b"a" in cache and b"c" in cache
+
+    cache.put(b"d", b"444444")  # 4 + 6 bytes fit, 4 + 4 + 6 do not
+    assert list(cache._entries) == [b"c", b"d"]
+    assert cache.stats()['bytes'] == 10
+    assert cache.stats()['evictions'] == 2
+
+    cache.put(b"huge", b"x" * 11)  # larger than max_bytes: not stored, nothing evicted
+    assert b"huge" not in cache and len(cache) == 2
+
+
+async def test_ttl_expiration():
+    """
+    Проверяет истечение TTL, в том числе переопределение TTL для отдельной записи.
+    """
+    cache = ResponseCache(ttl=0.05)
+    cache.put(b"short", b"1")
+    cache.put(b"long", b"2", ttl=10.0)
+    await asyncio.sleep(0.08)
+    assert cache.get(b"short") is None
+    assert cache.get(b"long") == b"2"
+    stats = cache.stats()
+    assert (stats['hits'], stats['misses'], stats['expirations']) == (1, 1, 1)
+    assert stats['hit_rate'] == pytest.approx(0.5)
+
+
+async def test_concurrent_misses_compute_once():
+    """
+    Проверяет single-flight: одновременные промахи по одному ключу вычисляются один раз.
+    """
+    cache = ResponseCache(key=lambda request: request.strip().lower())
+    calls = []
+
+    async def compute(request):
+        calls.append(request)
+        await asyncio.sleep(0.05)
+        return request.upper()
+
+    results = await asyncio.gather(*(cache.get_or_compute(r, compute) for r in (b"abc", b"ABC ", b"abc", b"xyz")))
+    assert results == [b"ABC", b"ABC", b"ABC", b"XYZ"]
+    assert calls == [b"abc", b"xyz"]
+    assert cache.stats()['coalesced'] == 2
+    assert await cache.get_or_compute(b"Abc", compute) == b"ABC"
+    assert len(calls) == 2
+
+
+async def test_failures_are_shared_but_not_cached():
+    """
+    Проверяет, что ошибка вычисления получают все ожидающие, но она не кэшируется.
+    """
+    cache = ResponseCache()
+    attempts = []
+
+    async def compute(request):
+        attempts.append(request)
+        await asyncio.sleep(0.02)
+        if len(attempts) == 1:
+            raise RuntimeError("backend down")
+        return b"ok"
+
+    results = await asyncio.gather(cache.get_or_compute(b"k", compute), cache.get_or_compute(b"k", compute),
+                                   return_exceptions=True)
+    assert [type(r) for r in results] == [RuntimeError, RuntimeError]
+    assert b"k" not in cache
+    assert await cache.get_or_compute(b"k", compute) == b"ok"
+    assert len(attempts) == 2
+
+
+async def test_waiter_takes_over_when_computing_caller_is_cancelled():
+    """
+    Проверяет, что при отмене вычисляющей задачи ожидающий вызов вычисляет значение сам.
+    """
+    cache = ResponseCache()
+    started = asyncio.Event()
+
+    async def slow(request):
+        started.set()
+        await asyncio.sleep(10)
+
+    leader = asyncio.create_task(cache.get_or_compute(b"k", slow))
+    await started.wait()
+    waiter = asyncio.create_task(cache.get_or_compute(b"k", lambda request: b"fresh"))
+    await asyncio.sleep(0)
+    leader.cancel()
+    assert await asyncio.wait_for(waiter, timeout=1.0) == b"fresh"
+    assert cache.get(b"k") == b"fresh"
+
+
+async def test_pipeline_with_cache_and_metrics():
+    """
+    Проверяет кэш в связке с конвейером запросов и статистику кэша в метриках сервера.
+    """
+    calls = []
+
+    async def handle(request):
+        calls.append(request)
+        await asyncio.sleep(0.05)
+        return str(len(request))
+
+    server = aBakedServer(host='127.0.0.1', port=0)
+    cache = server.response_cache(max_entries=100, ttl=30.0)
+    await server.start_server(server.pipeline(handle, cache=cache))
+    reader, writer = await asyncio.open_connection('127.0.0.1', server.port)
+    try:
+        writer.write(b"hello\nhello\nhi\nhello\n")
+        responses = [await asyncio.wait_for(reader.readline(), timeout=2.0) for _ in range(4)]
+        assert responses == [b"5\n", b"5\n", b"2\n", b"5\n"]
+        assert calls == [b"hello", b"hi"]
+
+        metrics = await server.metrics.get_metrics()
+        stats = metrics['response_cache']
+        assert stats['entries'] == 2
+        assert stats['coalesced'] == 2
+    finally:
+        writer.close()
+        await server.close()
+
+
+@pytest.mark.parametrize('options, message', [
+    ({'max_entries': 0}, "max_entries"),
+    ({'max_bytes': 1.5}, "max_bytes"),
+    ({'ttl': 0}, "ttl"),
+    ({'key': 'request'}, "key"),
+])
+async def test_cache_validation(options, message):
+    """
+    Проверяет валидацию параметров ResponseCache.
+    """
+    with pytest.raises(ValueError, match=message):
+        ResponseCache(**options)
@@ -0,0 +1,90 @@
+import pytest
+import asyncio
+import tracemalloc
+
+from abakedserver import aBakedServer, Connection, WrappedSSHReader, WrappedSSHWriter
+
+pytestmark = [pytest.mark.asyncio]
+
+
+async def test_connections_registry(controlled_client_handler_factory):
+    """
+    Проверяет, что server.connections() отражает активные соединения и их состояние.
+    """
+    server = aBakedServer(host='localhost', port=0)
+    client_handler, handler_control = controlled_client_handler_factory()
+
+    async with await server.start_server(client_handler):
+        port = server.server.sockets[0].getsockname()[1]
+        reader, writer = await asyncio.open_connection('localhost', port)
+        try:
+            await asyncio.sleep(0.1)
+            connections = server.connections()
+            assert len(connections) == 1
+
+            conn = next(iter(connections.values()))
+            assert server.get_connection(conn.id) is conn
+            assert conn.state == Connection.ACTIVE
+            assert conn.peer == writer.get_extra_info('sockname')
+            assert conn.duration > 0
+            assert conn.as_dict()['bytes_in'] == 0
+
+            with pytest.raises(TypeError):
+                connections[conn.id] = None
+        finally:
+            handler_control.release_all()
+            writer.close()
+            await writer.wait_closed()
+
+        await asyncio.sleep(0.1)
+        assert len(server.connections()) == 0
+        assert conn.state == Connection.CLOSED
+
+
+async def test_wrappers_expose_connection_record():
+    """
+    Проверяет, что обертки потоков доступны обработчику вместе с записью соединения.
+    """
+    server = aBakedServer(host='localhost', port=0)
+    seen = []
+
+    async def handler(reader, writer):
+        seen.append((reader.connection, writer.connection))
+        writer.close()
+
+    async with await server.start_server(handler):
+        port = server.server.sockets[0].getsockname()[1]
+        reader, writer = await asyncio.open_connection('localhost', port)
+        await reader.read()
+        writer.close()
+        await writer.wait_closed()
+
+    reader_conn, writer_conn = seen[0]
+    assert isinstance(reader_conn, Connection)
+    assert reader_conn is writer_conn
+
+
+async def test_connection_record_memory_100k():
+    """
+    Бенчмарк памяти: 100k записей соединений вместе с двумя обертками каждая.
+    Записи и обертки не должны иметь __dict__.
+    """
+    server = aBakedServer(host='localhost', port=0)
+    count = 100_000
+
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    records = []
+    for i in range(count):
+        conn = Connection(i, ('127.0.0.1', 40000 + i % 20000))
+        records.append((conn, WrappedSSHReader(None, server, conn), WrappedSSHWriter(None, server, conn)))
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+
+    allocated = sum(stat.size_diff for stat in after.compare_to(before, 'filename'))
+    per_connection = allocated / count
+
+    assert not hasattr(records[0][0], '__dict__')
+    assert not hasattr(records[0][1], '__dict__')
+    assert not hasattr(records[0][2], '__dict__')
+    assert per_connection < 512, f"{per_connection:.0f} bytes per connection"
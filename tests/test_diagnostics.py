@@ -0,0 +1,97 @@
+import pytest
+import asyncio
+import time
+
+from abakedserver import aBakedServer
+from abakedserver.diagnostics import SlowCallbackDetector
+from abakedserver.metrics import Histogram
+
+pytestmark = [pytest.mark.asyncio, pytest.mark.metrics]
+
+
+async def test_histogram_snapshot_and_quantiles():
+    """
+    Проверяет накопительные бакеты и оценку квантилей гистограммы.
+    """
+    histogram = Histogram(bounds=(0.1, 1.0))
+    for value in (0.05, 0.05, 0.5, 3.0):
+        histogram.observe(value)
+
+    snapshot = histogram.snapshot()
+    assert snapshot['buckets'] == {0.1: 2, 1.0: 3, '+Inf': 4}
+    assert snapshot['count'] == 4 and snapshot['max'] == 3.0
+    assert snapshot['p50'] == 0.1
+    assert snapshot['p99'] == 3.0
+
+    histogram.reset()
+    assert histogram.snapshot()['count'] == 0
+
+
+async def test_loop_lag_monitor_detects_blocking():
+    """
+    Проверяет, что монитор задержки цикла фиксирует блокирующий вызов.
+    """
+    server = aBakedServer(host='localhost', port=0, metrics_config={'loop_lag_interval': 0.02})
+
+    async with await server.start_server(lambda r, w: None):
+        await asyncio.sleep(0.05)
+        time.sleep(0.15)  # блокируем цикл событий
+        await asyncio.sleep(0.05)
+        metrics = await server.metrics.get_metrics()
+
+    lag = metrics['histograms']['event_loop_lag_seconds']
+    assert lag['count'] > 0
+    assert lag['max'] >= 0.1
+    assert 'event_loop_lag' in metrics
+
+
+async def test_slow_callback_detector_names_handler():
+    """
+    Проверяет, что детектор медленных колбэков указывает заблокировавшую корутину,
+    не включает режим отладки цикла и снимает перехват после остановки.
+    """
+    server = aBakedServer(host='localhost', port=0, metrics_config={'slow_callback_threshold': 0.05})
+    loop = asyncio.get_running_loop()
+    debug_before = loop.get_debug()
+    original_run = asyncio.events.Handle._run
+
+    async def blocking_handler(reader, writer):
+        time.sleep(0.1)
+        writer.close()
+
+    async with await server.start_server(blocking_handler):
+        assert loop.get_debug() == debug_before
+        assert asyncio.events.Handle._run is not original_run
+        port = server.server.sockets[0].getsockname()[1]
+        reader, writer = await asyncio.open_connection('localhost', port)
+        await reader.read()
+        writer.close()
+        await writer.wait_closed()
+        metrics = await server.metrics.get_metrics()
+
+    assert asyncio.events.Handle._run is original_run
+    slow = metrics['slow_callbacks']
+    assert any('blocking_handler' in name for name in slow['by_callback'])
+    assert slow['recent'][0]['duration'] >= 0.05
+    assert metrics['histograms']['slow_callback_seconds']['count'] >= 1
+
+
+async def test_slow_callback_detector_plain_callbacks():
+    """
+    Проверяет учет медленных обычных колбэков и то, что быстрые колбэки не записываются.
+    """
+    detector = SlowCallbackDetector(Histogram(), threshold=0.03)
+    detector.start()
+    try:
+        def blocking_callback():
+            time.sleep(0.05)
+
+        loop = asyncio.get_running_loop()
+        loop.call_soon(blocking_callback)
+        loop.call_soon(lambda: None)
+        await asyncio.sleep(0.01)
+    finally:
+        detector.stop()
+
+    assert list(detector.counts) == [blocking_callback.__qualname__]
+    assert detector.samples[0]['duration'] >= 0.03
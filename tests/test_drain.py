@@ -0,0 +1,129 @@
+import pytest
+import asyncio
+
+from abakedserver import aBakedServer
+
+pytestmark = [pytest.mark.asyncio]
+
+
+async def test_drain_lets_inflight_request_finish():
+    """
+    Проверяет, что при drain_timeout запрос, начатый до close(), успевает завершиться.
+    """
+    server = aBakedServer(host='localhost', port=0, timing_config={'drain_timeout': 2.0})
+    started = asyncio.Event()
+
+    async def slow_handler(reader, writer):
+        await reader.read(100)
+        started.set()
+        await asyncio.sleep(0.2)
+        writer.write(b"done")
+        await writer.drain()
+        writer.close()
+
+    await server.start_server(slow_handler)
+    port = server.server.sockets[0].getsockname()[1]
+    reader, writer = await asyncio.open_connection('localhost', port)
+    writer.write(b"request")
+    await writer.drain()
+    await started.wait()
+
+    await server.close()
+
+    assert await reader.read(100) == b"done"
+    writer.close()
+    await writer.wait_closed()
+
+    metrics = await server.metrics.get_metrics()
+    assert metrics['drained_connections_total'] == 1
+    assert metrics['killed_connections_total'] == 0
+
+
+async def test_drain_deadline_force_closes_stragglers(controlled_client_handler_factory):
+    """
+    Проверяет, что соединения, не завершившиеся за drain_timeout, закрываются принудительно.
+    """
+    server = aBakedServer(host='localhost', port=0)
+    client_handler, handler_control = controlled_client_handler_factory()
+
+    await server.start_server(client_handler)
+    port = server.server.sockets[0].getsockname()[1]
+    reader, writer = await asyncio.open_connection('localhost', port)
+    await asyncio.sleep(0.1)
+    assert server._conn_num == 1
+
+    try:
+        await asyncio.wait_for(server.close(drain_timeout=0.1), timeout=2.0)
+        assert await reader.read(100) == b''
+    finally:
+        handler_control.release_all()
+        writer.close()
+
+    metrics = await server.metrics.get_metrics()
+    assert metrics['drained_connections_total'] == 0
+    assert metrics['killed_connections_total'] == 1
+
+
+async def test_shutdown_event_signals_handlers():
+    """
+    Проверяет, что обработчик может дождаться shutdown_event и корректно попрощаться.
+    """
+    server = aBakedServer(host='localhost', port=0, timing_config={'drain_timeout': 1.0})
+
+    async def handler(reader, writer):
+        await server.shutdown_event.wait()
+        writer.write(b"bye")
+        await writer.drain()
+        writer.close()
+
+    await server.start_server(handler)
+    port = server.server.sockets[0].getsockname()[1]
+    reader, writer = await asyncio.open_connection('localhost', port)
+    await asyncio.sleep(0.05)
+    assert not server.shutdown_event.is_set()
+
+    await server.close()
+
+    assert await reader.read(100) == b"bye"
+    writer.close()
+    metrics = await server.metrics.get_metrics()
+    assert metrics['drained_connections_total'] == 1
+
+
+async def test_listener_handoff_keeps_accepting():
+    """
+    Проверяет передачу слушающего сокета новому экземпляру сервера через listen_fd.
+    """
+    async def old_handler(reader, writer):
+        writer.write(b"old")
+        writer.close()
+
+    async def new_handler(reader, writer):
+        writer.write(b"new")
+        writer.close()
+
+    old_server = aBakedServer(host='localhost', port=0)
+    await old_server.start_server(old_handler)
+    port = old_server.port
+
+    fd = old_server.listener_fd()
+    new_server = aBakedServer(host='localhost', port=port, listen_fd=fd)
+    await new_server.start_server(new_handler)
+    try:
+        await old_server.close()
+
+        reader, writer = await asyncio.open_connection('localhost', port)
+        assert await reader.read(100) == b"new"
+        writer.close()
+        await writer.wait_closed()
+    finally:
+        await new_server.close()
+
+
+async def test_listener_fd_requires_running_server():
+    """
+    Проверяет, что listener_fd() до запуска сервера выбрасывает RuntimeError.
+    """
+    server = aBakedServer(host='localhost', port=0)
+    with pytest.raises(RuntimeError, match="not listening"):
+        server.listener_fd()
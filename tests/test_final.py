@@ -77,14 +77,14 @@ async def test_check_permissions_key_does_not_exist(mocker):
 async def test_error_metric_collection(mocker):
     """
     Проверяет, что ошибки соединения корректно записываются в метрики.
-    Покрывает: metrics.py, ветка `extend(errors)`.
+    Покрывает: metrics.py, ветка `update(errors)`.
     """
     metrics_manager = aBakedServer(host='localhost', port=0).metrics
     mocker.patch.object(metrics_manager, '_update_metrics_periodically')
 
     await metrics_manager.record_connection(duration=0.1, errors=['TestError'])
     
-    assert metrics_manager._pending_metrics['errors'] == ['TestError']
+    assert metrics_manager._pending_metrics['errors'] == {'TestError': 1}
 
 
 async def test_metrics_stop_before_start():
@@ -0,0 +1,130 @@
+import pytest
+import asyncio
+
+from abakedserver import aBakedServer
+
+pytestmark = [pytest.mark.asyncio, pytest.mark.metrics]
+
+
+async def test_active_connections_gauge_is_live(controlled_client_handler_factory):
+    """
+    Проверяет, что active_connections отражает реальное число соединений без ожидания тика.
+    """
+    server = aBakedServer(host='localhost', port=0, metrics_config={'interval': 60})
+    client_handler, handler_control = controlled_client_handler_factory()
+
+    async with await server.start_server(client_handler):
+        port = server.server.sockets[0].getsockname()[1]
+        clients = [await asyncio.open_connection('localhost', port) for _ in range(3)]
+        try:
+            await asyncio.sleep(0.1)
+            metrics = await server.metrics.get_metrics()
+            assert metrics['active_connections'] == 3
+            assert metrics['open_ssh_channels'] == 0
+            assert metrics['buffered_bytes'] == 0
+        finally:
+            handler_control.release_all()
+            for _, writer in clients:
+                writer.close()
+                await writer.wait_closed()
+
+        await asyncio.sleep(0.1)
+        metrics = await server.metrics.get_metrics()
+        assert metrics['active_connections'] == 0
+
+
+async def test_open_ssh_channels_gauge(ssh_server, controlled_client_handler_factory):
+    """
+    Проверяет gauge открытых SSH-каналов в режиме туннеля.
+    """
+    client_handler, handler_control = controlled_client_handler_factory()
+
+    async with await ssh_server.start_server(client_handler):
+        port = ssh_server.server.sockets[0].getsockname()[1]
+        reader, writer = await asyncio.open_connection('localhost', port)
+        try:
+            await asyncio.sleep(0.1)
+            metrics = await ssh_server.metrics.get_metrics()
+            assert metrics['open_ssh_channels'] == 1
+
+            ssh_server.conn.is_closed.return_value = True
+            metrics = await ssh_server.metrics.get_metrics()
+            assert metrics['open_ssh_channels'] == 0
+            ssh_server.conn.is_closed.return_value = False
+        finally:
+            handler_control.release_all()
+            writer.close()
+            await writer.wait_closed()
+
+
+async def test_open_ssh_channels_ignores_extra_listeners(mocker, tmp_path, controlled_client_handler_factory):
+    """
+    Проверяет, что клиенты дополнительных слушателей не считаются SSH-каналами.
+    """
+    path = str(tmp_path / 'local.sock')
+    server = aBakedServer(host='localhost', port=0, listeners=[{'path': path}], ssh_config={
+        'ssh_host': 'remote_server', 'ssh_user': 'user', 'ssh_key_path': '/path/to/key'})
+
+    async def fake_setup_tunnel():
+        server.conn = mocker.Mock(is_closed=mocker.Mock(return_value=False))
+        server.tunnel = mocker.Mock()
+
+    mocker.patch.object(server, '_setup_tunnel', new=fake_setup_tunnel)
+    client_handler, handler_control = controlled_client_handler_factory()
+
+    async with await server.start_server(client_handler):
+        port = server.server.sockets[0].getsockname()[1]
+        clients = [await asyncio.open_connection('localhost', port), await asyncio.open_unix_connection(path)]
+        try:
+            await asyncio.sleep(0.1)
+            metrics = await server.metrics.get_metrics()
+            assert metrics['active_connections'] == 2
+            assert metrics['open_ssh_channels'] == 1
+        finally:
+            handler_control.release_all()
+            for _, writer in clients:
+                writer.close()
+                await writer.wait_closed()
+
+
+async def test_custom_gauge_registration():
+    """
+    Проверяет регистрацию пользовательского gauge и устойчивость к ошибкам в колбэке.
+    """
+    metrics_manager = aBakedServer(host='localhost', port=0).metrics
+    queue = asyncio.Queue()
+    await queue.put(1)
+
+    metrics_manager.register_gauge('queue_depth', queue.qsize)
+    metrics_manager.register_gauge('broken', lambda: 1 / 0)
+    metrics = await metrics_manager.get_metrics()
+    assert metrics['queue_depth'] == 1
+    assert metrics['broken'] is None
+
+    metrics_manager.unregister_gauge('queue_depth')
+    metrics = await metrics_manager.get_metrics()
+    assert 'queue_depth' not in metrics
+
+
+async def test_gauge_names_must_not_collide():
+    """
+    Проверяет, что имя gauge не может перекрыть встроенную метрику или другой gauge.
+    """
+    server = aBakedServer(host='localhost', port=0)
+    metrics_manager = server.metrics
+
+    for name in ('connections_total', 'histograms', 'active_connections'):
+        with pytest.raises(ValueError, match="already in use"):
+            metrics_manager.register_gauge(name, lambda: 0)
+    with pytest.raises(ValueError, match="already in use"):
+        server.pipeline(lambda request: request, name='connections_total')
+    with pytest.raises(ValueError, match="already in use"):
+        server.response_cache(name='connections_total')
+
+    server.response_cache(name='answers')
+    with pytest.raises(ValueError, match="already in use"):
+        server.response_cache(name='answers')
+
+    metrics = await metrics_manager.get_metrics()
+    assert metrics['connections_total'] == 0
+    assert 'connections_total_in_flight' not in metrics['histograms']
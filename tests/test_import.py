@@ -0,0 +1,60 @@
+import os
+import re
+import sys
+import subprocess
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# Регрессионный порог на суммарное время импорта пакета (микросекунды)
+IMPORT_BUDGET_US = int(os.environ.get('ABAKEDSERVER_IMPORT_BUDGET_US', 300000))
+HEAVY_MODULES = ('asyncssh', 'cryptography')
+
+
+def _run(code):
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [ROOT, os.environ.get('PYTHONPATH')])))
+    return subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', code],
+        cwd=ROOT, env=env, capture_output=True, text=True, check=True
+    )
+
+
+def _imported(stderr):
+    """Разбирает вывод -X importtime в словарь {модуль: cumulative_us}."""
+    result = {}
+    for line in stderr.splitlines():
+        match = re.match(r'import time:\s+\d+ \|\s+(\d+) \|\s*(\S+)$', line)
+        if match:
+            result[match.group(2)] = int(match.group(1))
+    return result
+
+
+def test_import_skips_ssh_dependencies():
+    """
+    Проверяет, что импорт пакета не загружает asyncssh и его криптографические зависимости.
+    """
+    modules = _imported(_run('import abakedserver').stderr)
+    assert 'abakedserver' in modules
+    for name in HEAVY_MODULES:
+        assert name not in modules, f"{name} is imported eagerly"
+
+
+def test_import_time_budget():
+    """
+    Бенчмарк времени импорта: лучшее из трех измерений не должно превышать порог.
+    """
+    best = min(_imported(_run('import abakedserver').stderr)['abakedserver'] for _ in range(3))
+    assert best < IMPORT_BUDGET_US, f"import abakedserver took {best}us (budget {IMPORT_BUDGET_US}us)"
+
+
+def test_ssh_mode_loads_asyncssh():
+    """
+    Проверяет, что asyncssh загружается только при включении SSH-режима.
+    """
+    code = (
+        "import sys\n"
+        "from abakedserver import aBakedServer\n"
+        "aBakedServer(host='localhost', port=0)\n"
+        "assert 'asyncssh' not in sys.modules\n"
+        "aBakedServer(host='localhost', port=0, ssh_config={'ssh_host': 'example.com'})\n"
+        "assert 'asyncssh' in sys.modules\n"
+    )
+    _run(code)
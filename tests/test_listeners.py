@@ -0,0 +1,185 @@
+import os
+import stat
+import socket
+import pytest
+import asyncio
+
+from abakedserver import aBakedServer
+
+pytestmark = [pytest.mark.asyncio]
+
+
+async def echo_handler(reader, writer):
+    data = await reader.read(100)
+    writer.write(data)
+    await writer.drain()
+    await reader.read()
+
+
+def _ipv6_available():
+    if not socket.has_ipv6:
+        return False
+    try:
+        with socket.socket(socket.AF_INET6, socket.SOCK_STREAM) as sock:
+            sock.bind(('::1', 0))
+        return True
+    except OSError:
+        return False
+
+
+async def _roundtrip(reader, writer, payload=b"ping"):
+    writer.write(payload)
+    await writer.drain()
+    return await asyncio.wait_for(reader.read(100), timeout=2.0)
+
+
+async def _wait_for(predicate, timeout=2.0):
+    for _ in range(int(timeout / 0.02)):
+        if predicate():
+            return
+        await asyncio.sleep(0.02)
+    assert predicate()
+
+
+async def test_tcp_and_unix_listeners_share_handler_and_metrics(tmp_path):
+    """
+    Проверяет TCP- и Unix-сокет в одном сервере: общий обработчик, метки слушателей в метриках, права и удаление файла сокета.
+    """
+    path = str(tmp_path / 'server.sock')
+    server = aBakedServer(host='localhost', port=0, metrics_config={'interval': 0.05},
+                          listeners=[{'path': path, 'mode': 0o600, 'name': 'local'}])
+    await server.start_server(echo_handler)
+    assert stat.S_IMODE(os.stat(path).st_mode) == 0o600
+    assert set(server.listeners()) == {'main', 'local'}
+    assert server.listeners()['local']['kind'] == 'unix'
+
+    tcp = await asyncio.open_connection('localhost', server.port)
+    uds = await asyncio.open_unix_connection(path)
+    try:
+        assert await _roundtrip(*tcp) == b"ping"
+        assert await _roundtrip(*uds) == b"ping"
+        assert sorted(conn.listener for conn in server.connections().values()) == ['local', 'main']
+        metrics = await server.metrics.get_metrics()
+        assert metrics['listener_connections'] == {'main': 1, 'local': 1}
+    finally:
+        for _, writer in (tcp, uds):
+            writer.close()
+            await writer.wait_closed()
+
+    await _wait_for(lambda: server._conn_num == 0)
+    await asyncio.sleep(0.15)
+    metrics = await server.metrics.get_metrics()
+    assert metrics['listeners']['local']['connections_total'] == 1
+    assert metrics['listeners']['main']['connections_total'] == 1
+
+    await server.close()
+    assert not os.path.exists(path)
+
+
+@pytest.mark.skipif(not _ipv6_available(), reason="IPv6 is not available")
+async def test_ipv6_listener():
+    """
+    Проверяет дополнительный слушатель на IPv6-адресе.
+    """
+    server = aBakedServer(host='127.0.0.1', port=0, listeners=[{'host': '::1', 'port': 0}])
+    await server.start_server(echo_handler)
+    try:
+        (name, info), = [(n, i) for n, i in server.listeners().items() if n != 'main']
+        assert name == 'tcp:::1:0'
+        port = info['addresses'][0][1]
+        reader, writer = await asyncio.open_connection('::1', port)
+        assert await _roundtrip(reader, writer) == b"ping"
+        writer.close()
+        await writer.wait_closed()
+    finally:
+        await server.close()
+
+
+async def test_connection_limit_is_shared_across_listeners(tmp_path):
+    """
+    Проверяет, что лимит соединений общий для всех слушателей, а отказ учитывается по метке слушателя.
+    """
+    path = str(tmp_path / 'limit.sock')
+    server = aBakedServer(host='localhost', port=0, max_concurrent_connections=1,
+                          metrics_config={'interval': 0.05}, listeners=[{'path': path}])
+    await server.start_server(echo_handler)
+    tcp = await asyncio.open_connection('localhost', server.port)
+    try:
+        assert await _roundtrip(*tcp) == b"ping"
+        reader, writer = await asyncio.open_unix_connection(path)
+        assert await asyncio.wait_for(reader.read(100), timeout=2.0) == b''
+        writer.close()
+        await asyncio.sleep(0.15)
+        metrics = await server.metrics.get_metrics()
+        assert metrics['listeners'][f'unix:{path}']['rejected_total'] == 1
+    finally:
+        tcp[1].close()
+        await server.close()
+
+
+async def test_inherited_fd_listener():
+    """
+    Проверяет слушатель на унаследованном дескрипторе уже слушающего сокета.
+    """
+    sock = socket.create_server(('127.0.0.1', 0))
+    port = sock.getsockname()[1]
+    fd = sock.detach()
+    server = aBakedServer(host='localhost', port=0, listeners=[{'fd': fd, 'name': 'inherited'}])
+    await server.start_server(echo_handler)
+    try:
+        reader, writer = await asyncio.open_connection('127.0.0.1', port)
+        assert await _roundtrip(reader, writer) == b"ping"
+        assert [conn.listener for conn in server.connections().values()] == ['inherited']
+        writer.close()
+        await writer.wait_closed()
+    finally:
+        await server.close()
+
+
+@pytest.mark.parametrize('listeners, message', [
+    ('unix.sock', "listeners must be a list"),
+    ([{'port': 1, 'path': '/tmp/x.sock'}], "exactly one of"),
+    ([{'host': 'localhost'}], "exactly one of"),
+    ([{'port': -1}], "port"),
+    ([{'path': ''}], "path"),
+    ([{'path': '/tmp/x.sock', 'mode': '660'}], "mode"),
+    ([{'port': 0}, {'port': 0}], "unique"),
+    ([{'port': 0, 'name': 'main'}], "reserved"),
+])
+async def test_listener_validation(listeners, message):
+    """
+    Проверяет валидацию описаний слушателей.
+    """
+    with pytest.raises(ValueError, match=message):
+        aBakedServer(host='localhost', port=0, listeners=listeners)
+
+
+async def test_failed_listener_closes_the_others(tmp_path):
+    """
+    Проверяет, что при ошибке открытия слушателя уже открытые слушатели закрываются.
+    """
+    blocker = socket.create_server(('127.0.0.1', 0))
+    busy_port = blocker.getsockname()[1]
+    path = str(tmp_path / 'first.sock')
+    server = aBakedServer(host='localhost', port=0,
+                          listeners=[{'path': path}, {'host': '127.0.0.1', 'port': busy_port}])
+    try:
+        with pytest.raises(OSError):
+            await server.start_server(echo_handler)
+        assert not server.server.is_serving()
+        assert not os.path.exists(path)
+    finally:
+        blocker.close()
+
+
+async def test_failed_chmod_closes_unix_listener(tmp_path, mocker):
+    """
+    Проверяет, что при ошибке chmod сокет слушателя закрывается, а файл сокета удаляется.
+    """
+    path = str(tmp_path / 'local.sock')
+    server = aBakedServer(host='localhost', port=0, listeners=[{'path': path, 'mode': 0o600}])
+    mocker.patch('abakedserver.listeners.os.chmod', side_effect=PermissionError("chmod denied"))
+    with pytest.raises(PermissionError):
+        await server.start_server(echo_handler)
+    assert not os.path.exists(path)
+    assert not server.server.is_serving()
@@ -0,0 +1,262 @@
+import os
+import sys
+import time
+import pytest
+import asyncio
+import logging
+import threading
+import subprocess
+
+from abakedserver.logging import (
+    AsyncLoggingPipeline, RateLimitedLogger, configure_logging,
+    enable_async_logging, disable_async_logging, get_async_logging
+)
+
+
+class _SlowListHandler(logging.Handler):
+    def __init__(self, gate=None):
+        super().__init__()
+        self.records = []
+        self.threads = set()
+        self.gate = gate
+
+    def emit(self, record):
+        if self.gate is not None:
+            self.gate.wait()
+        self.threads.add(threading.get_ident())
+        self.records.append(self.format(record))
+
+
+@pytest.fixture
+def isolated_logger():
+    logger = logging.getLogger('abakedserver.test.async')
+    logger.propagate = False
+    logger.setLevel(logging.DEBUG)
+    yield logger
+    disable_async_logging(logger.name)
+    logger.handlers.clear()
+
+
+def test_async_logging_moves_io_to_background_thread(isolated_logger):
+    """
+    Проверяет, что записи пишутся в фоновом потоке, а исходные обработчики возвращаются после stop().
+    """
+    handler = _SlowListHandler()
+    isolated_logger.addHandler(handler)
+
+    pipeline = enable_async_logging(isolated_logger.name)
+    assert get_async_logging(isolated_logger.name) is pipeline
+    assert enable_async_logging(isolated_logger.name) is pipeline
+    assert handler not in isolated_logger.handlers
+
+    isolated_logger.info("hello %s", "world")
+    try:
+        raise ValueError("boom")
+    except ValueError:
+        isolated_logger.exception("failed")
+    disable_async_logging(isolated_logger.name)
+
+    assert handler in isolated_logger.handlers
+    assert handler.records[0] == "hello world"
+    assert handler.records[1].startswith("failed\nTraceback")
+    assert threading.get_ident() not in handler.threads
+    assert pipeline.stats()['emitted'] == 2
+    assert pipeline.stats()['dropped'] == 0
+
+
+@pytest.mark.parametrize('drop_policy, expected', [('drop_new', ['m0', 'm1']), ('drop_old', ['m3', 'm4'])])
+def test_async_logging_bounded_queue_drop_policy(isolated_logger, drop_policy, expected):
+    """
+    Проверяет ограниченную очередь и политику отбрасывания при ее переполнении.
+    """
+    gate = threading.Event()
+    handler = _SlowListHandler(gate)
+    isolated_logger.addHandler(handler)
+    pipeline = AsyncLoggingPipeline(isolated_logger, queue_size=2, drop_policy=drop_policy)
+
+    # Заполняем очередь до запуска слушателя, чтобы результат был детерминированным
+    isolated_logger.removeHandler(handler)
+    isolated_logger.addHandler(pipeline._queue_handler)
+    for i in range(5):
+        isolated_logger.info(f"m{i}")
+    isolated_logger.removeHandler(pipeline._queue_handler)
+    isolated_logger.addHandler(handler)
+
+    pipeline.start()
+    gate.set()
+    pipeline.stop()
+
+    assert handler.records == expected
+    stats = pipeline.stats()
+    assert stats['dropped'] == 3
+    assert stats['queued'] == (2 if drop_policy == 'drop_new' else 5)
+    assert stats['emitted'] + stats['dropped'] == 5
+
+
+def test_async_logging_stop_with_full_queue(isolated_logger):
+    """
+    Проверяет, что stop() при заполненной очереди дожидается места для завершения и возвращает обработчики.
+    """
+    class _Slow(_SlowListHandler):
+        def emit(self, record):
+            time.sleep(0.01)
+            super().emit(record)
+
+    handler = _Slow()
+    isolated_logger.addHandler(handler)
+    pipeline = enable_async_logging(isolated_logger.name, queue_size=2)
+    for i in range(10):
+        isolated_logger.info(f"m{i}")
+    disable_async_logging(isolated_logger.name)
+
+    assert handler in isolated_logger.handlers
+    assert pipeline._queue_handler not in isolated_logger.handlers
+    stats = pipeline.stats()
+    assert stats['pending'] == 0
+    assert stats['queued'] == stats['emitted'] == len(handler.records)
+    assert stats['emitted'] + stats['dropped'] == 10
+
+
+def test_async_logging_rejects_unknown_policy(isolated_logger):
+    with pytest.raises(ValueError, match="drop_policy"):
+        AsyncLoggingPipeline(isolated_logger, drop_policy='drop_everything')
+
+
+class _FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def fake_clock(monkeypatch):
+    clock = _FakeClock()
+    monkeypatch.setattr('abakedserver.logging.time.monotonic', clock)
+    return clock
+
+
+def test_rate_limited_logger_token_bucket_and_summary(isolated_logger, fake_clock):
+    """
+    Проверяет token bucket по ключу и сводку "N similar messages suppressed".
+    """
+    handler = _SlowListHandler()
+    isolated_logger.addHandler(handler)
+    limiter = RateLimitedLogger(isolated_logger, rate=1.0, burst=2, summary_interval=60.0)
+
+    results = [limiter.warning('idle', "idle %d", i) for i in range(5)]
+    assert results == [True, True, False, False, False]
+    assert limiter.warning('other', "other key") is True
+    assert limiter.suppressed() == {'idle': 3}
+
+    fake_clock.now += 1.0
+    assert limiter.warning('idle', "idle again") is True
+    assert handler.records == [
+        "idle 0", "idle 1", "other key", "3 similar messages suppressed [idle]", "idle again"
+    ]
+    assert limiter.suppressed() == {}
+
+
+def test_rate_limited_logger_periodic_flush(isolated_logger, fake_clock):
+    """
+    Проверяет периодическую выдачу сводок даже если ключ больше не логирует.
+    """
+    handler = _SlowListHandler()
+    isolated_logger.addHandler(handler)
+    limiter = RateLimitedLogger(isolated_logger, rate=0.01, burst=1, summary_interval=5.0)
+
+    limiter.warning('flap', "flap")
+    limiter.warning('flap', "flap")
+    fake_clock.now += 6.0
+    limiter.info('unrelated', "tick")
+
+    assert handler.records == ["flap", "1 similar messages suppressed [flap]", "tick"]
+
+
+@pytest.mark.asyncio
+async def test_server_flushes_summaries_without_further_logging(isolated_logger, monkeypatch):
+    """
+    Проверяет, что запущенный сервер сам выдает сводку подавленных сообщений, без новых вызовов log().
+    """
+    import abakedserver.abaked_server
+    from abakedserver import aBakedServer
+
+    handler = _SlowListHandler()
+    isolated_logger.addHandler(handler)
+    limiter = RateLimitedLogger(isolated_logger, rate=0.01, burst=1, summary_interval=0.1)
+    monkeypatch.setattr(abakedserver.abaked_server, 'sampled_logger', limiter)
+    monkeypatch.setattr(abakedserver.abaked_server, 'LOG_SUMMARY_CHECK_INTERVAL', 0.02)
+
+    server = aBakedServer(host='127.0.0.1', port=0, timing_config={'timer_resolution': 0.01})
+    await server.start_server(lambda reader, writer: None)
+    try:
+        for _ in range(4):
+            limiter.warning('flap', "flap")
+        await asyncio.sleep(0.3)
+        assert handler.records == ["flap", "3 similar messages suppressed [flap]"]
+    finally:
+        await server.close()
+
+
+def test_rate_limited_logger_skips_disabled_levels(isolated_logger):
+    """
+    Проверяет, что при отключенном уровне сообщения не тратят токены и не форматируются.
+    """
+    isolated_logger.setLevel(logging.WARNING)
+    limiter = RateLimitedLogger(isolated_logger, burst=1)
+    assert limiter.debug('noise', "%s", object()) is False
+    assert limiter.suppressed() == {}
+    assert limiter.warning('noise', "visible") is True
+
+
+def test_rate_limited_logger_bounded_keys(isolated_logger):
+    """
+    Проверяет ограничение числа ключей: самый старый вытесняется со сводкой.
+    """
+    handler = _SlowListHandler()
+    isolated_logger.addHandler(handler)
+    limiter = RateLimitedLogger(isolated_logger, rate=0.0, burst=1, max_keys=2)
+
+    limiter.warning('a', "a")
+    limiter.warning('a', "a")
+    limiter.warning('b', "b")
+    limiter.warning('c', "c")
+
+    assert set(limiter._buckets) == {'b', 'c'}
+    assert handler.records == ["a", "b", "1 similar messages suppressed [a]", "c"]
+
+
+def test_import_does_not_configure_logging(tmp_path):
+    """
+    Проверяет, что импорт пакета не создает лог-файл и оставляет только NullHandler.
+    """
+    code = (
+        "import logging, abakedserver\n"
+        "lg = logging.getLogger('abakedserver')\n"
+        "assert all(isinstance(h, logging.NullHandler) for h in lg.handlers), lg.handlers\n"
+        "assert lg.level == logging.NOTSET\n"
+    )
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [root, os.environ.get('PYTHONPATH')])))
+    subprocess.run([sys.executable, '-c', code], cwd=tmp_path, env=env, check=True)
+    assert not os.path.exists(tmp_path / 'abakedserver.log')
+
+
+def test_configure_logging_replaces_handlers(tmp_path):
+    """
+    Проверяет явную настройку: файл, уровень и замену обработчиков при повторном вызове.
+    """
+    name = 'abakedserver.test.configure'
+    log_file = tmp_path / 'server.log'
+    try:
+        logger = configure_logging(name, level='DEBUG', log_file=str(log_file), console=False)
+        assert logger.level == logging.DEBUG
+        logger.debug("hello %s", 'world')
+        assert 'hello world' in log_file.read_text()
+
+        configure_logging(name, level=logging.WARNING, console=True)
+        assert logger.level == logging.WARNING
+        assert [type(h) for h in logger.handlers] == [logging.StreamHandler]
+    finally:
+        configure_logging(name, console=False)
@@ -132,7 +132,7 @@ async def test_metrics_manager_lifecycle():
 async def test_error_metric_collection():
     """
     Проверяет, что ошибки соединения корректно записываются в метрики.
-    Покрывает ветку `self._pending_metrics['errors'].extend(errors)`.
+    Покрывает ветку `self._pending_metrics['errors'].update(errors)`.
     """
     metrics_manager = aBakedServer(host='localhost', port=0).metrics
 
@@ -145,4 +145,91 @@ async def test_error_metric_collection():
     metrics = await metrics_manager.get_metrics()
     await metrics_manager.stop()
 
-    assert metrics['connection_errors'] == ['TestError']
+    assert metrics['connection_errors'] == {'TestError': 1}
+
+
+async def test_error_counters_rates_and_samples():
+    """
+    Проверяет агрегацию ошибок по типам, оконные скорости и ограниченное кольцо образцов.
+    """
+    from abakedserver import Connection
+
+    metrics_config = {'interval': 0.05, 'error_rate_window': 0.5, 'max_error_samples': 3}
+    metrics_manager = aBakedServer(host='localhost', port=0, metrics_config=metrics_config).metrics
+    conn = Connection(7, ('127.0.0.1', 5555))
+
+    await metrics_manager.start()
+    for _ in range(4):
+        await metrics_manager.record_connection(duration=0.1, errors=['TimeoutError'], conn=conn)
+    await metrics_manager.record_connection(duration=0.1, errors=['ValueError'])
+    await asyncio.sleep(0.12)
+    metrics = await metrics_manager.get_metrics()
+    await metrics_manager.stop()
+
+    assert metrics['connection_errors'] == {'TimeoutError': 4, 'ValueError': 1}
+    rates = metrics['connection_error_rates']
+    assert rates['TimeoutError'] == pytest.approx(4 * rates['ValueError'])
+    assert rates['ValueError'] > 0
+
+    samples = metrics['recent_errors']
+    assert len(samples) == 3
+    assert samples[-1]['type'] == 'ValueError' and samples[-1]['peer'] is None
+    assert samples[0] == {'type': 'TimeoutError', 'peer': ('127.0.0.1', 5555), 'timestamp': samples[0]['timestamp']}
+
+
+async def test_error_rates_expire_outside_window():
+    """
+    Проверяет, что ошибки выпадают из окна скоростей, но остаются в суммарных счетчиках.
+    """
+    metrics_config = {'interval': 0.05, 'error_rate_window': 0.1}
+    metrics_manager = aBakedServer(host='localhost', port=0, metrics_config=metrics_config).metrics
+
+    await metrics_manager.start()
+    await metrics_manager.record_connection(duration=0.1, errors=['TestError'])
+    await asyncio.sleep(0.3)
+    metrics = await metrics_manager.get_metrics()
+    await metrics_manager.stop()
+
+    assert metrics['connection_errors'] == {'TestError': 1}
+    assert metrics['connection_error_rates'] == {}
+
+
+async def test_rate_window_running_sums():
+    """
+    Проверяет кольцевой буфер RateWindow: скользящие суммы и EWMA.
+    """
+    from abakedserver.metrics import RateWindow
+
+    window = RateWindow(tick=1.0, windows={'short': 2.0, 'long': 4.0})
+    assert window.rates() == {'short': 0.0, 'long': 0.0}
+
+    for count in (4, 2, 6, 0, 0):
+        window.push(count)
+
+    rates = window.rates()
+    assert rates['short'] == 0.0           # последние 2 тика: 0, 0
+    assert rates['long'] == pytest.approx(8 / 4)  # последние 4 тика: 2, 6, 0, 0
+
+    ewma = window.ewma()
+    assert 0 < ewma['short'] < ewma['long']
+
+
+async def test_rates_and_load_average_in_metrics():
+    """
+    Проверяет, что get_metrics() отдает оконные скорости и EWMA по всем сериям.
+    """
+    metrics_config = {'interval': 0.05, 'rate_windows': {'1s': 1.0}}
+    metrics_manager = aBakedServer(host='localhost', port=0, metrics_config=metrics_config).metrics
+
+    await metrics_manager.start()
+    for _ in range(3):
+        await metrics_manager.record_connection(duration=0.1, errors=[])
+    await metrics_manager.record_rejection()
+    await asyncio.sleep(0.12)
+    metrics = await metrics_manager.get_metrics()
+    await metrics_manager.stop()
+
+    assert set(metrics['rates']) == {'connections', 'rejections', 'reconnects', 'errors'}
+    assert metrics['rates']['connections']['1s'] == pytest.approx(3 * metrics['rates']['rejections']['1s'])
+    assert metrics['rates']['errors']['1s'] == 0.0
+    assert metrics['load_average']['connections']['1s'] > 0
@@ -0,0 +1,175 @@
+import time
+import struct
+import pytest
+import asyncio
+
+from abakedserver import aBakedServer
+from abakedserver.pipeline import RequestPipeline
+
+pytestmark = [pytest.mark.asyncio]
+
+
+async def _start(handler, **options):
+    server = aBakedServer(host='127.0.0.1', port=0)
+    pipeline = server.pipeline(handler, **options)
+    await server.start_server(pipeline)
+    reader, writer = await asyncio.open_connection('127.0.0.1', server.port)
+    return server, pipeline, reader, writer
+
+
+async def _stop(server, writer):
+    writer.close()
+    await server.close()
+
+
+async def test_requests_are_served_concurrently_in_order():
+    """
+    Проверяет, что запросы одного соединения обрабатываются параллельно, а ответы идут в порядке запросов.
+    """
+    async def handle(request):
+        delay = int(request) / 10
+        await asyncio.sleep(delay)
+        return b"done " + request
+
+    server, pipeline, reader, writer = await _start(handle, max_in_flight=8)
+    try:
+        started = time.monotonic()
+        writer.write(b"3\n1\n2\n3\n")
+        responses = [await asyncio.wait_for(reader.readline(), timeout=2.0) for _ in range(4)]
+        elapsed = time.monotonic() - started
+
+        assert responses == [b"done 3\n", b"done 1\n", b"done 2\n", b"done 3\n"]
+        assert elapsed < 0.6  # serially it would take 0.9 s
+        metrics = await server.metrics.get_metrics()
+        assert metrics['pipeline']['requests_total'] == 4
+        assert metrics['pipeline']['in_flight'] == 0
+        assert metrics['histograms']['pipeline_in_flight']['count'] == 4
+        assert metrics['histograms']['pipeline_in_flight']['max'] >= 2
+        assert metrics['histograms']['pipeline_request_seconds']['count'] == 4
+    finally:
+        await _stop(server, writer)
+
+
+async def test_in_flight_window_is_bounded():
+    """
+    Проверяет, что число одновременно выполняемых запросов не превышает max_in_flight.
+    """
+    release = asyncio.Event()
+    running = []
+
+    async def handle(request):
+        running.append(request)
+        await release.wait()
+        return request
+
+    server, pipeline, reader, writer = await _start(handle, max_in_flight=2)
+    try:
+        writer.write(b"a\nb\nc\nd\ne\n")
+        await asyncio.sleep(0.1)
+        assert running == [b"a", b"b"]
+        assert pipeline.stats()['in_flight'] == 2
+        assert pipeline.stats()['window_full_total'] == 1
+
+        release.set()
+        responses = [await asyncio.wait_for(reader.readline(), timeout=2.0) for _ in range(5)]
+        assert responses == [b"a\n", b"b\n", b"c\n", b"d\n", b"e\n"]
+    finally:
+        await _stop(server, writer)
+
+
+async def test_tagged_responses_complete_out_of_order():
+    """
+    Проверяет режим с тегами: быстрые ответы не ждут медленных, каждый ответ несет тег запроса.
+    """
+    async def handle(request):
+        await asyncio.sleep(float(request))
+        return request
+
+    server, pipeline, reader, writer = await _start(handle, framing='tagged')
+    try:
+        assert pipeline.ordered is False
+        for tag, delay in ((1, b"0.3"), (2, b"0.0"), (3, b"0.1")):
+            writer.write(struct.pack('!II', tag, len(delay)) + delay)
+        tags = []
+        for _ in range(3):
+            tag, length = struct.unpack('!II', await asyncio.wait_for(reader.readexactly(8), timeout=2.0))
+            tags.append((tag, await reader.readexactly(length)))
+        assert tags == [(2, b"0.0"), (3, b"0.1"), (1, b"0.3")]
+    finally:
+        await _stop(server, writer)
+
+
+async def test_responses_flushed_after_client_eof():
+    """
+    Проверяет, что после EOF от клиента ответы на уже принятые запросы все равно отправляются.
+    """
+    async def handle(request):
+        await asyncio.sleep(0.05)
+        return request.upper()
+
+    server, pipeline, reader, writer = await _start(handle, framing='length')
+    try:
+        for request in (b"x", b"", b"yz"):
+            writer.write(struct.pack('!I', len(request)) + request)
+        writer.write_eof()
+        data = await asyncio.wait_for(reader.read(), timeout=2.0)
+        assert data == b"\x00\x00\x00\x01X" + b"\x00\x00\x00\x00" + b"\x00\x00\x00\x02YZ"
+    finally:
+        await _stop(server, writer)
+
+
+async def test_handler_errors():
+    """
+    Проверяет обработку ошибок: on_error формирует ответ и соединение продолжает работу.
+    """
+    def handle(request):
+        if request == b"bad":
+            raise KeyError(request)
+        return "ok"
+
+    server, pipeline, reader, writer = await _start(handle, on_error=lambda request, e: f"ERR {type(e).__name__}")
+    try:
+        writer.write(b"bad\ngood\n")
+        assert await asyncio.wait_for(reader.readline(), timeout=2.0) == b"ERR KeyError\n"
+        assert await asyncio.wait_for(reader.readline(), timeout=2.0) == b"ok\n"
+        assert pipeline.stats()['errors_total'] == 1
+    finally:
+        await _stop(server, writer)
+
+
+async def test_unhandled_error_and_oversized_frame_close_connection():
+    """
+    Проверяет, что без on_error исключение обработчика и слишком большой кадр закрывают соединение.
+    """
+    def handle(request):
+        raise RuntimeError("boom")
+
+    server, pipeline, reader, writer = await _start(handle)
+    try:
+        writer.write(b"x\n")
+        assert await asyncio.wait_for(reader.read(), timeout=2.0) == b""
+    finally:
+        await _stop(server, writer)
+
+    server, pipeline, reader, writer = await _start(lambda request: request, framing='length', max_frame_size=4)
+    try:
+        writer.write(struct.pack('!I', 5) + b"12345")
+        assert await asyncio.wait_for(reader.read(), timeout=2.0) == b""
+        assert pipeline.stats()['requests_total'] == 0
+    finally:
+        await _stop(server, writer)
+
+
+@pytest.mark.parametrize('options, message', [
+    ({'framing': 'json'}, "framing"),
+    ({'max_in_flight': 0}, "max_in_flight"),
+    ({'ordered': 'yes'}, "ordered"),
+    ({'delimiter': '\n'}, "delimiter"),
+    ({'max_frame_size': -1}, "max_frame_size"),
+])
+async def test_pipeline_validation(options, message):
+    """
+    Проверяет валидацию параметров RequestPipeline.
+    """
+    with pytest.raises(ValueError, match=message):
+        RequestPipeline(lambda request: request, **options)
@@ -0,0 +1,93 @@
+import pytest
+import asyncio
+import os
+import signal
+import time
+import threading
+
+from abakedserver import aBakedServer
+from abakedserver.profiler import SamplingProfiler
+
+pytestmark = [pytest.mark.asyncio]
+
+
+def busy_work(seconds):
+    deadline = time.monotonic() + seconds
+    while time.monotonic() < deadline:
+        sum(range(1000))
+
+
+async def test_profiler_attributes_samples_to_handler(tmp_path):
+    """
+    Проверяет, что профилировщик собирает стеки и привязывает их к обработчику соединения.
+    """
+    server = aBakedServer(host='localhost', port=0)
+
+    async def cpu_handler(reader, writer):
+        busy_work(0.3)
+        writer.close()
+
+    async with await server.start_server(cpu_handler):
+        profiler = server.start_profiler(interval=0.005)
+        assert profiler.running
+
+        port = server.server.sockets[0].getsockname()[1]
+        reader, writer = await asyncio.open_connection('localhost', port)
+        await reader.read()
+        writer.close()
+        await writer.wait_closed()
+
+        output = tmp_path / 'profile.txt'
+        server.stop_profiler(str(output))
+
+    lines = output.read_text().splitlines()
+    assert lines
+    handler_lines = [line for line in lines if 'busy_work' in line]
+    assert handler_lines
+    assert all(line.startswith('handler:') and 'cpu_handler' in line.split(';')[0] for line in handler_lines)
+    assert all(line.rsplit(' ', 1)[1].isdigit() for line in lines)
+
+    stats = profiler.stats()
+    assert not stats['running']
+    assert stats['samples'] >= 20
+    assert stats['overhead_ratio'] < 0.1
+
+
+async def test_profiler_signal_toggle(tmp_path):
+    """
+    Проверяет включение и выключение профилировщика сигналом.
+    """
+    server = aBakedServer(host='localhost', port=0)
+    output = tmp_path / 'signal-profile.txt'
+
+    async with await server.start_server(lambda r, w: None):
+        server.install_profiler_signal(signal.SIGUSR2, str(output), interval=0.005)
+        try:
+            os.kill(os.getpid(), signal.SIGUSR2)
+            await asyncio.sleep(0.05)
+            assert server.profiler.running
+
+            os.kill(os.getpid(), signal.SIGUSR2)
+            await asyncio.sleep(0.05)
+            assert not server.profiler.running
+        finally:
+            asyncio.get_running_loop().remove_signal_handler(signal.SIGUSR2)
+
+    assert output.exists()
+
+
+async def test_profiler_skips_samples_when_task_switches(mocker):
+    """
+    Проверяет, что сэмпл отбрасывается, если текущая задача сменилась во время обхода стека.
+    """
+    profiler = SamplingProfiler(interval=0.001, loop=asyncio.get_running_loop(), thread_id=threading.get_ident())
+    first, second = mocker.Mock(), mocker.Mock()
+    second.get_name.return_value = 'second_handler'
+    mocker.patch.object(profiler, '_current_task', side_effect=[first, second, second, second])
+    mocker.patch.object(profiler, '_stop', mocker.Mock(wait=mocker.Mock(side_effect=[False, False, True])))
+
+    profiler._run()  # two sampling iterations in this thread
+
+    assert profiler.stats()['skipped_samples'] == 1
+    (stack, count), = profiler.samples.items()
+    assert stack.startswith('handler:second_handler;') and count == 1
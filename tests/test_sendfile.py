@@ -0,0 +1,133 @@
+import io
+import os
+import mmap
+import pytest
+import asyncio
+
+from abakedserver import aBakedServer
+from test_tls import _write_self_signed, _client_context
+
+pytestmark = [pytest.mark.asyncio]
+
+FILE_SIZE = 3 * 1024 * 1024 + 12345
+
+
+@pytest.fixture
+def blob(tmp_path):
+    path = tmp_path / 'blob.bin'
+    path.write_bytes(os.urandom(FILE_SIZE))
+    return path
+
+
+async def _serve(send, tls_config=None, ssl=None):
+    """Запускает сервер, чей обработчик вызывает send(writer), и возвращает байты, полученные клиентом."""
+    server = aBakedServer(host='127.0.0.1', port=0, metrics_config={'interval': 0.05}, tls_config=tls_config)
+    results = []
+
+    async def handler(reader, writer):
+        results.append(await send(writer))
+        writer.close()
+
+    await server.start_server(handler)
+    try:
+        reader, writer = await asyncio.open_connection('127.0.0.1', server.port, ssl=ssl,
+                                                       server_hostname='localhost' if ssl else None)
+        data = await asyncio.wait_for(reader.read(), timeout=5.0)
+        writer.close()
+        await asyncio.sleep(0.15)
+        metrics = await server.metrics.get_metrics()
+    finally:
+        await server.close()
+    return data, results[0], metrics
+
+
+async def test_sendfile_uses_kernel_sendfile_over_tcp(blob, mocker):
+    """
+    Проверяет отправку файла через os.sendfile в TCP-режиме и учет отправленных байтов.
+    """
+    native = mocker.spy(os, 'sendfile')
+    seen = {}
+
+    async def send(writer):
+        seen['conn'] = writer.connection
+        writer.write(b"HDR")
+        return await writer.sendfile(str(blob))
+
+    data, sent, metrics = await _serve(send)
+    assert sent == FILE_SIZE
+    assert data == b"HDR" + blob.read_bytes()
+    assert native.called
+    assert seen['conn'].bytes_out == FILE_SIZE + 3
+    assert seen['conn'].messages_out == 2
+    assert metrics['bytes_out_total'] == FILE_SIZE + 3
+
+
+async def test_sendfile_offset_count_and_file_object(blob):
+    """
+    Проверяет отправку части файла по смещению и длине из открытого файлового объекта.
+    """
+    async def send(writer):
+        with open(blob, 'rb') as f:
+            return await writer.sendfile(f, offset=100001, count=200000)
+
+    data, sent, _ = await _serve(send)
+    assert sent == 200000
+    assert data == blob.read_bytes()[100001:300001]
+
+
+async def test_sendfile_over_tls_uses_mmap_chunks(blob, tmp_path, mocker):
+    """
+    Проверяет отправку файла поверх TLS: нативный sendfile недоступен, данные идут через mmap.
+    """
+    certfile, keyfile = _write_self_signed(tmp_path, 'sendfile')
+    mapped = mocker.spy(mmap, 'mmap')
+    seen = {}
+
+    async def send(writer):
+        seen['conn'] = writer.connection
+        return await writer.sendfile(blob, offset=5000, count=None)
+
+    data, sent, metrics = await _serve(send, tls_config={'certfile': certfile, 'keyfile': keyfile},
+                                       ssl=_client_context(certfile))
+    assert sent == FILE_SIZE - 5000
+    assert data == blob.read_bytes()[5000:]
+    assert mapped.called
+    assert seen['conn'].bytes_out == FILE_SIZE - 5000
+    assert metrics['bytes_out_total'] == FILE_SIZE - 5000
+
+
+async def test_sendfile_from_non_file_object_and_hooks():
+    """
+    Проверяет отправку из объекта без файлового дескриптора и вызов хука on_write с методом 'sendfile'.
+    """
+    payload = os.urandom(700000)
+    events = []
+    server = aBakedServer(host='127.0.0.1', port=0)
+    server.add_hook('on_write', lambda conn, method, started, finished, nbytes: events.append((method, nbytes)))
+    sent = []
+
+    async def handler(reader, writer):
+        sent.append(await writer.sendfile(io.BytesIO(payload), offset=10))
+        writer.close()
+
+    await server.start_server(handler)
+    try:
+        reader, writer = await asyncio.open_connection('127.0.0.1', server.port)
+        assert await asyncio.wait_for(reader.read(), timeout=5.0) == payload[10:]
+        writer.close()
+    finally:
+        await server.close()
+    assert sent == [len(payload) - 10]
+    assert ('sendfile', len(payload) - 10) in events
+
+
+async def test_sendfile_empty_range(blob):
+    """
+    Проверяет отправку пустого диапазона и смещения за концом файла.
+    """
+    async def send(writer):
+        return (await writer.sendfile(blob, offset=FILE_SIZE + 10), await writer.sendfile(blob, count=0))
+
+    data, sent, _ = await _serve(send)
+    assert sent == (0, 0)
+    assert data == b""
@@ -0,0 +1,159 @@
+import sys
+import pytest
+import asyncio
+import subprocess
+
+from abakedserver.metrics import MetricsManager
+from abakedserver.shared_metrics import SharedMetricsSegment, SharedMetricsSlot
+
+pytestmark = [pytest.mark.asyncio]
+
+BOUNDS = (0.01, 0.1, 1.0)
+
+
+@pytest.fixture
+def segment():
+    segment = SharedMetricsSegment.create(workers=3, histograms={'request_seconds': BOUNDS})
+    yield segment
+    segment.close()
+    segment.unlink()
+
+
+def _manager(segment, worker, **config):
+    return MetricsManager('127.0.0.1', 0, False, '', {
+        'interval': 0.05, 'loop_lag_interval': 0,
+        'shared_memory': {'name': segment.name, 'worker': worker}, **config
+    })
+
+
+async def test_workers_are_summed_across_managers(segment):
+    """
+    Проверяет суммирование счетчиков и гистограмм нескольких воркеров при get_metrics(aggregate=True).
+    """
+    first, second = _manager(segment, 0), _manager(segment, 1)
+    for manager, handshakes in ((first, 2), (second, 3)):
+        for _ in range(handshakes):
+            manager.record_tls_handshake(0.05)
+        manager.record_broadcast(delivered=4, skipped=0, disconnected=0, nbytes=100)
+        manager.histogram('request_seconds', BOUNDS).observe(0.5)
+    second.histogram('request_seconds', BOUNDS).observe(5.0)
+
+    await second.get_metrics(aggregate=True)  # publishes worker 1
+    metrics = await first.get_metrics(aggregate=True)
+    assert metrics['workers'] == 2
+    assert metrics['tls']['handshakes_total'] == 5
+    assert metrics['broadcast_deliveries_total'] == 8
+    histogram = metrics['histograms']['request_seconds']
+    assert (histogram['count'], histogram['max']) == (3, 5.0)
+    assert histogram['buckets'] == {0.01: 0, 0.1: 0, 1.0: 2, '+Inf': 3}
+
+    local = await first.get_metrics()
+    assert local['tls']['handshakes_total'] == 2 and 'workers' not in local
+    assert segment.read_metrics()['broadcasts_total'] == 2
+
+
+async def test_published_on_tick_and_stop(segment):
+    """
+    Проверяет публикацию в слот на каждом тике сборщика метрик и при остановке.
+    """
+    manager = _manager(segment, 2)
+    await manager.start()
+    await manager.record_rejection()
+    await asyncio.sleep(0.12)
+    assert segment.read_slot(2)['counters']['rejected_connections_total'] == 1
+
+    manager.record_broadcast(delivered=1, skipped=0, disconnected=0, nbytes=10)
+    await manager.stop()
+    assert segment.read_metrics()['broadcasts_total'] == 1
+
+
+async def test_restarted_worker_and_reset_keep_totals(segment):
+    """
+    Проверяет, что перезапущенный воркер и reset_metrics() не уменьшают общие счетчики.
+    """
+    manager = _manager(segment, 0)
+    manager.record_broadcast(delivered=1, skipped=0, disconnected=0, nbytes=10)
+    await manager.stop()
+
+    restarted = _manager(segment, 0)
+    restarted.record_broadcast(delivered=1, skipped=0, disconnected=0, nbytes=10)
+    metrics = await restarted.get_metrics(aggregate=True)
+    assert metrics['broadcasts_total'] == 2
+
+    await restarted.reset_metrics()
+    restarted.record_broadcast(delivered=1, skipped=0, disconnected=0, nbytes=10)
+    assert (await restarted.get_metrics(aggregate=True))['broadcasts_total'] == 3
+    assert (await restarted.get_metrics())['broadcasts_total'] == 1
+
+
+async def test_other_process_publishes(segment):
+    """
+    Проверяет публикацию из другого процесса и то, что его завершение не удаляет сегмент.
+    """
+    code = (
+        "import asyncio, sys\n"
+        "from abakedserver.metrics import MetricsManager\n"
+        "async def main():\n"
+        "    m = MetricsManager('h', 0, False, '', {'loop_lag_interval': 0,\n"
+        "        'shared_memory': {'name': sys.argv[1], 'worker': 1}})\n"
+        "    m.record_tls_handshake(0.02, resumed=True)\n"
+        "    await m.stop()\n"
+        "asyncio.run(main())\n"
+    )
+    subprocess.run([sys.executable, '-c', code, segment.name], check=True, timeout=30)
+
+    attached = SharedMetricsSegment.attach(segment.name)
+    try:
+        metrics = attached.read_metrics()
+        assert metrics['tls']['handshakes_total'] == 1
+        assert metrics['tls']['resumed_total'] == 1
+        assert metrics['workers'] == 1
+        assert attached.read_slot(0) is None
+    finally:
+        attached.close()
+
+
+async def test_reader_retries_while_slot_is_being_written(segment):
+    """
+    Проверяет, что читатель не видит слот в середине записи (нечетный номер последовательности).
+    """
+    SharedMetricsSlot(segment, 0).publish({'connections_total': 7}, {})
+    base = segment._slot_base(0)
+    segment._q[base] += 1  # a writer that never finishes
+    with pytest.raises(RuntimeError, match="kept changing"):
+        segment.read_slot(0)
+    segment._q[base] += 1
+    assert segment.read_slot(0)['counters']['connections_total'] == 7
+
+
+async def test_mismatched_histogram_is_not_published(segment):
+    """
+    Проверяет, что гистограмма с другими границами не публикуется в общий сегмент.
+    """
+    manager = _manager(segment, 0)
+    manager.histogram('request_seconds', (1.0, 2.0)).observe(1.5)
+    metrics = await manager.get_metrics(aggregate=True)
+    assert metrics['histograms']['request_seconds']['count'] == 0
+
+
+@pytest.mark.parametrize('shared_memory, message', [
+    ({'worker': 0}, "name"),
+    ({'name': 'x', 'worker': -1}, "worker"),
+    ({'name': 'x', 'worker': 'a'}, "worker"),
+])
+async def test_shared_memory_validation(shared_memory, message):
+    """
+    Проверяет валидацию metrics_config['shared_memory'].
+    """
+    with pytest.raises(ValueError, match=message):
+        MetricsManager('h', 0, False, '', {'shared_memory': shared_memory})
+
+
+async def test_worker_out_of_range_and_not_configured(segment):
+    """
+    Проверяет ошибку для номера воркера вне сегмента и aggregate=True без сегмента.
+    """
+    with pytest.raises(ValueError, match="worker must be in"):
+        _manager(segment, 3)
+    with pytest.raises(RuntimeError, match="shared_memory"):
+        await MetricsManager('h', 0, False, '', {}).get_metrics(aggregate=True)
@@ -0,0 +1,123 @@
+import socket
+import pytest
+import asyncio
+
+from abakedserver import aBakedServer
+
+pytestmark = [pytest.mark.asyncio]
+
+
+def _sockopt_handler(seen, options):
+    async def handler(reader, writer):
+        sock = writer.get_extra_info('socket')
+        seen.append({name: sock.getsockopt(level, option) for name, (level, option) in options.items()})
+        writer.write(b"ok")
+        await writer.drain()
+        await reader.read()
+
+    return handler
+
+
+async def test_accepted_socket_options_applied():
+    """
+    Проверяет, что TCP_NODELAY и keepalive применяются к каждому принятому соединению.
+    """
+    options = {
+        'nodelay': (socket.IPPROTO_TCP, socket.TCP_NODELAY),
+        'keepalive': (socket.SOL_SOCKET, socket.SO_KEEPALIVE),
+    }
+    if hasattr(socket, 'TCP_KEEPIDLE'):
+        options['keepalive_idle'] = (socket.IPPROTO_TCP, socket.TCP_KEEPIDLE)
+    seen = []
+    server = aBakedServer(host='127.0.0.1', port=0, socket_config={
+        'nodelay': False, 'keepalive': True, 'keepalive_idle': 42, 'keepalive_count': 3, 'keepalive_interval': 5
+    })
+    await server.start_server(_sockopt_handler(seen, options))
+    try:
+        reader, writer = await asyncio.open_connection('127.0.0.1', server.port)
+        assert await asyncio.wait_for(reader.read(2), timeout=2.0) == b"ok"
+        assert seen[0]['nodelay'] == 0
+        assert seen[0]['keepalive'] != 0
+        if 'keepalive_idle' in seen[0]:
+            assert seen[0]['keepalive_idle'] == 42
+        writer.close()
+        await writer.wait_closed()
+    finally:
+        await server.close()
+
+
+async def test_default_keeps_asyncio_nodelay():
+    """
+    Проверяет, что без socket_config сохраняется поведение asyncio по умолчанию (TCP_NODELAY включен).
+    """
+    seen = []
+    server = aBakedServer(host='127.0.0.1', port=0)
+    assert server._accepted_sockopts == [] and server._listening_sockopts == []
+    await server.start_server(_sockopt_handler(seen, {'nodelay': (socket.IPPROTO_TCP, socket.TCP_NODELAY)}))
+    try:
+        reader, writer = await asyncio.open_connection('127.0.0.1', server.port)
+        await asyncio.wait_for(reader.read(2), timeout=2.0)
+        assert seen[0]['nodelay'] != 0
+        writer.close()
+        await writer.wait_closed()
+    finally:
+        await server.close()
+
+
+async def test_listening_socket_options_and_backlog(mocker):
+    """
+    Проверяет параметры слушающего сокета: размер буфера, TCP_DEFER_ACCEPT, TCP_FASTOPEN и backlog.
+    """
+    config = {'backlog': 1024, 'rcvbuf': 256 * 1024}
+    if hasattr(socket, 'TCP_DEFER_ACCEPT'):
+        config['defer_accept'] = 5
+    if hasattr(socket, 'TCP_FASTOPEN'):
+        config['fastopen'] = 16
+    start_server = mocker.spy(asyncio, 'start_server')
+    server = aBakedServer(host='127.0.0.1', port=0, socket_config=config)
+    await server.start_server(lambda r, w: None)
+    try:
+        assert start_server.call_args.kwargs['backlog'] == 1024
+        sock = server.server.sockets[0]
+        assert sock.getsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF) >= 256 * 1024
+        if 'defer_accept' in config:
+            assert sock.getsockopt(socket.IPPROTO_TCP, socket.TCP_DEFER_ACCEPT) > 0
+    finally:
+        await server.close()
+
+
+async def test_tcp_options_skipped_on_unix_listener(tmp_path):
+    """
+    Проверяет, что TCP-специфичные параметры не применяются к Unix-сокетам и не ломают их.
+    """
+    path = str(tmp_path / 'opts.sock')
+    seen = []
+    server = aBakedServer(host='127.0.0.1', port=0, listeners=[{'path': path}],
+                          socket_config={'nodelay': False, 'keepalive': True, 'sndbuf': 65536})
+    await server.start_server(_sockopt_handler(seen, {'sndbuf': (socket.SOL_SOCKET, socket.SO_SNDBUF)}))
+    try:
+        reader, writer = await asyncio.open_unix_connection(path)
+        assert await asyncio.wait_for(reader.read(2), timeout=2.0) == b"ok"
+        writer.close()
+        await writer.wait_closed()
+    finally:
+        await server.close()
+
+
+@pytest.mark.parametrize('config, message', [
+    ([], "socket_config"),
+    ({'no_delay': True}, "Unknown socket_config keys"),
+    ({'backlog': 0}, "backlog"),
+    ({'nodelay': 'yes'}, "nodelay"),
+    ({'keepalive': 1}, "keepalive"),
+    ({'rcvbuf': -1}, "rcvbuf"),
+    ({'keepalive_idle': 0}, "keepalive_idle"),
+    ({'defer_accept': -1}, "defer_accept"),
+    ({'fastopen': 1.5}, "fastopen"),
+])
+async def test_socket_config_validation(config, message):
+    """
+    Проверяет валидацию socket_config через check_that.
+    """
+    with pytest.raises(ValueError, match=message):
+        aBakedServer(host='localhost', port=0, socket_config=config)
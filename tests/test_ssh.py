@@ -101,3 +101,23 @@ async def test_ssh_check_key_permissions_pass(mocker, echo_client_handler):
         pass 
     finally:
         await server.close()
+
+
+async def test_ssh_connect_receives_host_and_port(mocker):
+    """
+    Проверяет, что хост и порт передаются в asyncssh.connect явно:
+    собственные значения по умолчанию connect() перекрывают хост из options.
+    """
+    ssh_config = {
+        'ssh_host': 'r_host', 'ssh_port': 2222, 'ssh_user': 'u', 'ssh_key_path': '/fake/key',
+        'remote_bind_host': 'h', 'remote_bind_port': 9,
+    }
+    server = aBakedServer(host='localhost', port=0, ssh_config=ssh_config)
+
+    mocker.patch('os.path.isfile', return_value=True)
+    mocker.patch.object(abakedserver.abaked_server, 'SSHClientConnectionOptions', return_value=mocker.MagicMock())
+    connect = mocker.patch('asyncssh.connect', new_callable=AsyncMock)
+
+    await server._setup_tunnel()
+
+    assert connect.await_args.args[:2] == ('r_host', 2222)
@@ -0,0 +1,180 @@
+import pytest
+import asyncio
+from contextlib import asynccontextmanager
+
+from abakedserver import aBakedServer
+from abakedserver.metrics import MetricsManager, Histogram
+from abakedserver.statsd import StatsdExporter
+
+pytestmark = [pytest.mark.asyncio]
+
+
+class _Collector(asyncio.DatagramProtocol):
+    def __init__(self):
+        self.packets = []
+
+    def datagram_received(self, data, addr):
+        self.packets.append(data)
+
+    def lines(self):
+        return [line.decode() for packet in self.packets for line in packet.split(b'\n')]
+
+
+@asynccontextmanager
+async def _agent():
+    """Локальный UDP-сокет, который собирает полученные датаграммы."""
+    transport, collector = await asyncio.get_running_loop().create_datagram_endpoint(
+        _Collector, local_addr=('127.0.0.1', 0))
+    collector.port = transport.get_extra_info('sockname')[1]
+    try:
+        yield collector
+    finally:
+        transport.close()
+
+
+async def test_counters_are_aggregated_per_interval():
+    """
+    Проверяет, что счетчики отправляются одной строкой с приращением за интервал.
+    """
+    async with _agent() as agent:
+        metrics = MetricsManager('h', 0, False, '', {
+            'interval': 0.05, 'loop_lag_interval': 0, 'statsd': {'port': agent.port, 'gauges': False}
+        })
+        await metrics.start()
+        try:
+            for _ in range(3):
+                metrics.record_broadcast(delivered=2, skipped=0, disconnected=0, nbytes=10)
+                await metrics.record_rejection()
+            await asyncio.sleep(0.08)
+            metrics.record_broadcast(delivered=1, skipped=0, disconnected=0, nbytes=5)
+            await asyncio.sleep(0.1)
+        finally:
+            await metrics.stop()
+
+        lines = agent.lines()
+        assert lines.count('abakedserver.broadcasts_total:3|c') == 1
+        assert lines.count('abakedserver.broadcast_deliveries_total:6|c') == 1
+        assert lines.count('abakedserver.rejected_connections_total:3|c') == 1
+        assert lines.count('abakedserver.broadcasts_total:1|c') == 1
+        assert not [line for line in lines if line.endswith(':0|c')]
+        assert metrics._statsd.stats()['lines_total'] == len(lines)
+
+
+async def test_histograms_become_sampled_timers():
+    """
+    Проверяет отправку гистограмм: по строке на непустой бакет с частотой выборки 1/k.
+    """
+    async with _agent() as agent:
+        exporter = StatsdExporter(port=agent.port, prefix='app', tags={'env': 'test'})
+        await exporter.connect()
+        latency = Histogram((0.005, 0.05))
+        depth = Histogram((1, 4))
+        for value in (0.001, 0.003, 0.02, 9.0):
+            latency.observe(value)
+        depth.observe(3)
+        exporter.flush({}, {}, {'request_seconds': latency, 'in_flight': depth})
+        latency.observe(0.01)
+        exporter.flush({}, {}, {'request_seconds': latency, 'in_flight': depth})
+        await asyncio.sleep(0.05)
+        exporter.close()
+
+        assert agent.lines() == [
+            'app.request_seconds:5|ms|@0.5|#env:test',
+            'app.request_seconds:50|ms|#env:test',
+            'app.request_seconds:9000|ms|#env:test',
+            'app.in_flight:4|h|#env:test',
+            'app.request_seconds:50|ms|#env:test',
+        ]
+
+
+async def test_lines_are_packed_up_to_max_packet_size():
+    """
+    Проверяет упаковку нескольких строк в датаграмму без превышения max_packet_size.
+    """
+    async with _agent() as agent:
+        exporter = StatsdExporter(port=agent.port, max_packet_size=100, counters=())
+        await exporter.connect()
+        gauges = {f'gauge_{i}': i for i in range(40)}
+        exporter.flush({}, gauges, {})
+        await asyncio.sleep(0.05)
+        exporter.close()
+
+        assert sorted(agent.lines()) == sorted(f'abakedserver.gauge_{i}:{i}|g' for i in range(40))
+        assert all(len(packet) <= 100 for packet in agent.packets)
+        assert 1 < len(agent.packets) < 40
+        assert exporter.stats()['packets_total'] == len(agent.packets)
+
+
+async def test_gauges_are_flattened_and_names_sanitized():
+    """
+    Проверяет выгрузку числовых значений gauge-словарей и замену служебных символов в именах.
+    """
+    async with _agent() as agent:
+        exporter = StatsdExporter(port=agent.port, prefix=None, counters=())
+        await exporter.connect()
+        exporter.flush({}, {'pool': {'size': 3, 'name': 'x', 'busy': True}, 'lag': 0.25, 'a:b|c': 1}, {})
+        await asyncio.sleep(0.05)
+        exporter.close()
+        assert agent.lines() == ['pool.size:3|g', 'lag:0.25|g', 'a_b_c:1|g']
+
+
+async def test_backed_up_socket_drops_instead_of_buffering(mocker):
+    """
+    Проверяет, что при переполненном буфере сокета датаграммы отбрасываются, а не накапливаются.
+    """
+    async with _agent() as agent:
+        exporter = StatsdExporter(port=agent.port, max_buffer=0, counters=())
+        await exporter.connect()
+        mocker.patch.object(exporter._transport, 'get_write_buffer_size', return_value=1)
+        exporter.flush({}, {'a': 1, 'b': 2}, {})
+        assert exporter.stats()['dropped_total'] == 2
+        exporter.close()
+        exporter.flush({}, {'a': 1}, {})  # not connected
+        assert exporter.stats()['dropped_total'] == 3
+        assert agent.packets == []
+
+
+async def test_server_pushes_connection_metrics():
+    """
+    Проверяет выгрузку метрик сервера в StatsD и статистику экспортера в get_metrics().
+    """
+    async with _agent() as agent:
+        server = aBakedServer(host='127.0.0.1', port=0, metrics_config={
+            'interval': 0.05, 'statsd': {'port': agent.port, 'tags': {'service': 'echo'}}
+        })
+
+        async def handler(reader, writer):
+            writer.write(await reader.read(100))
+            await writer.drain()
+
+        await server.start_server(handler)
+        try:
+            reader, writer = await asyncio.open_connection('127.0.0.1', server.port)
+            writer.write(b"ping")
+            assert await reader.read(100) == b"ping"
+            writer.close()
+            await asyncio.sleep(0.2)
+            metrics = await server.metrics.get_metrics()
+        finally:
+            await server.close()
+
+        lines = agent.lines()
+        assert 'abakedserver.connections_total:1|c|#service:echo' in lines
+        assert any(line.startswith('abakedserver.active_connections:') for line in lines)
+        assert metrics['statsd']['packets_total'] > 0
+        assert metrics['statsd']['dropped_total'] == 0
+
+
+@pytest.mark.parametrize('options, message', [
+    ({'host': ''}, "host"),
+    ({'port': 0}, "port"),
+    ({'max_packet_size': 10}, "max_packet_size"),
+    ({'tags': ['env:test']}, "tags"),
+    ({'gauges': 'yes'}, "gauges"),
+])
+async def test_statsd_validation(options, message):
+    """
+    Проверяет валидацию параметров StatsD-экспортера.
+    """
+    with pytest.raises(ValueError, match=message):
+        MetricsManager('h', 0, False, '', {'statsd': options})
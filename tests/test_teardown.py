@@ -0,0 +1,74 @@
+import pytest
+import asyncio
+import time
+
+from abakedserver import aBakedServer
+
+pytestmark = [pytest.mark.asyncio]
+
+
+async def test_teardown_closes_all_connections_concurrently(controlled_client_handler_factory):
+    """
+    Проверяет, что close() закрывает все активные соединения пачками и пишет метрики задержек.
+    """
+    server = aBakedServer(host='localhost', port=0, timing_config={'teardown_batch_size': 4})
+    client_handler, handler_control = controlled_client_handler_factory()
+
+    await server.start_server(client_handler)
+    port = server.server.sockets[0].getsockname()[1]
+    clients = [await asyncio.open_connection('localhost', port) for _ in range(10)]
+    await asyncio.sleep(0.1)
+    assert server._conn_num == 10
+
+    try:
+        await server.close()
+        for reader, _ in clients:
+            assert await reader.read(100) == b''
+    finally:
+        handler_control.release_all()
+        for _, writer in clients:
+            writer.close()
+
+    metrics = await server.metrics.get_metrics()
+    assert metrics['killed_connections_total'] == 10
+    assert metrics['aborted_connections_total'] == 0
+    assert metrics['teardown_stats']['count'] == 10
+    assert metrics['teardown_stats']['max'] < server.timing_config['close_timeout']
+
+
+async def test_teardown_aborts_stragglers_after_close_timeout():
+    """
+    Проверяет, что соединение, которое не может сбросить буфер (клиент не читает),
+    обрывается по close_timeout, а не вешает остановку сервера.
+    """
+    server = aBakedServer(host='localhost', port=0, timing_config={'close_timeout': 0.2})
+    blocked = asyncio.Event()
+
+    async def flooding_handler(reader, writer):
+        writer.write(b"x" * (32 * 1024 * 1024))
+        blocked.set()
+        await asyncio.Event().wait()
+
+    await server.start_server(flooding_handler)
+    port = server.server.sockets[0].getsockname()[1]
+    reader, writer = await asyncio.open_connection('localhost', port, limit=1024)
+    await blocked.wait()
+
+    started = time.monotonic()
+    await server.close()
+    assert time.monotonic() - started < 2.0
+
+    writer.close()
+    metrics = await server.metrics.get_metrics()
+    assert metrics['aborted_connections_total'] == 1
+    assert metrics['teardown_stats']['count'] == 0
+
+
+async def test_teardown_config_validation():
+    """
+    Проверяет валидацию новых параметров timing_config.
+    """
+    with pytest.raises(ValueError, match="teardown_batch_size"):
+        aBakedServer(host='localhost', port=0, timing_config={'teardown_batch_size': 0})
+    with pytest.raises(ValueError, match="teardown_timeout"):
+        aBakedServer(host='localhost', port=0, timing_config={'teardown_timeout': -1})
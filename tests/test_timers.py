@@ -0,0 +1,112 @@
+import pytest
+import asyncio
+
+from abakedserver import aBakedServer
+from abakedserver.timers import TimerWheel
+
+pytestmark = [pytest.mark.asyncio]
+
+
+async def test_call_later_fires_once_not_early():
+    """
+    Проверяет, что одноразовый таймер срабатывает один раз и не раньше заданной задержки.
+    """
+    wheel = TimerWheel(resolution=0.01, slots=16)
+    loop = asyncio.get_running_loop()
+    fired = []
+    start = loop.time()
+    wheel.call_later(0.05, lambda tag: fired.append((tag, loop.time())), 'a')
+    assert len(wheel) == 1
+
+    await asyncio.sleep(0.15)
+    assert [tag for tag, _ in fired] == ['a']
+    assert fired[0][1] - start >= 0.05 - 0.002
+    assert len(wheel) == 0
+
+
+async def test_cancel_and_long_delays_across_revolutions():
+    """
+    Проверяет отмену таймера и задержки длиннее одного оборота колеса.
+    """
+    wheel = TimerWheel(resolution=0.01, slots=4)  # один оборот = 0.04 с
+    fired = []
+    cancelled = wheel.call_later(0.02, fired.append, 'cancelled')
+    wheel.call_later(0.1, fired.append, 'long')
+    wheel.call_later(0.02, fired.append, 'short')
+    cancelled.cancel()
+    assert len(wheel) == 2
+
+    await asyncio.sleep(0.05)
+    assert fired == ['short']
+    await asyncio.sleep(0.1)
+    assert fired == ['short', 'long']
+
+
+async def test_call_every_repeats_until_cancelled():
+    """
+    Проверяет периодический таймер и его отмену из самого колбэка.
+    """
+    wheel = TimerWheel(resolution=0.005)
+    ticks = []
+
+    def on_tick():
+        ticks.append(1)
+        if len(ticks) == 3:
+            timer.cancel()
+
+    timer = wheel.call_every(0.02, on_tick)
+    await asyncio.sleep(0.2)
+    assert len(ticks) == 3
+    assert len(wheel) == 0
+    assert wheel.stats()['fired'] == 3
+
+
+async def test_many_timers_share_one_loop_handle():
+    """
+    Проверяет, что тысячи таймеров обслуживаются одним таймером цикла событий.
+    """
+    wheel = TimerWheel(resolution=0.01)
+    loop = asyncio.get_running_loop()
+    before = len(loop._scheduled)
+    fired = []
+    timers = [wheel.call_later(0.02 + i % 5 * 0.01, fired.append, i) for i in range(5000)]
+    assert len(loop._scheduled) - before <= 1
+    for timer in timers[::2]:
+        timer.cancel()
+
+    await asyncio.sleep(0.15)
+    assert sorted(fired) == list(range(1, 5000, 2))
+
+
+async def test_failing_callback_does_not_stop_wheel(caplog):
+    """
+    Проверяет, что исключение в колбэке логируется и не останавливает остальные таймеры.
+    """
+    wheel = TimerWheel(resolution=0.01)
+    fired = []
+    wheel.call_later(0.01, lambda: 1 / 0)
+    wheel.call_later(0.01, fired.append, 'ok')
+    await asyncio.sleep(0.05)
+    assert fired == ['ok']
+    assert any("Timer callback" in r.getMessage() for r in caplog.records)
+
+
+async def test_server_owns_timer_wheel():
+    """
+    Проверяет колесо таймеров сервера: настройка, метрики и очистка при close().
+    """
+    server = aBakedServer(host='localhost', port=0, timing_config={'timer_resolution': 0.01, 'timer_wheel_slots': 64})
+    assert server.timers.resolution == 0.01
+    await server.start_server(lambda r, w: None)
+    fired = []
+    server.timers.call_every(0.01, fired.append, 1)
+    await asyncio.sleep(0.05)
+    assert fired
+    metrics = await server.metrics.get_metrics()
+    assert metrics['timer_wheel']['slots'] == 64
+
+    await server.close()
+    assert len(server.timers) == 0
+
+    with pytest.raises(ValueError, match="timer_resolution"):
+        aBakedServer(host='localhost', port=0, timing_config={'timer_resolution': 0})
@@ -0,0 +1,264 @@
+import ssl
+import socket
+import asyncio
+import datetime
+import pytest
+
+from abakedserver import aBakedServer
+
+pytestmark = [pytest.mark.asyncio]
+
+
+def _write_self_signed(tmp_path, common_name):
+    """Генерирует самоподписанный сертификат для localhost и возвращает пути к файлам."""
+    x509 = pytest.importorskip('cryptography.x509')
+    from cryptography.x509.oid import NameOID
+    from cryptography.hazmat.primitives import hashes, serialization
+    from cryptography.hazmat.primitives.asymmetric import ec
+
+    key = ec.generate_private_key(ec.SECP256R1())
+    name = x509.Name([x509.NameAttribute(NameOID.COMMON_NAME, common_name)])
+    now = datetime.datetime.now(datetime.timezone.utc)
+    cert = (
+        x509.CertificateBuilder()
+        .subject_name(name).issuer_name(name)
+        .public_key(key.public_key())
+        .serial_number(x509.random_serial_number())
+        .not_valid_before(now - datetime.timedelta(minutes=1))
+        .not_valid_after(now + datetime.timedelta(days=1))
+        .add_extension(x509.SubjectAlternativeName([x509.DNSName('localhost')]), critical=False)
+        .add_extension(x509.BasicConstraints(ca=True, path_length=None), critical=True)
+        .sign(key, hashes.SHA256())
+    )
+    certfile, keyfile = tmp_path / f'{common_name}.crt', tmp_path / f'{common_name}.key'
+    certfile.write_bytes(cert.public_bytes(serialization.Encoding.PEM))
+    keyfile.write_bytes(key.private_bytes(serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8,
+                                          serialization.NoEncryption()))
+    return str(certfile), str(keyfile)
+
+
+@pytest.fixture
+def certs(tmp_path):
+    return _write_self_signed(tmp_path, 'first'), _write_self_signed(tmp_path, 'second')
+
+
+def _client_context(*cafiles, alpn=None):
+    context = ssl.create_default_context()
+    for cafile in cafiles:
+        context.load_verify_locations(cafile)
+    if alpn:
+        context.set_alpn_protocols(alpn)
+    return context
+
+
+async def greeting_echo_handler(reader, writer):
+    writer.write(b"+")
+    await writer.drain()
+    while data := await reader.read(100):
+        writer.write(data)
+        await writer.drain()
+
+
+def _blocking_session(port, context, session=None):
+    """Блокирующий клиент: рукопожатие, приветствие, эхо; возвращает (session, session_reused, CN сервера)."""
+    with socket.create_connection(('127.0.0.1', port)) as raw:
+        with context.wrap_socket(raw, server_hostname='localhost', session=session) as tls:
+            assert tls.recv(1) == b"+"
+            tls.sendall(b"ping")
+            assert tls.recv(4) == b"ping"
+            subject = dict(item[0] for item in tls.getpeercert()['subject'])
+            return tls.session, tls.session_reused, subject['commonName']
+
+
+async def test_tls_echo_and_connection_details(certs):
+    """
+    Проверяет TLS-соединение: эхо, сведения о сессии в Connection и метрики рукопожатия.
+    """
+    (certfile, keyfile), _ = certs
+    server = aBakedServer(host='127.0.0.1', port=0,
+                          tls_config={'certfile': certfile, 'keyfile': keyfile, 'alpn_protocols': ['abaked/1', 'h2']})
+    await server.start_server(greeting_echo_handler)
+    try:
+        reader, writer = await asyncio.open_connection('127.0.0.1', server.port, server_hostname='localhost',
+                                                       ssl=_client_context(certfile, alpn=['abaked/1']))
+        assert await reader.readexactly(1) == b"+"
+        writer.write(b"ping")
+        assert await reader.readexactly(4) == b"ping"
+
+        conn, = server.connections().values()
+        assert conn.tls['version'] in ('TLSv1.2', 'TLSv1.3')
+        assert conn.tls['alpn'] == 'abaked/1'
+        assert conn.tls['resumed'] is False
+        assert server.listeners()['main']['tls'] is True
+
+        metrics = await server.metrics.get_metrics()
+        assert metrics['tls']['handshakes_total'] == 1
+        assert metrics['histograms']['tls_handshake_seconds']['count'] == 1
+        writer.close()
+        await writer.wait_closed()
+    finally:
+        await server.close()
+
+
+async def test_tls_session_resumption(certs):
+    """
+    Проверяет возобновление сессии: повторное подключение с сохраненной сессией пропускает полное рукопожатие.
+    """
+    (certfile, keyfile), _ = certs
+    server = aBakedServer(host='127.0.0.1', port=0, tls_config={'certfile': certfile, 'keyfile': keyfile})
+    await server.start_server(greeting_echo_handler)
+    try:
+        context = _client_context(certfile)
+        session, reused, _ = await asyncio.to_thread(_blocking_session, server.port, context)
+        assert not reused
+        _, reused, _ = await asyncio.to_thread(_blocking_session, server.port, context, session)
+        assert reused
+
+        metrics = await server.metrics.get_metrics()
+        assert metrics['tls']['handshakes_total'] == 2
+        assert metrics['tls']['resumed_total'] == 1
+        assert metrics['tls']['resumption_rate'] == pytest.approx(0.5)
+    finally:
+        await server.close()
+
+
+async def test_reload_certificates_keeps_listener(certs):
+    """
+    Проверяет горячую замену сертификата: слушатель не пересоздается, новые рукопожатия видят новый сертификат.
+    """
+    (certfile, keyfile), (new_certfile, new_keyfile) = certs
+    server = aBakedServer(host='127.0.0.1', port=0, tls_config={'certfile': certfile, 'keyfile': keyfile})
+    await server.start_server(greeting_echo_handler)
+    listener = server.server
+    context = _client_context(certfile, new_certfile)
+    try:
+        reader, writer = await asyncio.open_connection('127.0.0.1', server.port, ssl=context,
+                                                       server_hostname='localhost')
+        assert await reader.readexactly(1) == b"+"
+
+        server.reload_certificates(new_certfile, new_keyfile)
+        assert server.server is listener
+        _, _, common_name = await asyncio.to_thread(_blocking_session, server.port, context)
+        assert common_name == 'second'
+
+        # Already established connection is not affected
+        writer.write(b"ping")
+        assert await reader.readexactly(4) == b"ping"
+        writer.close()
+        await writer.wait_closed()
+
+        # Mismatched certificate and key: error, the current certificate stays
+        with pytest.raises(ssl.SSLError):
+            server.reload_certificates(certfile, new_keyfile)
+        _, _, common_name = await asyncio.to_thread(_blocking_session, server.port, context)
+        assert common_name == 'second'
+    finally:
+        await server.close()
+
+
+def _greeting(port, context):
+    """Блокирующий клиент: возвращает приветствие сервера или b"", если соединение отвергнуто."""
+    try:
+        with socket.create_connection(('127.0.0.1', port)) as raw:
+            with context.wrap_socket(raw, server_hostname='localhost') as tls:
+                return tls.recv(1)
+    except OSError:
+        return b""
+
+
+async def test_reload_rotates_client_ca(certs):
+    """
+    Проверяет, что после перезагрузки с новым cafile клиентский сертификат старого CA отвергается.
+    """
+    (certfile, keyfile), (new_certfile, new_keyfile) = certs
+    server = aBakedServer(host='127.0.0.1', port=0, tls_config={
+        'certfile': certfile, 'keyfile': keyfile, 'cafile': certfile, 'verify_client': True})
+    await server.start_server(greeting_echo_handler)
+    old_client = _client_context(certfile)
+    old_client.load_cert_chain(certfile, keyfile)
+    new_client = _client_context(certfile)
+    new_client.load_cert_chain(new_certfile, new_keyfile)
+    try:
+        assert await asyncio.to_thread(_greeting, server.port, old_client) == b"+"
+        assert await asyncio.to_thread(_greeting, server.port, new_client) == b""
+
+        server.reload_certificates(cafile=new_certfile)
+        assert await asyncio.to_thread(_greeting, server.port, old_client) == b""
+        assert await asyncio.to_thread(_greeting, server.port, new_client) == b"+"
+
+        metrics = await server.metrics.get_metrics()
+        assert metrics['tls']['failures_total'] == 2
+    finally:
+        await server.close()
+
+
+async def test_failed_handshake_is_counted(certs):
+    """
+    Проверяет, что неудачное рукопожатие (клиент без TLS) учитывается и не мешает серверу.
+    """
+    (certfile, keyfile), _ = certs
+    server = aBakedServer(host='127.0.0.1', port=0, tls_config={'certfile': certfile, 'keyfile': keyfile})
+    await server.start_server(greeting_echo_handler)
+    try:
+        reader, writer = await asyncio.open_connection('127.0.0.1', server.port)
+        writer.write(b"GET / HTTP/1.0\r\n\r\n")
+        assert await asyncio.wait_for(reader.read(), timeout=2.0) is not None
+        writer.close()
+        for _ in range(100):
+            if not server.connections():
+                break
+            await asyncio.sleep(0.02)
+        metrics = await server.metrics.get_metrics()
+        assert metrics['tls']['failures_total'] == 1
+        assert metrics['tls']['handshakes_total'] == 0
+
+        _, reused, _ = await asyncio.to_thread(_blocking_session, server.port, _client_context(certfile))
+        assert not reused
+    finally:
+        await server.close()
+
+
+async def test_unix_listener_stays_plaintext(certs, tmp_path):
+    """
+    Проверяет, что Unix-сокет по умолчанию работает без TLS, если не указано 'tls': True.
+    """
+    (certfile, keyfile), _ = certs
+    path = str(tmp_path / 'plain.sock')
+    server = aBakedServer(host='127.0.0.1', port=0, listeners=[{'path': path}],
+                          tls_config={'certfile': certfile, 'keyfile': keyfile})
+    await server.start_server(greeting_echo_handler)
+    try:
+        assert server.listeners()[f'unix:{path}']['tls'] is False
+        reader, writer = await asyncio.open_unix_connection(path)
+        assert await reader.readexactly(1) == b"+"
+        writer.close()
+        await writer.wait_closed()
+    finally:
+        await server.close()
+
+
+async def test_reload_without_tls_raises():
+    """
+    Проверяет, что reload_certificates() без tls_config сообщает об ошибке.
+    """
+    server = aBakedServer(host='127.0.0.1', port=0)
+    with pytest.raises(RuntimeError, match="TLS is not enabled"):
+        server.reload_certificates()
+
+
+@pytest.mark.parametrize('overrides, message', [
+    ({'certfile': None}, "certfile"),
+    ({'alpn_protocols': 'h2'}, "alpn_protocols"),
+    ({'alpn_protocols': []}, "alpn_protocols"),
+    ({'minimum_version': 'SSLv2'}, "minimum_version"),
+    ({'verify_client': True}, "cafile"),
+    ({'handshake_timeout': 0}, "handshake_timeout"),
+    ({'session_ticket': False}, "Unknown tls_config keys"),
+])
+async def test_tls_config_validation(certs, overrides, message):
+    """
+    Проверяет валидацию tls_config.
+    """
+    (certfile, keyfile), _ = certs
+    with pytest.raises(ValueError, match=message):
+        aBakedServer(host='127.0.0.1', port=0, tls_config={'certfile': certfile, 'keyfile': keyfile, **overrides})
@@ -0,0 +1,97 @@
+import pytest
+import asyncio
+
+from abakedserver import aBakedServer
+
+pytestmark = [pytest.mark.asyncio]
+
+
+async def test_hooks_receive_phase_events(echo_client_handler):
+    """
+    Проверяет, что все хуки трассировки вызываются с монотонными метками времени.
+    """
+    server = aBakedServer(host='localhost', port=0)
+    events = []
+
+    server.add_hook('on_accept', lambda conn, ts: events.append(('accept', ts)))
+    server.add_hook('on_handler_start', lambda conn, ts: events.append(('handler_start', ts)))
+    server.add_hook('on_read', lambda conn, method, start, end, n: events.append(('read', method, n, end >= start)))
+    server.add_hook('on_write', lambda conn, method, start, end, n: events.append(('write', method, n)))
+    server.add_hook('on_close', lambda conn, ts: events.append(('close', ts)))
+
+    async with await server.start_server(echo_client_handler):
+        port = server.server.sockets[0].getsockname()[1]
+        reader, writer = await asyncio.open_connection('localhost', port)
+        writer.write(b"hello")
+        await writer.drain()
+        assert await reader.read(100) == b"HELLO"
+        writer.close()
+        await writer.wait_closed()
+        await asyncio.sleep(0.05)
+
+    names = [event[0] for event in events]
+    assert names == ['accept', 'handler_start', 'read', 'write', 'write', 'close']
+    assert events[2] == ('read', 'read', 5, True)
+    assert events[3] == ('write', 'write', 5)
+    assert events[4] == ('write', 'drain', 0)
+    assert events[0][1] <= events[1][1] <= events[-1][1]
+
+
+async def test_hook_registration_errors_and_removal():
+    """
+    Проверяет валидацию имени события, удаление хука и то, что падающий хук не ломает сервер.
+    """
+    server = aBakedServer(host='localhost', port=0)
+    with pytest.raises(ValueError, match="Unknown hook event"):
+        server.add_hook('on_teleport', print)
+
+    calls = []
+    callback = lambda conn, ts: calls.append(conn)
+    server.add_hook('on_close', callback)
+    server.add_hook('on_close', lambda conn, ts: 1 / 0)
+    server.remove_hook('on_close', callback)
+    assert len(server._hooks['on_close']) == 1
+
+    async def handler(reader, writer):
+        writer.close()
+
+    async with await server.start_server(handler):
+        port = server.server.sockets[0].getsockname()[1]
+        reader, writer = await asyncio.open_connection('localhost', port)
+        assert await reader.read() == b''
+        writer.close()
+        await asyncio.sleep(0.05)
+    assert calls == []
+
+
+async def test_phase_timing_aggregator_histograms():
+    """
+    Проверяет встроенный агрегатор фаз: ожидание чтения и вычисления попадают в гистограммы.
+    """
+    server = aBakedServer(host='localhost', port=0, metrics_config={'phase_timing': True})
+
+    async def handler(reader, writer):
+        await reader.readexactly(2)
+        await asyncio.sleep(0)
+        writer.write(b"ok")
+        await writer.drain()
+        writer.close()
+
+    async with await server.start_server(handler):
+        port = server.server.sockets[0].getsockname()[1]
+        reader, writer = await asyncio.open_connection('localhost', port)
+        await asyncio.sleep(0.1)
+        writer.write(b"hi")
+        await writer.drain()
+        assert await reader.read() == b"ok"
+        writer.close()
+        await asyncio.sleep(0.05)
+        metrics = await server.metrics.get_metrics()
+
+    histograms = metrics['histograms']
+    assert histograms['phase_accept_to_handler_seconds']['count'] == 1
+    assert histograms['phase_read_wait_seconds']['count'] == 1
+    assert histograms['phase_read_wait_seconds']['max'] >= 0.09
+    assert histograms['phase_drain_seconds']['count'] == 1
+    assert histograms['phase_handler_compute_seconds']['count'] == 1
+    assert histograms['phase_handler_compute_seconds']['max'] < 0.09
@@ -0,0 +1,93 @@
+import pytest
+import asyncio
+from unittest.mock import AsyncMock
+
+from abakedserver import aBakedServer, Connection, WrappedSSHReader, WrappedSSHWriter
+
+pytestmark = [pytest.mark.asyncio, pytest.mark.metrics]
+
+
+async def test_wrappers_count_bytes_and_messages(tcp_server):
+    """
+    Проверяет, что обертки увеличивают счетчики байт и сообщений в записи соединения.
+    """
+    conn = Connection(1)
+    mock_reader = AsyncMock(spec=asyncio.StreamReader)
+    mock_reader.read.return_value = b"hello"
+    mock_writer = AsyncMock(spec=asyncio.StreamWriter)
+
+    reader = WrappedSSHReader(mock_reader, tcp_server, conn)
+    writer = WrappedSSHWriter(mock_writer, tcp_server, conn)
+
+    assert await reader.read(100) == b"hello"
+    writer.write(b"abc")
+    writer.writelines(chunk for chunk in (b"de", b"fgh"))
+    await writer.drain()
+
+    assert (conn.bytes_in, conn.messages_in) == (5, 1)
+    assert (conn.bytes_out, conn.messages_out) == (8, 2)
+    mock_writer.writelines.assert_called_once_with([b"de", b"fgh"])
+
+    assert conn.take_traffic_delta() == (5, 8, 1, 2)
+    assert conn.take_traffic_delta() == (0, 0, 0, 0)
+
+
+async def test_traffic_rolled_up_at_disconnect(echo_client_handler):
+    """
+    Проверяет агрегацию трафика закрытого соединения в MetricsManager.
+    """
+    server = aBakedServer(host='localhost', port=0, metrics_config={'interval': 0.1})
+
+    async with await server.start_server(echo_client_handler):
+        port = server.server.sockets[0].getsockname()[1]
+        reader, writer = await asyncio.open_connection('localhost', port)
+        writer.write(b"hello")
+        await writer.drain()
+        assert await reader.read(100) == b"HELLO"
+        writer.close()
+        await writer.wait_closed()
+
+        await asyncio.sleep(0.3)
+        metrics = await server.metrics.get_metrics()
+
+    assert metrics['bytes_in_total'] == 5
+    assert metrics['bytes_out_total'] == 5
+    assert metrics['messages_in_total'] == 1
+    assert metrics['messages_out_total'] == 1
+
+
+async def test_traffic_rolled_up_every_interval_with_top_talkers():
+    """
+    Проверяет, что трафик живых соединений учитывается на каждом тике и попадает в top_talkers.
+    """
+    server = aBakedServer(host='localhost', port=0, metrics_config={'interval': 0.1, 'top_talkers': 1})
+
+    async def chatty_handler(reader, writer):
+        while data := await reader.read(100):
+            writer.write(data)
+            await writer.drain()
+
+    async with await server.start_server(chatty_handler):
+        port = server.server.sockets[0].getsockname()[1]
+        quiet_r, quiet_w = await asyncio.open_connection('localhost', port)
+        loud_r, loud_w = await asyncio.open_connection('localhost', port)
+        quiet_w.write(b"x")
+        loud_w.write(b"y" * 50)
+        await asyncio.gather(quiet_w.drain(), loud_w.drain())
+        await quiet_r.readexactly(1)
+        await loud_r.readexactly(50)
+
+        await asyncio.sleep(0.25)
+        metrics = await server.metrics.get_metrics()
+
+        assert metrics['bytes_in_total'] == 51
+        assert metrics['bytes_out_total'] == 51
+        assert len(metrics['top_talkers']) == 1
+        assert metrics['top_talkers'][0]['bytes_in'] == 50
+        assert metrics['throughput'].keys() == {
+            'bytes_in_per_sec', 'bytes_out_per_sec', 'messages_in_per_sec', 'messages_out_per_sec'
+        }
+
+        for w in (quiet_w, loud_w):
+            w.close()
+            await w.wait_closed()